@@ -0,0 +1,185 @@
+"""
+The comparison of the scoring in threads of the main process
+with the scoring in worker processes pinned to sensors.
+
+Readings of all sensors are split into micro-batches like
+`anomaly_detection.process` does, and readings of each sensor
+are scored by `dispatch_many` (threads) or `workers.score` (processes).
+The sensor is sent to the worker only once like the application does.
+
+Reported metrics:
+    readings/s -- scored readings per second of the wall time
+    deviations -- if deviations of both modes are the same
+
+⚠️ Threads are limited by the GIL, so the speedup of processes
+depends on the number of CPU cores.
+
+Usage:
+    python -m benchmarks.anomaly_detection_workers
+    python -m benchmarks.anomaly_detection_workers --sensors 16 --processes 4
+"""
+
+import argparse
+import os
+import pickle
+from concurrent.futures import ThreadPoolExecutor, wait
+from datetime import datetime
+from time import perf_counter
+
+import numpy as np
+from stumpy import aampi
+
+from src.config import settings
+from src.domain.anomaly_detection.services.processing import (
+    discard,
+    dispatch_many,
+    workers,
+)
+from src.domain.sensors import Sensor, SensorConfigurationFlat
+from src.domain.tsd import TsdFlat
+from src.infrastructure.application.shards import ShardedPool
+
+
+def _sensors(count: int) -> list[Sensor]:
+    window: int = settings.anomaly_detection.window_size
+    rng = np.random.default_rng(0)
+
+    # NOTE: Templates are not used by the anomaly detection
+    return [
+        Sensor.construct(
+            id=sensor_id,
+            name=str(sensor_id),
+            x=np.float64(0),
+            y=np.float64(0),
+            z=np.float64(0),
+            template=None,  # type: ignore[arg-type]
+            configuration=SensorConfigurationFlat(
+                id=sensor_id,
+                interactive_feedback_mode=False,
+                anomaly_detection_initial_baseline_raw=pickle.dumps(
+                    aampi(40 + rng.normal(0, 3, window * 15), window)
+                ),
+            ),
+        )
+        for sensor_id in range(1, count + 1)
+    ]
+
+
+def _batches(
+    sensors: list[Sensor], readings: int, batch_size: int
+) -> list[dict[int, list[TsdFlat]]]:
+    rng = np.random.default_rng(1)
+    values: np.ndarray = 40 + rng.normal(0, 3, (len(sensors), readings))
+    per_sensor: int = max(batch_size // len(sensors), 1)
+
+    return [
+        {
+            sensor.id: [
+                TsdFlat(
+                    id=index * len(sensors) + sensor.id,
+                    ppmv=np.float64(values[position, index]),
+                    timestamp=datetime.now(),
+                    sensor_id=sensor.id,
+                )
+                for index in range(start, min(start + per_sensor, readings))
+            ]
+            for position, sensor in enumerate(sensors)
+        }
+        for start in range(0, readings, per_sensor)
+    ]
+
+
+def _threads(
+    sensors: list[Sensor], batches: list[dict[int, list[TsdFlat]]]
+) -> tuple[float, dict[int, list[str]]]:
+    by_id: dict[int, Sensor] = {sensor.id: sensor for sensor in sensors}
+    deviations: dict[int, list[str]] = {sensor.id: [] for sensor in sensors}
+    pool = ThreadPoolExecutor(
+        max_workers=settings.anomaly_detection.scoring.workers
+    )
+
+    started_at: float = perf_counter()
+    for batch in batches:
+        futures = {
+            sensor_id: pool.submit(dispatch_many, readings, by_id[sensor_id])
+            for sensor_id, readings in batch.items()
+        }
+        wait(futures.values())
+        for sensor_id, future in futures.items():
+            deviations[sensor_id].extend(r.value for r in future.result())
+    elapsed: float = perf_counter() - started_at
+
+    pool.shutdown()
+
+    return elapsed, deviations
+
+
+def _processes(
+    sensors: list[Sensor],
+    batches: list[dict[int, list[TsdFlat]]],
+    processes: int,
+) -> tuple[float, dict[int, list[str]]]:
+    deviations: dict[int, list[str]] = {sensor.id: [] for sensor in sensors}
+    pool = ShardedPool(shards=processes, name="benchmark")
+
+    # NOTE: Processes are started and sensors are sent before measurements
+    wait(
+        [
+            pool.submit(sensor.id, workers.score, [], sensor)
+            for sensor in sensors
+        ]
+    )
+
+    started_at: float = perf_counter()
+    for batch in batches:
+        futures = {
+            sensor_id: pool.submit(sensor_id, workers.score, readings, None)
+            for sensor_id, readings in batch.items()
+        }
+        wait(futures.values())
+        for sensor_id, future in futures.items():
+            deviations[sensor_id].extend(r.value for r in future.result())
+    elapsed: float = perf_counter() - started_at
+
+    pool.shutdown()
+
+    return elapsed, deviations
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--sensors", type=int, default=8)
+    parser.add_argument("--readings", type=int, default=2000)
+    parser.add_argument("--processes", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    sensors: list[Sensor] = _sensors(args.sensors)
+    batches = _batches(
+        sensors, args.readings, settings.anomaly_detection.scoring.batch_size
+    )
+    total: int = args.sensors * args.readings
+
+    # NOTE: Numba functions of stumpy are compiled before measurements
+    _threads(sensors[:1], [{1: batches[0][1][:2]}])
+    discard(1)
+
+    threads_elapsed, threads_deviations = _threads(sensors, batches)
+    processes_elapsed, processes_deviations = _processes(
+        sensors, batches, args.processes
+    )
+
+    print(
+        f"{args.sensors} sensors x {args.readings} readings, "
+        f"{os.cpu_count()} CPU cores"
+    )
+    print(f"  threads      {total / threads_elapsed:10.0f} readings/s")
+    print(
+        f"  processes    {total / processes_elapsed:10.0f} readings/s "
+        f"({args.processes} workers)"
+    )
+    equal: bool = threads_deviations == processes_deviations
+    print(f"  deviations   {'equal' if equal else 'different'}")
+
+
+if __name__ == "__main__":
+    main()
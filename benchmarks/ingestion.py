@@ -0,0 +1,322 @@
+"""
+The end-to-end ingestion throughput benchmark.
+
+Files from mock/tsd/ are replayed through the real path:
+    source -> polling scheduler -> ingestion buffer -> data lake
+    -> anomaly_detection.process -> _process (detections, sensor events)
+against the temporary SQLite database with all sleeps turned off.
+
+Each scenario runs in a separate process, so the database, the data lake
+and the peak RSS are not shared between scenarios.
+
+Reported metrics:
+    readings/s -- persisted detections per second of the wall time
+    p50/p95/p99 -- latency from the ingestion buffer to the persisted detection
+    DB share -- the share of the wall time while any query is executed
+    peak RSS -- the max resident set size of the scenario process
+
+Usage:
+    python -m benchmarks.ingestion
+    python -m benchmarks.ingestion --sensors 1 10 --readings 200
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import pickle
+import resource
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+from time import perf_counter
+from typing import Any, Callable
+
+import numpy as np
+import pandas as pd
+
+ROOT_PATH = Path(__file__).parent.parent
+
+# The time without any progress after which the scenario is finished
+IDLE_TIMEOUT = 30.0
+
+
+def _prepare_mock_files(
+    mock_dir: Path, sensors: int, readings: int
+) -> list[str]:
+    """Copy first readings of mock files for each sensor.
+    Sensor names are used as file names by the mock source.
+    """
+
+    (mock_dir / "tsd").mkdir(parents=True)
+    sources: list[Path] = sorted(
+        path
+        for path in (ROOT_PATH / "mock/tsd").glob("*.csv")
+        if not path.name.endswith(".10m.csv")
+    )
+
+    names: list[str] = []
+    for index in range(sensors):
+        name = f"BENCH{index:03}"
+        data: pd.DataFrame = pd.read_csv(
+            sources[index % len(sources)], index_col=0, nrows=readings
+        )
+        data.to_csv(mock_dir / "tsd" / f"{name}.csv")
+        names.append(name)
+
+    return names
+
+
+def _initial_baseline() -> bytes:
+    """The seed baseline is used if it exists.
+    Otherwise, the synthetic one is built.
+    """
+
+    from stumpy import aampi
+
+    from src.config import settings
+    from src.domain.anomaly_detection import services
+
+    try:
+        return pickle.dumps(services.baselines.seed.by_level(level="high"))
+    except FileNotFoundError:
+        values = 40 + np.random.default_rng(0).normal(0, 3, 600)
+        return pickle.dumps(
+            aampi(values, settings.anomaly_detection.window_size)
+        )
+
+
+async def _seed(names: list[str]) -> None:
+    from src.domain.sensors import (
+        SensorConfigurationUncommited,
+        SensorsConfigurationsRepository,
+        SensorsRepository,
+        SensorUncommited,
+    )
+    from src.domain.templates import TemplatesRepository, TemplateUncommited
+    from src.infrastructure.database import Base, engine, transaction
+
+    async with engine.begin() as connection:
+        await connection.run_sync(Base.metadata.create_all)
+
+    @transaction
+    async def seed() -> None:
+        template = await TemplatesRepository().create(
+            TemplateUncommited(
+                name="benchmark",
+                angle_from_north=np.float64(0),
+                field_id=2,
+                currents_path="",
+                waves_path="",
+                simulated_leaks_path="",
+            )
+        )
+        baseline: bytes = _initial_baseline()
+
+        for name in names:
+            configuration = await SensorsConfigurationsRepository().create(
+                SensorConfigurationUncommited(
+                    interactive_feedback_mode=False,
+                    anomaly_detection_initial_baseline_raw=baseline,
+                )
+            )
+            await SensorsRepository().create(
+                SensorUncommited(
+                    name=name,
+                    x=np.float64(0),
+                    y=np.float64(0),
+                    z=np.float64(0),
+                    template_id=template.id,
+                    configuration_id=configuration.id,
+                )
+            )
+
+    await seed()
+
+
+async def _run(sensors: int, readings: int) -> dict[str, Any]:
+    from sqlalchemy import event
+
+    from src import application
+    from src.application import tsd
+    from src.application.tsd import TsdIngestionBuffer
+    from src.config import settings
+    from src.infrastructure.database import engine
+
+    settings.mock_dir = Path.cwd() / "mock"
+    names: list[str] = _prepare_mock_files(
+        settings.mock_dir, sensors, readings
+    )
+    await _seed(names)
+
+    # Measure the time while at least one query is executed,
+    # so concurrent queries are not counted twice
+    db: dict[str, float] = {"active": 0, "since": 0.0, "seconds": 0.0}
+
+    def before_execute(*_) -> None:
+        if db["active"] == 0:
+            db["since"] = perf_counter()
+        db["active"] += 1
+
+    def after_execute(*_) -> None:
+        db["active"] -= 1
+        if db["active"] == 0:
+            db["seconds"] += perf_counter() - db["since"]
+
+    event.listen(engine.sync_engine, "before_cursor_execute", before_execute)
+    event.listen(engine.sync_engine, "after_cursor_execute", after_execute)
+    # NOTE: Failed queries (e.g. the locked database) are finished here
+    event.listen(engine.sync_engine, "handle_error", after_execute)
+
+    # Measure the latency from the ingestion to the persisted detection
+    ingested_at: dict[tuple, float] = {}
+    latencies: list[float] = []
+
+    buffer_add = TsdIngestionBuffer.add
+
+    async def add(self, tsd_raw):
+        ingested_at[(self.sensor.id, tsd_raw.timestamp)] = perf_counter()
+        return await buffer_add(self, tsd_raw)
+
+    process_detection = application.anomaly_detection._process
+
+    async def _process(create_schemas, tsd_by_id):
+        await process_detection(
+            create_schemas=create_schemas, tsd_by_id=tsd_by_id
+        )
+        for schema in create_schemas:
+            tsd = tsd_by_id[schema.time_series_data_id]
+            latencies.append(
+                perf_counter()
+                - ingested_at.pop((tsd.sensor_id, tsd.timestamp))
+            )
+
+    TsdIngestionBuffer.add = add  # type: ignore[method-assign]
+    application.anomaly_detection._process = _process
+
+    await application.lifecycle.start_all()
+
+    started_at: float = perf_counter()
+    tasks = [
+        asyncio.create_task(tsd.process()),
+        asyncio.create_task(application.anomaly_detection.process()),
+    ]
+
+    # NOTE: The pipeline is considered drained if there is no progress
+    #       during the idle timeout since the mock source is exhausted
+    finished_at, progress = started_at, (0, 0)
+    while perf_counter() - finished_at < IDLE_TIMEOUT:
+        await asyncio.sleep(0.1)
+
+        if (current := (len(latencies), len(ingested_at))) != progress:
+            finished_at, progress = perf_counter(), current
+
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+    elapsed: float = finished_at - started_at
+    latencies_ms = np.array(latencies) * 1000
+
+    # NOTE: The scenario could record no latencies (e.g. all readings
+    #       are skipped), so the elapsed time is not measured as well
+    def measured(value: Callable[[], float], digits: int = 1) -> float | str:
+        return round(float(value()), digits) if latencies else "n/a"
+
+    return {
+        "sensors": sensors,
+        "readings": len(latencies),
+        # NOTE: Readings are skipped by the anomaly detection
+        #       until the matrix profile has enough values
+        "skipped": len(ingested_at),
+        "seconds": round(elapsed, 2),
+        "readings_per_second": measured(lambda: len(latencies) / elapsed),
+        "p50_ms": measured(lambda: np.percentile(latencies_ms, 50)),
+        "p95_ms": measured(lambda: np.percentile(latencies_ms, 95)),
+        "p99_ms": measured(lambda: np.percentile(latencies_ms, 99)),
+        "db_share": measured(lambda: db["seconds"] / elapsed, digits=3),
+        "peak_rss_mb": round(
+            resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1
+        ),
+    }
+
+
+def _scenario(sensors: int, readings: int) -> None:
+    """Run the scenario in the temporary directory
+    and print results as JSON.
+    """
+
+    with tempfile.TemporaryDirectory() as directory:
+        # NOTE: Settings are taken from the environment on the first import
+        os.chdir(directory)
+        os.environ.update(
+            {
+                "DATABASE__NAME": "benchmark.sqlite3",
+                "TSD_FETCH_PERIODICITY": "0",
+                "SIMULATION__TURN_ON": "false",
+            }
+        )
+        sys.path.insert(0, str(ROOT_PATH))
+
+        from loguru import logger
+
+        logger.remove()
+        logger.add(sys.stderr, level="WARNING")
+
+        print(json.dumps(asyncio.run(_run(sensors, readings))))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.ingestion")
+    parser.add_argument("--sensors", type=int, nargs="+", default=[1, 10, 100])
+    parser.add_argument(
+        "--readings",
+        type=int,
+        default=400,
+        help="The number of replayed readings per sensor",
+    )
+    parser.add_argument("--scenario", type=int, help=argparse.SUPPRESS)
+    args: argparse.Namespace = parser.parse_args()
+
+    if args.scenario is not None:
+        _scenario(args.scenario, args.readings)
+        return
+
+    columns = (
+        "sensors",
+        "readings",
+        "skipped",
+        "seconds",
+        "readings_per_second",
+        "p50_ms",
+        "p95_ms",
+        "p99_ms",
+        "db_share",
+        "peak_rss_mb",
+    )
+    print(" | ".join(f"{column:>19}" for column in columns))
+
+    for sensors in args.sensors:
+        output: str = subprocess.run(
+            [
+                sys.executable,
+                "-m",
+                "benchmarks.ingestion",
+                "--scenario",
+                str(sensors),
+                "--readings",
+                str(args.readings),
+            ],
+            cwd=ROOT_PATH,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout
+        results: dict[str, Any] = json.loads(output.splitlines()[-1])
+
+        print(" | ".join(f"{results[column]:>19}" for column in columns))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,234 @@
+"""
+The comparison of the sliding matrix profile of the normal mode
+with the previous reset semantics.
+
+The reference is the previous implementation: the aampi object is
+updated by each reading, and every `window * 2` readings it is rebuilt
+from the initial baseline with the replay of the last `window` readings.
+The candidate is `modes.normal.process` with the sliding matrix profile.
+
+Both are fed with the same readings of the mock file. The initial
+baseline is built from the first readings of the file and the rest
+are processed, so anomalies of the file are reached.
+
+Reported metrics:
+    skipped -- readings with NaN distances of the reference
+    deviations -- the share of readings with the same anomaly deviation
+    distance -- the max relative difference of finite newest distances
+    infinite -- if infinite distances (non-finite readings) are the same
+    p50/p99/p99.9/max -- the latency of one reading
+
+The exit code is 1 if results are not equivalent within the tolerance.
+
+Usage:
+    python -m benchmarks.matrix_profile
+    python -m benchmarks.matrix_profile --file mock/tsd/18AIJ012A.csv
+"""
+
+import argparse
+import pickle
+import sys
+from datetime import datetime
+from pathlib import Path
+from time import perf_counter
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+from stumpy import aampi
+
+from src.config import settings
+from src.domain.anomaly_detection import AnomalyDeviation
+from src.domain.anomaly_detection.models import MatrixProfile
+from src.domain.anomaly_detection.services.processing.modes import normal
+from src.domain.anomaly_detection.streaming import SlidingMatrixProfile
+from src.domain.tsd import TsdFlat
+
+ROOT_PATH = Path(__file__).parent.parent
+
+# Distances are equal up to round-off errors of different algorithms
+TOLERANCE = 1e-6
+
+
+def _deviation(dis: float, max_dis: np.float64) -> AnomalyDeviation:
+    dis_lvl = dis / max_dis * 100
+
+    if dis_lvl < settings.anomaly_detection.warning:
+        return AnomalyDeviation.OK
+    elif dis_lvl < settings.anomaly_detection.alert:
+        return AnomalyDeviation.WARNING
+
+    return AnomalyDeviation.CRITICAL
+
+
+def _reference(
+    raw: bytes, values: np.ndarray, window: int
+) -> tuple[list[float], list[float]]:
+    """The previous implementation of the normal mode
+    without building the anomaly detection.
+    """
+
+    baseline: aampi = pickle.loads(raw)
+    counter: int = 0
+    last_values: list[float] = []
+    distances: list[float] = []
+    latencies: list[float] = []
+
+    for value in values:
+        started_at: float = perf_counter()
+
+        if counter >= window * 2:
+            counter = window
+            baseline = pickle.loads(raw)
+            last_values = last_values[-window:]
+            for last_value in last_values:
+                baseline.update(last_value)
+
+        baseline.update(value)
+        counter += 1
+        last_values.append(value)
+        distances.append(float(baseline.P_[-1]))
+
+        latencies.append(perf_counter() - started_at)
+
+    return distances, latencies
+
+
+def _candidate(
+    raw: bytes, values: np.ndarray
+) -> tuple[list[float], list[AnomalyDeviation], list[float]]:
+    baseline: aampi = pickle.loads(raw)
+    max_dis: np.float64 = np.float64(max(baseline.P_))
+    matrix_profile = MatrixProfile(
+        max_dis=max_dis,
+        baseline=baseline,
+        sliding=SlidingMatrixProfile(baseline),
+        fb_max_dis=max_dis,
+        fb_baseline=baseline,
+        fb_baseline_start=baseline,
+    )
+    sensor = SimpleNamespace(
+        configuration=SimpleNamespace(
+            anomaly_detection_initial_baseline=pickle.loads(raw)
+        )
+    )
+
+    # Distances are taken from the sliding matrix profile
+    distances: list[float] = []
+    distance = SlidingMatrixProfile.distance
+
+    def spy(self):
+        distances.append(float(result := distance(self)))
+        return result
+
+    SlidingMatrixProfile.distance = spy  # type: ignore[method-assign]
+
+    deviations: list[AnomalyDeviation] = []
+    latencies: list[float] = []
+
+    for index, value in enumerate(values):
+        tsd = TsdFlat(
+            id=index + 1,
+            ppmv=np.float64(value),
+            timestamp=datetime.now(),
+            sensor_id=1,
+        )
+        started_at: float = perf_counter()
+
+        # NOTE: The dispatcher turns the capacity flag on
+        matrix_profile.initial_values_full_capacity = (
+            matrix_profile.counter >= matrix_profile.window
+        )
+        result = normal.process(
+            matrix_profile, tsd, sensor  # type: ignore[arg-type]
+        )
+
+        latencies.append(perf_counter() - started_at)
+        deviations.append(result.value)
+
+    SlidingMatrixProfile.distance = distance  # type: ignore[method-assign]
+
+    return distances, deviations, latencies
+
+
+def _latency(latencies: list[float]) -> str:
+    p50, p99, p999 = np.percentile(latencies, [50, 99, 99.9]) * 1000
+    return (
+        f"p50={p50:.3f}ms p99={p99:.3f}ms p99.9={p999:.3f}ms "
+        f"max={max(latencies) * 1000:.3f}ms"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument(
+        "--file", type=Path, default=ROOT_PATH / "mock/tsd/trestakk_demo.csv"
+    )
+    parser.add_argument("--baseline-size", type=int, default=2160)
+    parser.add_argument("--readings", type=int, default=3000)
+    args = parser.parse_args()
+
+    window: int = settings.anomaly_detection.window_size
+    values: np.ndarray = pd.read_csv(args.file, index_col=0)[
+        "Values"
+    ].to_numpy(dtype=np.float64)[: args.baseline_size + args.readings]
+    raw: bytes = pickle.dumps(aampi(values[: args.baseline_size], window))
+    readings: np.ndarray = values[args.baseline_size :]
+
+    # NOTE: Numba functions of stumpy are compiled before measurements
+    _reference(raw, readings[:2], window)
+
+    reference_distances, reference_latencies = _reference(
+        raw, readings, window
+    )
+    distances, deviations, latencies = _candidate(raw, readings)
+
+    # NOTE: Distances are compared only when the capacity is full.
+    #       The recursion of aampi loses the precision for huge values
+    #       (NaN distances), so such readings are not compared.
+    reference: np.ndarray = np.array(reference_distances[window:])
+    candidate: np.ndarray = np.array(distances)
+    compared: np.ndarray = ~np.isnan(reference)
+    finite: np.ndarray = np.isfinite(reference)
+
+    difference: float = float(
+        np.max(
+            np.abs(candidate - reference)[finite]
+            / np.maximum(reference[finite], np.finfo(np.float64).tiny),
+            initial=0.0,
+        )
+    )
+    infinite: bool = bool(np.all(np.isinf(candidate[compared & ~finite])))
+
+    max_dis: np.float64 = np.float64(max(pickle.loads(raw).P_))
+    expected: list[AnomalyDeviation] = [
+        AnomalyDeviation.UNDEFINED
+    ] * window + [_deviation(dis, max_dis) for dis in reference]
+    agreement: float = float(
+        np.mean(
+            [
+                a == b
+                for a, b, is_compared in zip(
+                    expected,
+                    deviations,
+                    np.concatenate((np.ones(window, dtype=bool), compared)),
+                )
+                if is_compared
+            ]
+        )
+    )
+
+    print(f"{args.file.name}: {len(readings)} readings, window {window}")
+    print(f"  skipped     {np.sum(~compared)} NaN reference distances")
+    print(f"  deviations  {agreement:.2%} equal")
+    print(f"  distance    max relative difference {difference:.2e}")
+    print(f"  infinite    {'equal' if infinite else 'different'}")
+    print(f"  reset       {_latency(reference_latencies)}")
+    print(f"  sliding     {_latency(latencies)}")
+
+    if agreement < 1 or difference > TOLERANCE or not infinite:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+"""
+The micro-benchmark of the per-reading matrix profile state updates.
+
+The previous state is the validated pydantic model (`validate_assignment`)
+with last values in the list that is sliced on each reset. The current
+state is the slotted dataclass with last values in the preallocated ring.
+
+Only the bookkeeping of the normal mode is measured (the counter,
+last values, the reset and the last reading id), since the distance
+computation is the same for both.
+
+Reported metrics:
+    ns/reading -- the mean time of the state update of one reading
+    last values -- the size of last values right before the reset
+
+Usage:
+    python -m benchmarks.matrix_profile_state
+    python -m benchmarks.matrix_profile_state --readings 1000000
+"""
+
+import argparse
+from time import perf_counter
+from typing import Any, Callable
+
+import numpy as np
+from pydantic import Field
+from stumpy import aampi
+
+from src.config import settings
+from src.domain.anomaly_detection.models import MatrixProfile
+from src.domain.anomaly_detection.streaming import SlidingMatrixProfile
+from src.infrastructure.memory import estimate_size
+from src.infrastructure.models import InternalModel
+
+
+class _ValidatedMatrixProfile(InternalModel):
+    """The previous representation of the matrix profile state."""
+
+    max_dis: np.float64
+    counter: int = 0
+    last_values: list[np.float64] = Field(default_factory=list)
+    warning: int = settings.anomaly_detection.warning
+    alert: int = settings.anomaly_detection.alert
+    window: int = settings.anomaly_detection.window_size
+    baseline: aampi
+    sliding: SlidingMatrixProfile
+    fb_max_dis: np.float64
+    fb_baseline_start: aampi
+    fb_baseline: aampi
+    initial_values_full_capacity: bool = False
+    last_time_series_data_id: int | None = None
+
+
+def _update_validated(
+    matrix_profile: Any, value: np.float64, id_: int
+) -> None:
+    if matrix_profile.counter >= (matrix_profile.window * 2):
+        matrix_profile.counter = matrix_profile.window
+        matrix_profile.baseline = matrix_profile.baseline
+        matrix_profile.last_values = matrix_profile.last_values[
+            -matrix_profile.window :
+        ]
+        matrix_profile.sliding = matrix_profile.sliding
+
+    matrix_profile.counter += 1
+    matrix_profile.last_values.append(value)
+    matrix_profile.last_time_series_data_id = id_
+
+
+def _update(matrix_profile: Any, value: np.float64, id_: int) -> None:
+    if matrix_profile.counter >= (matrix_profile.window * 2):
+        matrix_profile.counter = matrix_profile.window
+        matrix_profile.baseline = matrix_profile.baseline
+        matrix_profile.last_values.last(matrix_profile.window)
+        matrix_profile.sliding = matrix_profile.sliding
+
+    matrix_profile.counter += 1
+    matrix_profile.last_values.append(ppmv=value)
+    matrix_profile.last_time_series_data_id = id_
+
+
+def _measure(
+    matrix_profile: Any,
+    update: Callable[[Any, np.float64, int], None],
+    values: np.ndarray,
+) -> float:
+    started_at: float = perf_counter()
+
+    for id_, value in enumerate(values):
+        update(matrix_profile, value, id_)
+
+    return (perf_counter() - started_at) / len(values) * 1e9
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--readings", type=int, default=200_000)
+    args = parser.parse_args()
+
+    window: int = settings.anomaly_detection.window_size
+    rng = np.random.default_rng(0)
+    baseline = aampi(40 + rng.normal(0, 3, window * 4), window)
+    values: np.ndarray = 40 + rng.normal(0, 3, args.readings)
+    state: dict[str, Any] = {
+        "max_dis": np.float64(max(baseline.P_)),
+        "baseline": baseline,
+        "sliding": SlidingMatrixProfile(baseline),
+        "fb_max_dis": np.float64(max(baseline.P_)),
+        "fb_baseline": baseline,
+        "fb_baseline_start": baseline,
+    }
+
+    results: dict[str, tuple[float, int]] = {}
+    for name, factory, update in (
+        ("pydantic", _ValidatedMatrixProfile, _update_validated),
+        ("dataclass", MatrixProfile, _update),
+    ):
+        matrix_profile = factory(**state)
+        nanoseconds: float = _measure(matrix_profile, update, values)
+
+        # NOTE: The size is measured when last values are the biggest
+        matrix_profile = factory(**state)
+        _measure(matrix_profile, update, values[: window * 2])
+        results[name] = (
+            nanoseconds,
+            estimate_size(matrix_profile.last_values),
+        )
+
+    print(f"{args.readings} readings, window {window}")
+    for name, (nanoseconds, size) in results.items():
+        print(
+            f"  {name:<10} {nanoseconds:8.0f} ns/reading   "
+            f"last values {size / 1024:6.1f} KiB"
+        )
+    print(
+        f"  speedup    {results['pydantic'][0] / results['dataclass'][0]:.1f}x"
+    )
+
+
+if __name__ == "__main__":
+    main()
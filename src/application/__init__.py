@@ -1,6 +1,9 @@
 from . import (  # noqa: F401
     anomaly_detection,
+    data_lake,
     events,
+    lifecycle,
+    memory,
     sensors,
     simulation,
     templates,
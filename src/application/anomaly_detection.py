@@ -7,22 +7,79 @@ It depends on:
     - the time series data that is fetched from the external source,
     - fields
     - anomaly deviation calculation logic
+
+Matrix profiles are updated either in threads of the main process
+or in worker processes (the worker-pool mode), where each sensor
+is pinned to one worker by the hash of its id.
+
+Readings which scoring failed are skipped, since the failure is mostly
+caused by the sensor state. They are logged by ids and counted
+in stats, so they could be backfilled later.
 """
 
-from src.application.data_lake import data_lake
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+from loguru import logger
+
+from src.application import sensors
+from src.application.data_lake import SharedLakeItem, data_lake
+from src.config import settings
 from src.domain import events
 from src.domain.anomaly_detection import (
     ANOMALY_DEVIATION_TO_SENSOR_EVENT_TYPE_MAPPING,
     AnomalyDetection,
-    AnomalyDetectionFlat,
     AnomalyDetectionRepository,
     AnomalyDetectionUncommited,
     AnomalyDeviation,
     services,
 )
-from src.domain.tsd import Tsd
+from src.domain.sensors import Sensor
+from src.domain.tsd import TsdFlat
+from src.infrastructure.application.shards import ShardedPool
 from src.infrastructure.database import transaction
-from src.infrastructure.errors import UnprocessableError
+from src.infrastructure.errors import NotFoundError
+from src.infrastructure.models import InternalModel
+
+# NOTE: Matrix profiles are changed only while batches are scored,
+#       so snapshots are taken between batches
+_SCORING_LOCK = asyncio.Lock()
+_STOPPED = asyncio.Event()
+
+# NOTE: Worker processes exist only in the worker-pool mode
+_WORKERS: ShardedPool | None = None
+# NOTE: Sensors that are kept by workers, so they are not sent again
+_SENT_SENSORS: dict[int, Sensor] = {}
+
+
+class AnomalyDetectionStats(InternalModel):
+    """Counters of the live processing since the start."""
+
+    # The number of readings that are scored
+    scored: int = 0
+    # The number of readings that are skipped, since their scoring failed
+    failed: int = 0
+
+
+_STATS = AnomalyDetectionStats()
+
+
+def stats() -> AnomalyDetectionStats:
+    return _STATS.copy()
+
+
+def _fail(
+    sensor_id: int, readings: list[TsdFlat], error: BaseException | None
+) -> None:
+    """Report readings of the sensor which scoring failed.
+    The error is omitted if it is logged by the worker process.
+    """
+
+    _STATS.failed += len(readings)
+    logger.opt(exception=error).error(
+        f"The anomaly detection of sensor {sensor_id} failed. "
+        f"Readings are skipped: {[tsd.id for tsd in readings]}"
+    )
 
 
 @transaction
@@ -35,6 +92,23 @@ async def get_historical_data(sensor_id: int) -> list[AnomalyDetection]:
     ]
 
 
+@transaction
+async def get_missed_data(
+    sensor_id: int, after_id: int, limit: int
+) -> list[AnomalyDetection]:
+    """Get the latest data (up to the limit) after the id."""
+
+    try:
+        return [
+            instance
+            async for instance in AnomalyDetectionRepository().by_sensor(
+                sensor_id, after_id=after_id, limit=limit
+            )
+        ]
+    except NotFoundError:
+        return []
+
+
 async def _create_sensor_event(
     schema: events.sensors.EventUncommited,
 ) -> events.sensors.Event:
@@ -50,54 +124,516 @@ async def process():
     """Consume fetched data from data lake and detect the anomaly.
     The result is produced back to data lake and saved
     to the database for making the history available.
+
+    Readings are processed by micro-batches of all readings that are
+    available in the data lake. Matrix profiles of different sensors are
+    updated in parallel in the thread pool (or in worker processes),
+    so the event loop handles only I/O. Readings of the same sensor are
+    processed in the consumed order, so results are the same as if they
+    are processed one by one.
+    Anomaly detections of the whole batch are saved in one transaction.
     """
 
-    async for tsd in data_lake.time_series_data.consume():  # type is Tsd
-        try:
-            create_schema: AnomalyDetectionUncommited = (
-                services.processing.dispatch(tsd)
+    scoring = settings.anomaly_detection.scoring
+    pool = ThreadPoolExecutor(
+        max_workers=scoring.workers, thread_name_prefix="scoring"
+    )
+
+    try:
+        # NOTE: The processing resumes from the last processed batch
+        #       if the data lake log is turned on
+        async for batch in data_lake.time_series_data.consume_batches(
+            limit=scoring.batch_size, consumer="anomaly_detection"
+        ):
+            async with _SCORING_LOCK:
+                # NOTE: The batch is not committed, so it is consumed
+                #       again after the restart
+                if _STOPPED.is_set():
+                    break
+
+                try:
+                    await _process_batch(pool, batch)
+                except Exception:
+                    # NOTE: The failure of one batch
+                    #       does not stop the processing
+                    logger.exception(
+                        f"The anomaly detection of {len(batch)} "
+                        "readings failed"
+                    )
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+async def _score(
+    pool: ThreadPoolExecutor, readings: list[TsdFlat]
+) -> list[AnomalyDetectionUncommited]:
+    """Update the matrix profile of the sensor over its readings
+    in the thread pool or in the worker process of the sensor.
+    """
+
+    sensor_id: int = readings[0].sensor_id
+
+    # NOTE: The sensor is taken from the registry
+    #       instead of joining it for each reading
+    try:
+        sensor: Sensor = await sensors.resolve(sensor_id)
+    except NotFoundError:
+        # NOTE: Readings of the removed sensor are skipped
+        return []
+
+    try:
+        if (workers := _get_workers()) is not None:
+            results = await _score_in_worker(workers, readings, sensor)
+        else:
+            results = await asyncio.get_running_loop().run_in_executor(
+                pool, services.processing.dispatch_many, readings, sensor
             )
-        except UnprocessableError:
-            # NOTE: Skipped if matrix profile does not have enough values
-            continue
+    except Exception as error:
+        # NOTE: The failure of one sensor does not affect others
+        _fail(sensor_id, readings, error)
+        return []
 
-        await _process(create_schema=create_schema, tsd=tsd)
+    _STATS.scored += len(readings)
 
+    return results
 
-@transaction
-async def _process(create_schema: AnomalyDetectionUncommited, tsd: Tsd):
-    # Save the anomaly detection to the database
-    repository = AnomalyDetectionRepository()
-    anomaly_detection_flat: AnomalyDetectionFlat = await repository.create(
-        create_schema
+
+async def _process_batch(pool: ThreadPoolExecutor, batch: list[TsdFlat]):
+    readings_by_sensor: dict[int, list[TsdFlat]] = {}
+    for tsd in batch:
+        readings_by_sensor.setdefault(tsd.sensor_id, []).append(tsd)
+
+    workers: ShardedPool | None = _get_workers()
+    shared: SharedLakeItem | None = data_lake.time_series_data_shared
+
+    # NOTE: Workers that crashed since the last batch are restarted
+    #       and matrix profiles of their sensors are rebuilt
+    if workers is not None and (shards := workers.restart_broken()):
+        await _recover_workers(workers, shards)
+
+    results: list[list[AnomalyDetectionUncommited]]
+    if (
+        workers is not None
+        and shared is not None
+        and len(batch) <= shared.capacity
+    ):
+        results = await _score_shared(
+            workers, shared, batch, readings_by_sensor
+        )
+    else:
+        results = await asyncio.gather(
+            *(
+                _score(pool, readings)
+                for readings in readings_by_sensor.values()
+            )
+        )
+
+    # NOTE: Anomaly detections are saved in the order of readings
+    create_schemas: list[AnomalyDetectionUncommited] = sorted(
+        (schema for schemas in results for schema in schemas),
+        key=lambda schema: schema.time_series_data_id,
     )
-    anomaly_detection: AnomalyDetection = await repository.get(
-        anomaly_detection_flat.id
+
+    await _process(
+        create_schemas=create_schemas,
+        tsd_by_id={tsd.id: tsd for tsd in batch},
     )
 
+
+@transaction
+async def _process(
+    create_schemas: list[AnomalyDetectionUncommited],
+    tsd_by_id: dict[int, TsdFlat],
+):
+    # Save anomaly detections to the database
+    # NOTE: Readings are already known, so they are not joined
+    anomaly_detections: list[AnomalyDetection] = [
+        AnomalyDetection(
+            id=instance.id,
+            value=instance.value,
+            interactive_feedback_mode=instance.interactive_feedback_mode,
+            time_series_data=tsd_by_id[instance.time_series_data_id],
+        )
+        for instance in (
+            await AnomalyDetectionRepository().bulk_create(create_schemas)
+        )
+    ]
+
+    for anomaly_detection in anomaly_detections:
+        await _handle(anomaly_detection)
+
+
+async def _handle(anomaly_detection: AnomalyDetection):
+    """Handle the sensor event and update the data lake."""
+
+    tsd: TsdFlat = anomaly_detection.time_series_data
+
     # Handle the sensor event
     current_event_type: events.sensors.EventType = (
         ANOMALY_DEVIATION_TO_SENSOR_EVENT_TYPE_MAPPING[anomaly_detection.value]
     )
 
     if event_create_schema := await events.sensors.services.process(
-        sensor_id=anomaly_detection.time_series_data.sensor_id,
+        sensor_id=tsd.sensor_id,
         current_event_type=current_event_type,
     ):
         event: events.sensors.Event = await _create_sensor_event(
             event_create_schema
         )
-        data_lake.events_by_sensor[
-            anomaly_detection.time_series_data.sensor_id
-        ].storage.append(event)
+        data_lake.events_by_sensor.put_nowait(tsd.sensor_id, event)
 
     # Update the data lake
-    data_lake.anomaly_detections_by_sensor[tsd.sensor.id].storage.append(
-        anomaly_detection
+    data_lake.anomaly_detections_by_sensor.put_nowait(
+        tsd.sensor_id, anomaly_detection
     )
 
     # NOTE: Simulation performs only if CRITICAL anomaly deviation
     if anomaly_detection.value == AnomalyDeviation.CRITICAL:
-        data_lake.anomaly_detections_for_simulation.storage.append(
+        data_lake.anomaly_detections_for_simulation.put_nowait(
             anomaly_detection
         )
+
+
+# ************************************************
+# ********** Matrix profiles snapshots **********
+# ************************************************
+@transaction
+async def _get_last_readings(
+    sensor_ids: list[int], limit: int
+) -> dict[int, tuple[int, list[TsdFlat]]]:
+    return await AnomalyDetectionRepository().last_readings(
+        sensor_ids, limit=limit
+    )
+
+
+async def _restore(
+    sensor_ids: list[int],
+    snapshots: dict[int, services.processing.snapshots.MatrixProfileSnapshot],
+    rebuild: bool,
+) -> tuple[int, int]:
+    """Restore matrix profiles of sensors in the main process.
+    The number of restored and rebuilt matrix profiles is returned.
+    """
+
+    readings_by_sensor: dict[
+        int, tuple[int, list[TsdFlat]]
+    ] = await _get_last_readings(
+        sensor_ids, limit=settings.anomaly_detection.window_size * 2
+    )
+
+    restored: list[int] = []
+    rebuilt: list[tuple[Sensor, list[TsdFlat], int]] = []
+
+    for sensor_id in sensor_ids:
+        total, readings = readings_by_sensor.get(sensor_id, (0, []))
+        last_id: int | None = readings[-1].id if readings else None
+
+        snapshot = snapshots.get(sensor_id)
+        if (
+            snapshot is not None
+            and snapshot.matrix_profile.last_time_series_data_id == last_id
+        ):
+            services.processing.snapshots.restore(sensor_id, snapshot)
+            restored.append(sensor_id)
+        elif rebuild is True and readings:
+            rebuilt.append((await sensors.resolve(sensor_id), readings, total))
+
+    # NOTE: Matrix profiles are built in the thread, since the baseline
+    #       of each sensor is processed at once
+    for sensor, readings, total in rebuilt:
+        await asyncio.to_thread(
+            services.processing.snapshots.rebuild, sensor, readings, total
+        )
+
+    if (workers := _get_workers()) is not None:
+        await _move_to_workers(workers)
+
+    return len(restored), len(rebuilt)
+
+
+async def restore_matrix_profiles() -> None:
+    """Restore matrix profiles of running sensors from the snapshot.
+    Matrix profiles that are missed or outdated in the snapshot
+    are rebuilt from last processed readings.
+
+    It should be done after sensors are started
+    and before the anomaly detection processing.
+    """
+
+    config = settings.anomaly_detection.snapshots
+    if config.enabled is not True and config.rebuild is not True:
+        return
+
+    snapshots: dict[
+        int, services.processing.snapshots.MatrixProfileSnapshot
+    ] = {}
+    if config.enabled is True:
+        snapshots = await asyncio.to_thread(
+            services.processing.snapshots.load, config.path
+        )
+
+    # NOTE: Lake items exist only for running sensors
+    restored, rebuilt = await _restore(
+        list(data_lake.anomaly_detections_by_sensor),
+        snapshots,
+        rebuild=config.rebuild,
+    )
+
+    logger.success(
+        f"Matrix profiles are restored: {restored} from the snapshot, "
+        f"{rebuilt} from last readings"
+    )
+
+
+async def _collect_matrix_profiles() -> dict[
+    int, services.processing.snapshots.MatrixProfileSnapshot
+]:
+    if (workers := _get_workers()) is None:
+        return services.processing.snapshots.collect()
+
+    snapshots: dict[
+        int, services.processing.snapshots.MatrixProfileSnapshot
+    ] = {}
+    for part in await asyncio.gather(
+        *(
+            asyncio.wrap_future(future)
+            for future in workers.broadcast(
+                services.processing.workers.collect
+            )
+        )
+    ):
+        snapshots.update(part)
+
+    return snapshots
+
+
+async def _save_matrix_profiles() -> None:
+    snapshots = await _collect_matrix_profiles()
+
+    await asyncio.to_thread(
+        services.processing.snapshots.save,
+        settings.anomaly_detection.snapshots.path,
+        snapshots,
+    )
+    logger.info(f"Matrix profiles of {len(snapshots)} sensors are saved")
+
+
+async def save_matrix_profiles() -> None:
+    """Save the snapshot of matrix profiles periodically."""
+
+    if settings.anomaly_detection.snapshots.enabled is not True:
+        return
+
+    while True:
+        await asyncio.sleep(settings.anomaly_detection.snapshots.interval)
+
+        async with _SCORING_LOCK:
+            try:
+                await _save_matrix_profiles()
+            except Exception:
+                logger.exception("The matrix profiles snapshot is not saved")
+
+
+async def stop() -> None:
+    """Stop scoring next batches and save the snapshot of matrix profiles,
+    so they match readings that are processed before the shutdown.
+    """
+
+    async with _SCORING_LOCK:
+        _STOPPED.set()
+
+        if settings.anomaly_detection.snapshots.enabled is True:
+            await _save_matrix_profiles()
+
+        await _stop_workers()
+
+
+async def discard(sensor_id: int) -> None:
+    """Forget the matrix profile and the interactive feedback mode state
+    of the sensor that is removed (in its worker process as well).
+    """
+
+    async with _SCORING_LOCK:
+        services.processing.discard(sensor_id)
+        _SENT_SENSORS.pop(sensor_id, None)
+
+        if (workers := _get_workers()) is not None:
+            await asyncio.wrap_future(
+                workers.submit(
+                    sensor_id, services.processing.workers.discard, sensor_id
+                )
+            )
+
+
+# ************************************************
+# ********** Worker processes **********
+# ************************************************
+def _get_workers() -> ShardedPool | None:
+    """Return worker processes if the worker-pool mode is turned on.
+    Processes are started on the first usage.
+    """
+
+    global _WORKERS
+
+    if (
+        _WORKERS is None
+        and settings.anomaly_detection.scoring.processes > 0
+        and not _STOPPED.is_set()
+    ):
+        _WORKERS = ShardedPool(
+            shards=settings.anomaly_detection.scoring.processes,
+            name="anomaly detection",
+        )
+
+    return _WORKERS
+
+
+async def _stop_workers() -> None:
+    global _WORKERS
+
+    if _WORKERS is not None:
+        await asyncio.to_thread(_WORKERS.shutdown)
+        _WORKERS = None
+
+
+async def _score_in_worker(
+    workers: ShardedPool, readings: list[TsdFlat], sensor: Sensor
+) -> list[AnomalyDetectionUncommited]:
+    # NOTE: The sensor is sent again only if the registry entry is replaced
+    sent: bool = _SENT_SENSORS.get(sensor.id) is sensor
+
+    try:
+        results: list[AnomalyDetectionUncommited] = await asyncio.wrap_future(
+            workers.submit(
+                sensor.id,
+                services.processing.workers.score,
+                readings,
+                None if sent else sensor,
+            )
+        )
+    except Exception:
+        _SENT_SENSORS.pop(sensor.id, None)
+        raise
+
+    _SENT_SENSORS[sensor.id] = sensor
+
+    return results
+
+
+async def _score_shared(
+    workers: ShardedPool,
+    shared: SharedLakeItem,
+    batch: list[TsdFlat],
+    readings_by_sensor: dict[int, list[TsdFlat]],
+) -> list[list[AnomalyDetectionUncommited]]:
+    """Write the batch to the shared memory once, so each worker
+    reads it and scores readings of its own sensors.
+    """
+
+    sensors_by_shard: dict[int, dict[int, Sensor]] = {}
+    for sensor_id in readings_by_sensor:
+        try:
+            sensor: Sensor = await sensors.resolve(sensor_id)
+        except NotFoundError:
+            # NOTE: Readings of the removed sensor are skipped
+            continue
+
+        sensors_by_shard.setdefault(workers.shard(sensor_id), {})[
+            sensor_id
+        ] = sensor
+
+    start, stop = shared.put_many(batch)
+
+    async def _submit(
+        shard: int, group: dict[int, Sensor]
+    ) -> dict[int, list[AnomalyDetectionUncommited]]:
+        # NOTE: The sensor is sent again only
+        #       if the registry entry is replaced
+        return await asyncio.wrap_future(
+            workers.submit_to(
+                shard,
+                services.processing.workers.score_shared,
+                shared.name,
+                start,
+                stop,
+                {
+                    sensor_id: (
+                        None
+                        if _SENT_SENSORS.get(sensor_id) is sensor
+                        else sensor
+                    )
+                    for sensor_id, sensor in group.items()
+                },
+            )
+        )
+
+    responses = await asyncio.gather(
+        *(_submit(shard, group) for shard, group in sensors_by_shard.items()),
+        return_exceptions=True,
+    )
+
+    results: list[list[AnomalyDetectionUncommited]] = []
+    for group, response in zip(sensors_by_shard.values(), responses):
+        for sensor_id, sensor in group.items():
+            readings: list[TsdFlat] = readings_by_sensor[sensor_id]
+
+            if isinstance(response, BaseException):
+                _SENT_SENSORS.pop(sensor_id, None)
+                _fail(sensor_id, readings, response)
+            elif sensor_id not in response:
+                # NOTE: The worker logs the error of the sensor
+                _SENT_SENSORS.pop(sensor_id, None)
+                _fail(sensor_id, readings, error=None)
+            else:
+                _SENT_SENSORS[sensor_id] = sensor
+                _STATS.scored += len(readings)
+                results.append(response[sensor_id])
+
+    return results
+
+
+async def _move_to_workers(workers: ShardedPool) -> None:
+    """Move matrix profiles that are built by the main process
+    to workers of their sensors.
+    """
+
+    snapshots = services.processing.snapshots.collect()
+
+    await asyncio.gather(
+        *(
+            asyncio.wrap_future(
+                workers.submit(
+                    sensor_id,
+                    services.processing.workers.restore,
+                    sensor_id,
+                    snapshot,
+                )
+            )
+            for sensor_id, snapshot in snapshots.items()
+        )
+    )
+
+    for sensor_id in snapshots:
+        services.processing.discard(sensor_id)
+
+
+async def _recover_workers(workers: ShardedPool, shards: list[int]) -> None:
+    """Rebuild matrix profiles of sensors of restarted workers
+    from last processed readings, so they are not started from scratch.
+    """
+
+    for sensor_id in list(_SENT_SENSORS):
+        if workers.shard(sensor_id) in shards:
+            del _SENT_SENSORS[sensor_id]
+
+    sensor_ids: list[int] = [
+        sensor_id
+        for sensor_id in data_lake.anomaly_detections_by_sensor
+        if workers.shard(sensor_id) in shards
+    ]
+    _, rebuilt = await _restore(sensor_ids, snapshots={}, rebuild=True)
+
+    logger.warning(
+        f"Matrix profiles of {rebuilt} sensors of restarted "
+        "anomaly detection workers are rebuilt"
+    )
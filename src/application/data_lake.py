@@ -10,46 +10,849 @@ Or it should be placed in the infrastructure layer which is more preferable.
 """
 
 import asyncio
-from collections import defaultdict, deque
-from contextlib import suppress
-from dataclasses import dataclass
+import pickle
+import shutil
+import tempfile
+from dataclasses import dataclass, fields
+from enum import StrEnum, auto
 from functools import partial
-from typing import AsyncGenerator, Deque, Generic, TypeVar
+from pathlib import Path
+from typing import (
+    IO,
+    AsyncGenerator,
+    Awaitable,
+    Callable,
+    Generic,
+    Iterator,
+    TypeVar,
+    cast,
+)
+
+import numpy as np
 
-from src.config import settings
+from src.config import DataLakeItemSettings, settings
 from src.domain.anomaly_detection import AnomalyDetection
 from src.domain.events import sensors, system
-from src.domain.tsd import Tsd
+from src.domain.tsd import TSD_RECORD, TsdFlat, naive_utc, to_records
+from src.infrastructure.append_log import AppendLog
+from src.infrastructure.columnar_ring import ColumnarRing
+from src.infrastructure.models import InternalModel
+from src.infrastructure.shared_memory import SharedRing
+
+__all__ = (
+    "OverflowPolicy",
+    "LakeItemStats",
+    "LakeSubscription",
+    "LakeItem",
+    "LakeItemsBySensor",
+    "SharedLakeItem",
+    "RECENT_READINGS_COLUMNS",
+    "RecentReadingsBySensor",
+    "DataLake",
+    "data_lake",
+    "open_shared_memory",
+    "close_shared_memory",
+    "open_logs",
+    "close_logs",
+)
 
 T = TypeVar("T")
 
 
-# TODO: The deque size should be changed to the window size 2 times.
-# ------------------------------------------------------------------
+class OverflowPolicy(StrEnum):
+    """Defines what happens with the new item if the lake item is full.
+
+    BLOCK: the producer waits until the consumer frees the space
+    DROP_OLDEST: the oldest item is removed to free the space
+    DROP_NEWEST: the new item is rejected
+    SPILL: the new item is written to the file on the disk
+        and it is loaded back when the consumer frees the space
+    """
+
+    BLOCK = auto()
+    DROP_OLDEST = auto()
+    DROP_NEWEST = auto()
+    SPILL = auto()
+
+
+class LakeItemStats(InternalModel):
+    """The snapshot of the lake item counters."""
+
+    capacity: int | None
+    overflow_policy: OverflowPolicy
+    subscribers: int
+
+    # The number of items that are not read by the slowest subscriber
+    lag: int
+    # The max lag since the start
+    high_water: int
+
+    produced: int
+    # The number of reads by all subscribers
+    consumed: int
+    dropped: int
+    # The number of items that are waiting for subscribers on the disk
+    spilled: int
+    # The total time (in seconds) that producers were blocked
+    blocked_seconds: float
+
+
+class _SpillFile(Generic[T]):
+    """The append-only file that stores items which do not fit
+    into the memory. Items are read back in the same order.
+    """
+
+    def __init__(self) -> None:
+        self._file: IO[bytes] | None = None
+        self._read_offset: int = 0
+        self.size: int = 0
+
+    def append(self, item: T) -> None:
+        if self._file is None:
+            self._file = tempfile.TemporaryFile(
+                dir=settings.data_lake.spill_dir
+            )
+
+        self._file.seek(0, 2)
+        pickle.dump(item, self._file)
+        self.size += 1
+
+    def pop_many(self, limit: int) -> Iterator[T]:
+        if self._file is None:
+            return
+
+        self._file.seek(self._read_offset)
+        while self.size and limit:
+            yield pickle.load(self._file)
+            self._read_offset = self._file.tell()
+            self.size -= 1
+            limit -= 1
+
+        # NOTE: The file is truncated as soon as all items are read back
+        if not self.size:
+            self.clear()
+
+    def clear(self) -> None:
+        if self._file is not None:
+            self._file.close()
+
+        self._file = None
+        self._read_offset = 0
+        self.size = 0
+
+
+class LakeSubscription(Generic[T]):
+    """The independent read cursor of the lake item.
+    The position is the sequence number of the next item to read.
+    """
+
+    def __init__(self, item: "LakeItem[T]", position: int) -> None:
+        self._item: LakeItem[T] = item
+        self.position: int = position
+
+    def __len__(self) -> int:
+        """The number of items that are waiting for this subscriber."""
+
+        return self._item.tail - self.position
+
+    def get_nowait(self) -> T:
+        """Get the next item without removing it for other subscribers.
+        Raises IndexError if there are no new items.
+        """
+
+        return self._item._read(self)
+
+    def get_many(self, limit: int | None = None) -> list[T]:
+        """Get all new items (up to the limit) at once."""
+
+        return self._item._read_many(self, limit)
+
+    async def wait(self) -> None:
+        """Wait until the new item is produced."""
+
+        while not len(self) and not self._item.closed:
+            # NOTE: The shared future must not be cancelled
+            #       together with one of waiting subscribers
+            await asyncio.shield(self._item._waiter())
+
+
 class LakeItem(Generic[T]):
+    """The bounded ring buffer between producers and subscribers.
+
+    Each item gets the sequence number and each subscriber has its own
+    read cursor, so all subscribers get all items without copying them.
+    The capacity limits the number of items that are not read by some
+    subscriber yet. Items that are read by all subscribers stay
+    in the ring until they are overwritten.
+
+    If the append log is opened, each item is also written to it
+    and the sequence number is the offset in the log. Subscribers that
+    are behind the ring (e.g. the consumer that resumes from the committed
+    offset after the restart) read items from the log.
+
+    Example:
+        >>> item = LakeItem[int](capacity=100, policy=OverflowPolicy.BLOCK)
+        >>> await item.put(1)  # waits if the policy is BLOCK
+        >>> item.put_nowait(2)  # never waits
+        >>> async for value in item.consume(): ...
+    """
+
+    # The initial size of the ring if the capacity is not set
+    UNBOUNDED_INITIAL_SIZE = 64
+
     def __init__(
-        self, limit: int | None = None, init_clear: bool = True
+        self,
+        capacity: int | None = None,
+        policy: OverflowPolicy = OverflowPolicy.DROP_OLDEST,
+        from_latest: bool = True,
     ) -> None:
-        self._init_clear: bool = init_clear
-        self.storage: Deque[T] = deque(maxlen=limit)
+        # NOTE: New subscribers start from the latest item instead of
+        #       the oldest unread one, since first the historical data
+        #       is sent via websocket connection. Also, items are not
+        #       kept for future subscribers if nobody is subscribed.
+        self._from_latest: bool = from_latest
+        self.capacity: int | None = capacity
+        self.policy: OverflowPolicy = policy
+
+        self._slots: list[T | None] = [None] * (
+            capacity or self.UNBOUNDED_INITIAL_SIZE
+        )
+        # The sequence number of the oldest item in the ring
+        self.head: int = 0
+        # The sequence number of the next item
+        self.tail: int = 0
+        # All items before it are read by all subscribers
+        self._released: int = 0
+        self._subscriptions: list[LakeSubscription[T]] = []
+
+        # NOTE: The future is shared by all waiting subscribers
+        #       and it is resolved by the next produced item
+        self._new_item: asyncio.Future[None] | None = None
+
+        self._log: AppendLog | None = None
+        # Subscribers are stopped when the lake item is closed
+        self.closed: bool = False
+
+        self._spill: _SpillFile[T] = _SpillFile()
+        self._not_full = asyncio.Event()
+        self._not_full.set()
+
+        self._high_water: int = 0
+        self._produced: int = 0
+        self._consumed: int = 0
+        self._dropped: int = 0
+        self._blocked_seconds: float = 0.0
+
+    @classmethod
+    def from_settings(cls, config: DataLakeItemSettings) -> "LakeItem[T]":
+        return cls(
+            capacity=config.capacity,
+            policy=OverflowPolicy(config.overflow_policy),
+        )
+
+    def open_log(self, log: AppendLog) -> None:
+        """Write items to the append log.
+        Sequence numbers continue from the last offset in the log.
+        """
+
+        if self.tail != 0:
+            raise ValueError("The log is opened for the used lake item")
+
+        self._log = log
+        self.head = self.tail = self._released = log.next_offset
+
+    def close_log(self) -> None:
+        if self._log is not None:
+            self._log.close()
+            self._log = None
+
+    def close(self) -> None:
+        """Stop all subscribers and release retained items.
+        Producers that wait for the free space are released as well.
+        """
+
+        self.closed = True
+        self.close_log()
+        self._spill.clear()
+        self._slots = [None] * len(self._slots)
+        self.head = self._released = self.tail
+        for subscription in self._subscriptions:
+            subscription.position = self.tail
+
+        if self._new_item is not None:
+            if not self._new_item.done():
+                self._new_item.set_result(None)
+            self._new_item = None
+
+        self._not_full.set()
+
+    def _pending(self) -> int:
+        """The sequence number of the oldest item
+        that is not read by some subscriber.
+        """
+
+        if self._subscriptions:
+            return min(
+                subscription.position for subscription in self._subscriptions
+            )
+
+        return self.tail if self._from_latest else self._released
+
+    def __len__(self) -> int:
+        return self.tail - self._pending() + self._spill.size
+
+    def full(self) -> bool:
+        return (
+            not self.closed
+            and self.capacity is not None
+            and self.tail - self._pending() >= self.capacity
+        )
+
+    @property
+    def stats(self) -> LakeItemStats:
+        return LakeItemStats(
+            capacity=self.capacity,
+            overflow_policy=self.policy,
+            subscribers=len(self._subscriptions),
+            lag=len(self),
+            high_water=self._high_water,
+            produced=self._produced,
+            consumed=self._consumed,
+            dropped=self._dropped,
+            spilled=self._spill.size,
+            blocked_seconds=round(self._blocked_seconds, 3),
+        )
+
+    # ************************************************
+    # ********** Ring operations **********
+    # ************************************************
+    def _grow(self) -> None:
+        """Double the ring of the unbounded lake item."""
+
+        size: int = len(self._slots)
+        slots: list[T | None] = [None] * (size * 2)
+        for sequence in range(self.head, self.tail):
+            slots[sequence % len(slots)] = self._slots[sequence % size]
+
+        self._slots = slots
+
+    def _store(self, item: T) -> None:
+        # NOTE: Spilled items are written to the log when they are loaded
+        #       back, so offsets in the log match sequence numbers
+        if self._log is not None:
+            self._log.append(pickle.dumps(item))
+
+        if self.tail - self.head == len(self._slots):
+            if self.capacity is None:
+                # NOTE: Items that are read by all subscribers are
+                #       overwritten, so the ring grows only by unread items
+                self.head = max(self.head, self._pending())
+                if self.tail - self.head == len(self._slots):
+                    self._grow()
+            else:
+                # NOTE: The oldest item is read by all subscribers
+                #       since the lake item is not full
+                self.head += 1
+
+        self._slots[self.tail % len(self._slots)] = item
+        self.tail += 1
+
+        if self._new_item is not None:
+            if not self._new_item.done():
+                self._new_item.set_result(None)
+            self._new_item = None
+
+    def _waiter(self) -> "asyncio.Future[None]":
+        if self._new_item is None:
+            self._new_item = asyncio.get_running_loop().create_future()
+
+        return self._new_item
+
+    def _drop_oldest(self) -> None:
+        """Drop the oldest unread item.
+        Subscribers that did not read it skip it.
+        """
+
+        position: int = self._pending() + 1
+        for subscription in self._subscriptions:
+            subscription.position = max(subscription.position, position)
+
+        self._released = max(self._released, position)
+        self.head = max(self.head, position)
+        self._dropped += 1
+
+    def _on_release(self) -> None:
+        """Update the state after the oldest unread item is changed."""
+
+        pending: int = self._pending()
+        self._released = max(self._released, pending)
+
+        if self.capacity is None:
+            return
+
+        # Load spilled items back when the memory is freed
+        if self._spill.size:
+            free: int = self.capacity - (self.tail - pending)
+            for item in self._spill.pop_many(free):
+                self._store(item)
+
+        if self.tail - pending < self.capacity:
+            self._not_full.set()
+
+    def _read_log(
+        self, subscription: LakeSubscription[T], limit: int | None
+    ) -> list[T]:
+        """Read items that are not in the ring anymore from the log."""
+
+        log = cast(AppendLog, self._log)
+
+        # NOTE: Items that are removed by the retention are skipped
+        subscription.position = max(subscription.position, log.first_offset)
+        stop: int = (
+            self.head
+            if limit is None
+            else min(self.head, subscription.position + limit)
+        )
+        items: list[T] = [
+            pickle.loads(payload)
+            for payload in log.read(
+                subscription.position, stop - subscription.position
+            )
+        ]
+        subscription.position += len(items)
+
+        return items
+
+    def _read(self, subscription: LakeSubscription[T]) -> T:
+        if subscription.position >= self.tail:
+            raise IndexError("There are no new items")
+
+        if subscription.position < self.head:
+            item: T | None = self._read_log(subscription, limit=1)[0]
+        else:
+            item = self._slots[subscription.position % len(self._slots)]
+            subscription.position += 1
+
+        self._consumed += 1
+        self._on_release()
+
+        return cast(T, item)
+
+    def _read_many(
+        self, subscription: LakeSubscription[T], limit: int | None
+    ) -> list[T]:
+        items: list[T] = []
+        if subscription.position < self.head:
+            items = self._read_log(subscription, limit)
+            limit = None if limit is None else limit - len(items)
+
+        start: int = subscription.position
+        stop: int = (
+            self.tail if limit is None else min(self.tail, start + limit)
+        )
+
+        size: int = len(self._slots)
+        items.extend(
+            cast(T, self._slots[sequence % size])
+            for sequence in range(start, stop)
+        )
+        subscription.position = max(stop, start)
+
+        if items:
+            self._consumed += len(items)
+            self._on_release()
+
+        return items
+
+    # ************************************************
+    # ********** Producers **********
+    # ************************************************
+    def _append(self, item: T) -> None:
+        # NOTE: The order is preserved, so new items are spilled
+        #       while previous ones are not loaded back from the disk
+        if self._spill.size or (
+            self.full() and self.policy == OverflowPolicy.SPILL
+        ):
+            self._spill.append(item)
+        else:
+            self._store(item)
+
+        self._produced += 1
+        self._high_water = max(self._high_water, len(self))
+
+        if self.full():
+            self._not_full.clear()
+
+    def put_nowait(self, item: T) -> bool:
+        """Put the item without waiting.
+        Returns False if the item is dropped.
+
+        ⚠️ The BLOCK policy falls back to DROP_NEWEST here,
+        so the `put()` should be used by blocking producers.
+        """
+
+        if self.closed:
+            self._dropped += 1
+            return False
+
+        if self.full():
+            match self.policy:
+                case OverflowPolicy.DROP_OLDEST:
+                    self._drop_oldest()
+                case OverflowPolicy.DROP_NEWEST | OverflowPolicy.BLOCK:
+                    self._dropped += 1
+                    return False
+
+        self._append(item)
+
+        return True
+
+    async def put(self, item: T) -> bool:
+        """Put the item. The producer waits for the free space
+        if the policy is BLOCK. Returns False if the item is dropped.
+        """
+
+        if self.policy == OverflowPolicy.BLOCK and self.full():
+            started_at: float = asyncio.get_running_loop().time()
+            while self.full():
+                self._not_full.clear()
+                await self._not_full.wait()
+            self._blocked_seconds += (
+                asyncio.get_running_loop().time() - started_at
+            )
+
+        return self.put_nowait(item)
+
+    # ************************************************
+    # ********** Subscribers **********
+    # ************************************************
+    def subscribe(self, position: int | None = None) -> LakeSubscription[T]:
+        """Create the read cursor.
+        It starts from the position if it is available.
+        Otherwise, from the latest item or from the oldest unread one.
+        """
+
+        first: int = self.head if self._log is None else self._log.first_offset
+        if position is None or not first <= position <= self.tail:
+            position = (
+                self.tail
+                if self._from_latest
+                else max(self._pending(), self.head)
+            )
 
-    async def consume(self) -> AsyncGenerator[T, None]:
+        subscription = LakeSubscription[T](item=self, position=position)
+        self._subscriptions.append(subscription)
+
+        return subscription
+
+    def position_after(self, last_id: int) -> int | None:
+        """Find the sequence number of the first item with the greater id.
+        Items that are not in the ring anymore are looked up in the log.
+        Returns None if items right after the last id are not kept.
+
+        ⚠️ Items should have increasing `id` attributes.
+        """
+
+        def id_(sequence: int) -> int:
+            if sequence < self.head:
+                log = cast(AppendLog, self._log)
+                item = pickle.loads(log.read(sequence, limit=1)[0])
+            else:
+                item = self._slots[sequence % len(self._slots)]
+
+            return getattr(item, "id")
+
+        first: int = self.head if self._log is None else self._log.first_offset
+        if first == self.tail or id_(first) > last_id:
+            return None
+
+        low, high = first, self.tail
+        while low < high:
+            middle: int = (low + high) // 2
+            if id_(middle) <= last_id:
+                low = middle + 1
+            else:
+                high = middle
+
+        return low
+
+    def unsubscribe(self, subscription: LakeSubscription[T]) -> None:
+        # NOTE: Items that are read by the last subscriber are released,
+        #       unread ones are left for the next subscriber
+        self._released = max(self._released, self._pending())
+        self._subscriptions.remove(subscription)
+        self._on_release()
+
+    async def consume(
+        self, consumer: str | None = None
+    ) -> AsyncGenerator[T, None]:
         """This function is created in order not to obuse the database
         on the websockets calls.
+        Each call gets all items that are produced after the subscription.
+        The consumer sleeps until the producer puts the new item.
+
+        If the consumer name is passed and the log is opened, the offset
+        is committed after each processed item and the next call
+        resumes from it (e.g. after the restart).
+        """
+
+        log: AppendLog | None = self._log if consumer is not None else None
+        subscription: LakeSubscription[T] = self.subscribe(
+            position=log.committed(cast(str, consumer)) if log else None
+        )
+
+        try:
+            while not self.closed:
+                # NOTE: Items are read one by one, so the slowest
+                #       subscriber still limits producers precisely
+                while len(subscription):
+                    yield subscription.get_nowait()
+
+                    if log is not None:
+                        log.commit(cast(str, consumer), subscription.position)
+
+                await subscription.wait()
+        finally:
+            self.unsubscribe(subscription)
+
+    async def consume_batches(
+        self, limit: int, consumer: str | None = None
+    ) -> AsyncGenerator[list[T], None]:
+        """Yield all items (up to the limit) that are available at once.
+        The consumer sleeps until the producer puts the new item.
+
+        If the consumer name is passed and the log is opened, the offset
+        is committed after each processed batch like in `consume()`.
+        """
+
+        log: AppendLog | None = self._log if consumer is not None else None
+        subscription: LakeSubscription[T] = self.subscribe(
+            position=log.committed(cast(str, consumer)) if log else None
+        )
+
+        try:
+            while not self.closed:
+                while len(subscription):
+                    yield subscription.get_many(limit)
+
+                    if log is not None:
+                        log.commit(cast(str, consumer), subscription.position)
+
+                await subscription.wait()
+        finally:
+            self.unsubscribe(subscription)
+
+    async def consume_after(
+        self,
+        last_id: int,
+        fetch_missed: Callable[[int], Awaitable[list[T]]],
+    ) -> AsyncGenerator[T, None]:
+        """Yield items that are missed after the last id and then new ones.
+        Missed items are taken from the ring or from the log if they still
+        have all of them. Otherwise, they are fetched by the callback
+        (e.g. the bounded database query) which gets the last id.
+
+        ⚠️ Items should have increasing `id` attributes.
+        """
+
+        # NOTE: The subscription is created before missed items are fetched,
+        #       so items that are produced in the meantime are not lost
+        position: int | None = self.position_after(last_id)
+        subscription: LakeSubscription[T] = self.subscribe(position=position)
+
+        try:
+            if position is None:
+                for item in await fetch_missed(last_id):
+                    last_id = max(last_id, getattr(item, "id"))
+                    yield item
+
+            while not self.closed:
+                while len(subscription):
+                    item = subscription.get_nowait()
+
+                    # Skip items that are already fetched
+                    if getattr(item, "id") > last_id:
+                        yield item
+
+                await subscription.wait()
+        finally:
+            self.unsubscribe(subscription)
+
+
+class LakeItemsBySensor(dict[int, LakeItem[T]]):
+    """Lake items of running sensors by the sensor id.
+    They are created and removed by the sensors lifecycle
+    (src/application/lifecycle.py), so the lookup of the unknown sensor
+    does not create anything.
+    """
+
+    def __init__(self, name: str, factory: Callable[[], LakeItem[T]]):
+        super().__init__()
+        self.name: str = name
+        self._factory: Callable[[], LakeItem[T]] = factory
+        self._logs_directory: Path | None = None
+
+    def open_logs(self, directory: Path) -> None:
+        """Write items of all sensors to append logs in the directory."""
+
+        self._logs_directory = directory
+
+        for sensor_id, item in self.items():
+            item.open_log(_create_log(directory / str(sensor_id)))
+
+    def create(self, sensor_id: int) -> LakeItem[T]:
+        """Create the lake item of the sensor if it does not exist."""
+
+        if (item := self.get(sensor_id)) is not None:
+            return item
+
+        item = self[sensor_id] = self._factory()
+        if self._logs_directory is not None:
+            item.open_log(_create_log(self._logs_directory / str(sensor_id)))
+
+        return item
+
+    def remove(self, sensor_id: int) -> None:
+        """Close the lake item of the sensor and remove its log."""
+
+        if (item := self.pop(sensor_id, None)) is None:
+            return
+
+        item.close()
+        if self._logs_directory is not None:
+            shutil.rmtree(
+                self._logs_directory / str(sensor_id), ignore_errors=True
+            )
+
+    def put_nowait(self, sensor_id: int, instance: T) -> None:
+        """Put the instance to the lake item of the sensor.
+        It is skipped if the sensor is not running (e.g. it is removed
+        while its last readings are processed).
         """
 
-        # NOTE: Clearing the storage is needed since first the historical
-        #       data is sent via websocket connection. That's why
-        #       duplications could exist which has to be handled.
-        if self._init_clear is True:
-            self.storage.clear()
+        if (item := self.get(sensor_id)) is not None:
+            item.put_nowait(instance)
+
+
+# ************************************************
+# ********** Shared memory **********
+# ************************************************
+class SharedLakeItem:
+    """The lake item of readings for worker processes.
+    Readings are stored in the shared memory ring as TSD_RECORD records,
+    so worker processes read them without pickling and database round trips.
+    Only the main process writes to it.
+
+    Example:
+        >>> # in the main process
+        >>> item = SharedLakeItem.create()
+        >>> start, stop = item.put_many(readings)
+        >>> # in the worker process
+        >>> ring = SharedRing.attach(item.name, dtype=TSD_RECORD)
+        >>> records, _, lost = ring.read(start, limit=stop - start)
+    """
+
+    def __init__(self, ring: SharedRing) -> None:
+        self._ring: SharedRing = ring
+
+    @classmethod
+    def create(cls) -> "SharedLakeItem":
+        return cls(
+            SharedRing.create(
+                name=settings.data_lake.shared_memory.name,
+                capacity=settings.data_lake.shared_memory.capacity,
+                dtype=TSD_RECORD,
+            )
+        )
+
+    @property
+    def name(self) -> str:
+        return self._ring.name
+
+    @property
+    def capacity(self) -> int:
+        return self._ring.capacity
+
+    def put_many(self, readings: list[TsdFlat]) -> tuple[int, int]:
+        """Write readings to the ring.
+        Returns positions of the first and after the last reading.
+
+        ⚠️ Only the last `capacity` readings are kept.
+        """
 
-        while True:
-            with suppress(IndexError):
-                # Get the first element from the deque
-                yield self.storage.popleft()
+        start: int = self._ring.tail
+        self._ring.push(to_records(readings))
 
-            await asyncio.sleep(settings.data_lake_consuming_periodicity)
+        return start, self._ring.tail
+
+    def close(self) -> None:
+        self._ring.close()
+
+
+# ************************************************
+# ********** Recent readings **********
+# ************************************************
+RECENT_READINGS_COLUMNS: dict[str, np.dtype] = {
+    "id": np.dtype(np.int64),
+    "timestamp": np.dtype("datetime64[ns]"),
+    "ppmv": np.dtype(np.float64),
+}
+
+
+class RecentReadingsBySensor(dict[int, ColumnarRing]):
+    """Columnar rings of the last readings of running sensors
+    by the sensor id. Columns are described by RECENT_READINGS_COLUMNS.
+
+    Example:
+        >>> data_lake.recent_readings.put(tsd)
+        >>> columns = data_lake.recent_readings[sensor_id].last(144)
+        >>> columns["ppmv"].max()
+    """
+
+    def __init__(self, capacity: int) -> None:
+        super().__init__()
+        self.capacity: int = capacity
+
+    def create(self, sensor_id: int) -> ColumnarRing:
+        if (ring := self.get(sensor_id)) is None:
+            ring = self[sensor_id] = ColumnarRing(
+                self.capacity, RECENT_READINGS_COLUMNS
+            )
+
+        return ring
+
+    def remove(self, sensor_id: int) -> None:
+        self.pop(sensor_id, None)
+
+    def put(self, tsd: TsdFlat) -> None:
+        if (ring := self.get(tsd.sensor_id)) is None:
+            return
+
+        ring.append(
+            id=tsd.id,
+            timestamp=np.datetime64(naive_utc(tsd.timestamp), "ns"),
+            ppmv=tsd.ppmv,
+        )
+
+    def until(
+        self, sensor_id: int, last_id: int, size: int
+    ) -> dict[str, np.ndarray] | None:
+        """Return views of the last readings (exactly the size)
+        which ids are not greater than the last id.
+
+        None is returned if there are not enough readings in the memory
+        (e.g. right after the start), so they should be fetched
+        from the database instead.
+        """
+
+        if (ring := self.get(sensor_id)) is None:
+            return None
+
+        stop: int = ring.search("id", last_id, side="right")
+        if stop < size:
+            return None
+
+        return ring.slice(stop - size, stop)
 
 
 # NOTE: The data lake is implemented in order to reduce the database usage
@@ -66,32 +869,166 @@ class DataLake:
     """
 
     # Storage for reducing the database usage. Uses for background processing
-    time_series_data: LakeItem[Tsd]
+    time_series_data: LakeItem[TsdFlat]
     # Storage for reducing the database usage. Uses by websocket connection
-    time_series_data_by_sensor: dict[int, LakeItem[Tsd]]
+    time_series_data_by_sensor: LakeItemsBySensor[TsdFlat]
 
     # Uses for background processing by simulation processing
     anomaly_detections_for_simulation: LakeItem[AnomalyDetection]
     # Uses by websocket connection
-    anomaly_detections_by_sensor: dict[int, LakeItem[AnomalyDetection]]
+    anomaly_detections_by_sensor: LakeItemsBySensor[AnomalyDetection]
 
     # Events [sensors]
-    events_by_sensor: dict[int, LakeItem[sensors.Event]]
+    events_by_sensor: LakeItemsBySensor[sensors.Event]
 
     # Events [system]
     events_system: LakeItem[system.Event]
 
+    # Last readings of each sensor by columns. Used by the simulation
+    recent_readings: RecentReadingsBySensor
+
+    # Readings that are scored by worker processes.
+    # Exists only if it is turned on
+    time_series_data_shared: SharedLakeItem | None = None
+
+    def add_sensor(self, sensor_id: int) -> None:
+        """Create per-sensor lake items and recent readings."""
+
+        for field in fields(self):
+            value = getattr(self, field.name)
+            if isinstance(value, (LakeItemsBySensor, RecentReadingsBySensor)):
+                value.create(sensor_id)
+
+    def remove_sensor(self, sensor_id: int) -> None:
+        """Remove per-sensor lake items and recent readings.
+        Their subscribers (e.g. websocket connections) are stopped.
+        """
+
+        for field in fields(self):
+            value = getattr(self, field.name)
+            if isinstance(value, (LakeItemsBySensor, RecentReadingsBySensor)):
+                value.remove(sensor_id)
+
+    def stats(self) -> dict[str, LakeItemStats]:
+        """Return counters of all lake items.
+        Per-sensor items are named like `time_series_data_by_sensor[1]`.
+        """
+
+        results: dict[str, LakeItemStats] = {}
+
+        for field in fields(self):
+            value = getattr(self, field.name)
+
+            if isinstance(value, LakeItem):
+                results[field.name] = value.stats
+            elif isinstance(value, LakeItemsBySensor):
+                for key, item in value.items():
+                    results[f"{field.name}[{key}]"] = item.stats
+
+        return results
+
 
 data_lake = DataLake(
-    time_series_data=LakeItem[Tsd](),
-    time_series_data_by_sensor=defaultdict(partial(LakeItem[Tsd])),
+    time_series_data=LakeItem[TsdFlat].from_settings(
+        settings.data_lake.time_series_data
+    ),
+    time_series_data_by_sensor=LakeItemsBySensor(
+        name="time_series_data_by_sensor",
+        factory=partial(
+            LakeItem[TsdFlat].from_settings,
+            settings.data_lake.time_series_data_by_sensor,
+        ),
+    ),
     # Anomaly detection
-    anomaly_detections_for_simulation=LakeItem[AnomalyDetection](limit=10),
-    anomaly_detections_by_sensor=defaultdict(
-        partial(LakeItem[AnomalyDetection])
+    anomaly_detections_for_simulation=LakeItem[AnomalyDetection].from_settings(
+        settings.data_lake.anomaly_detections_for_simulation
+    ),
+    anomaly_detections_by_sensor=LakeItemsBySensor(
+        name="anomaly_detections_by_sensor",
+        factory=partial(
+            LakeItem[AnomalyDetection].from_settings,
+            settings.data_lake.anomaly_detections_by_sensor,
+        ),
     ),
     # Events [sensors]
-    events_by_sensor=defaultdict(partial(LakeItem[sensors.Event], limit=1)),
+    events_by_sensor=LakeItemsBySensor(
+        name="events_by_sensor",
+        factory=partial(
+            LakeItem[sensors.Event].from_settings,
+            settings.data_lake.events_by_sensor,
+        ),
+    ),
     # Events [system]
-    events_system=LakeItem[system.Event](limit=20),
+    events_system=LakeItem[system.Event].from_settings(
+        settings.data_lake.events_system
+    ),
+    # Recent readings
+    recent_readings=RecentReadingsBySensor(
+        capacity=settings.data_lake.recent_readings_capacity
+        or settings.anomaly_detection.window_size * 2
+    ),
 )
+
+
+async def open_shared_memory() -> None:
+    """Create the shared memory lake item.
+    It should be done before worker processes are started.
+    """
+
+    if settings.data_lake.shared_memory.enabled is True:
+        data_lake.time_series_data_shared = SharedLakeItem.create()
+
+
+async def close_shared_memory() -> None:
+    if data_lake.time_series_data_shared is not None:
+        data_lake.time_series_data_shared.close()
+        data_lake.time_series_data_shared = None
+
+
+# ************************************************
+# ********** Append logs **********
+# ************************************************
+def _create_log(directory: Path) -> AppendLog:
+    return AppendLog(
+        directory=directory,
+        segment_size=settings.data_lake.log.segment_size,
+        retention_segments=settings.data_lake.log.retention_segments,
+        fsync_interval=settings.data_lake.log.fsync_interval,
+    )
+
+
+async def open_logs() -> None:
+    """Open append logs of persistent lake items.
+    It should be done before producers and consumers are started.
+    """
+
+    if settings.data_lake.log.enabled is not True:
+        return
+
+    for field in fields(data_lake):
+        config: DataLakeItemSettings | None = getattr(
+            settings.data_lake, field.name, None
+        )
+        if config is None or config.persistent is not True:
+            continue
+
+        directory: Path = settings.data_lake.log.directory / field.name
+        value = getattr(data_lake, field.name)
+
+        if isinstance(value, LakeItem):
+            value.open_log(_create_log(directory))
+        elif isinstance(value, LakeItemsBySensor):
+            value.open_logs(directory)
+
+
+async def close_logs() -> None:
+    """Flush and close all append logs."""
+
+    for field in fields(data_lake):
+        value = getattr(data_lake, field.name)
+
+        if isinstance(value, LakeItem):
+            value.close_log()
+        elif isinstance(value, LakeItemsBySensor):
+            for item in value.values():
+                item.close_log()
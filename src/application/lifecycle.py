@@ -0,0 +1,61 @@
+"""
+This module owns the runtime state of each sensor.
+
+The state is created when the sensor is started (on the application
+startup or on the sensor creation) and all of it is removed when
+the sensor is stopped (on the sensor deletion), so the memory stays
+bounded while sensors are added and removed.
+
+The runtime state of the sensor:
+    - the polling by the TSD scheduler with its ingestion buffer,
+      the resampler, the deduplication index and the source state
+    - per-sensor data lake items (and their append logs)
+      and recent readings
+    - the matrix profile and the interactive feedback mode cache entry
+      (owned by the worker process in the worker-pool mode)
+    - last sensor events types
+    - the sensors registry entry and updated baselines
+"""
+
+from loguru import logger
+
+from src.application import anomaly_detection, sensors, tsd
+from src.application.data_lake import data_lake
+from src.domain.events.sensors import services as sensors_events
+from src.domain.sensors import Sensor, SensorsRegistry
+
+__all__ = ("start", "start_all", "stop")
+
+
+def start(sensor: Sensor) -> None:
+    """Create the runtime state of the sensor and start polling it."""
+
+    SensorsRegistry.set(sensor)
+    data_lake.add_sensor(sensor.id)
+    tsd.polling.add(sensor)
+
+
+async def start_all() -> None:
+    """Start all existed sensors.
+    It should be done before the TSD processing is started.
+    """
+
+    for sensor in await sensors.load_registry():
+        start(sensor)
+
+
+async def stop(sensor_id: int) -> None:
+    """Stop polling the sensor and remove its runtime state.
+    Websocket connections of the sensor are closed.
+    """
+
+    # NOTE: Readings that are left in the ingestion buffer are saved
+    #       before data lake items are removed
+    await tsd.polling.remove(sensor_id)
+
+    data_lake.remove_sensor(sensor_id)
+    await anomaly_detection.discard(sensor_id)
+    sensors_events.discard(sensor_id)
+    sensors.discard(sensor_id)
+
+    logger.info(f"The runtime state of the sensor {sensor_id} is removed")
@@ -0,0 +1,143 @@
+"""
+This module registers in-process state stores of the application
+in the memory accounting and reports their stats periodically.
+"""
+
+import asyncio
+from dataclasses import fields
+
+from loguru import logger
+
+from src.application import sensors
+from src.application.data_lake import (
+    LakeItem,
+    LakeItemsBySensor,
+    RecentReadingsBySensor,
+    data_lake,
+)
+from src.config import settings
+from src.domain.anomaly_detection.services.processing import dispatcher
+from src.domain.events.sensors import services as sensors_events
+from src.domain.sensors import BaselinesCache
+from src.infrastructure.cache import Cache
+from src.infrastructure.memory import MemoryStores, MemoryStoreStats
+
+__all__ = ("stats", "process")
+
+
+# ************************************************
+# ********** Stores collectors **********
+# ************************************************
+def _data_lake() -> dict:
+    """Lake items are counted by retained items in the memory
+    and recent readings are counted by retained rows.
+    Per-sensor items are named like `time_series_data_by_sensor[1]`.
+    """
+
+    results: dict = {}
+
+    for field in fields(data_lake):
+        value = getattr(data_lake, field.name)
+
+        if isinstance(value, LakeItem):
+            results[field.name] = (value.tail - value.head, value)
+        elif isinstance(value, LakeItemsBySensor):
+            for key, item in value.items():
+                results[f"{field.name}[{key}]"] = (item.tail - item.head, item)
+        elif isinstance(value, RecentReadingsBySensor):
+            for key, ring in value.items():
+                results[f"{field.name}[{key}]"] = (len(ring), ring)
+
+    return results
+
+
+def _matrix_profiles() -> dict:
+    # NOTE: Matrix profiles of worker processes are not counted
+    #       in the worker-pool mode
+    return {
+        str(sensor_id): (
+            len(matrix_profile.last_values)
+            + len(matrix_profile.fb_historical)
+            + len(matrix_profile.fb_temp),
+            matrix_profile,
+        )
+        for sensor_id, matrix_profile in dispatcher.MATRIX_PROFILES.items()
+    }
+
+
+def _cache() -> dict:
+    return {key: (1, instance) for key, instance in Cache.entries().items()}
+
+
+def _last_sensors_events_types() -> dict:
+    return {
+        str(sensor_id): (len(events_types), events_types)
+        for sensor_id, events_types in (
+            sensors_events.LAST_SENSORS_EVENTS_TYPES.items()
+        )
+    }
+
+
+def _decoded_baselines() -> dict:
+    return {
+        str(configuration_id): (1, baseline)
+        for configuration_id, baseline in BaselinesCache.entries().items()
+    }
+
+
+def _updated_baselines_by_sensor() -> dict:
+    return {
+        str(sensor_id): (len(baselines), baselines)
+        for sensor_id, baselines in sensors.UPDATED_BASELINES_BY_SENSOR.items()
+    }
+
+
+MemoryStores.register("data_lake", _data_lake)
+MemoryStores.register("matrix_profiles", _matrix_profiles)
+MemoryStores.register("cache", _cache)
+MemoryStores.register("last_sensors_events_types", _last_sensors_events_types)
+MemoryStores.register(
+    "updated_baselines_by_sensor", _updated_baselines_by_sensor
+)
+MemoryStores.register("decoded_baselines", _decoded_baselines)
+
+
+# ************************************************
+# ********** Reporting **********
+# ************************************************
+def stats(top: int = 10, record: bool = False) -> list[MemoryStoreStats]:
+    """Return memory stats of all stores with the biggest keys.
+    Only periodic snapshots are recorded for the growth detection.
+    """
+
+    return MemoryStores.snapshot(top=top, record=record)
+
+
+async def process() -> None:
+    """Log memory stats of all stores periodically.
+    Stores that only grow are reported as possible leaks.
+    """
+
+    while True:
+        await asyncio.sleep(settings.memory.log_interval)
+
+        # NOTE: Stores are walked through in the event loop since
+        #       they are not thread-safe. Big containers are sampled
+        for store in stats(top=3, record=True):
+            logger.info(
+                f"Memory store {store.name}: {store.entries} entries, "
+                f"~{store.bytes / 1024:.1f} KiB "
+                f"(high water: {store.high_water_entries} entries, "
+                f"~{store.high_water_bytes / 1024:.1f} KiB). "
+                "The biggest keys: "
+                + ", ".join(
+                    f"{key.key}={key.bytes / 1024:.1f} KiB"
+                    for key in store.keys
+                )
+            )
+
+            if store.only_grows:
+                logger.warning(
+                    f"Memory store {store.name} only grows during the last "
+                    f"{settings.memory.growth_samples} snapshots"
+                )
@@ -40,12 +40,14 @@ from src.domain.anomaly_detection import services as services
 from src.domain.events import system
 from src.domain.events.system.repository import SystemEventsRepository
 from src.domain.sensors import (
+    BaselinesCache,
     Sensor,
     SensorBase,
     SensorConfigurationUncommited,
     SensorConfigurationUpdatePartialSchema,
     SensorCreateSchema,
     SensorsConfigurationsRepository,
+    SensorsRegistry,
     SensorsRepository,
     SensorUncommited,
 )
@@ -99,13 +101,39 @@ async def retrieve(sensor_id: int) -> Sensor:
     return await SensorsRepository().get(id_=sensor_id)
 
 
+async def resolve(sensor_id: int) -> Sensor:
+    """Return the sensor from the process-wide registry.
+    It is fetched from the database only if it is missing or expired.
+    """
+
+    try:
+        return SensorsRegistry.get(sensor_id)
+    except NotFoundError:
+        sensor: Sensor = await retrieve(sensor_id)
+        SensorsRegistry.set(sensor)
+
+        return sensor
+
+
 @transaction
-async def update(
-    sensor_id: int,
-    schema: SensorUpdatePartialSchema = (SensorUpdatePartialSchema()),
-) -> Sensor:
-    """Update the sensor and the configuration in one transaction hop."""
+async def load_registry() -> list[Sensor]:
+    """Load all sensors to the registry at once."""
 
+    sensors: list[Sensor] = [
+        sensor async for sensor in SensorsRepository().filter()
+    ]
+
+    for sensor in sensors:
+        SensorsRegistry.set(sensor)
+
+    return sensors
+
+
+# NOTE: Changed sensors are put to the registry only after the commit.
+#       Otherwise, the scoring could resolve the old sensor in between
+#       and keep it until the registry entry expires.
+@transaction
+async def _update(sensor_id: int, schema: SensorUpdatePartialSchema) -> Sensor:
     # PERF: Abusing the database. (not critical for now)
 
     sensor_repository = SensorsRepository()
@@ -120,6 +148,18 @@ async def update(
     return await sensor_repository.get(id_=sensor_id)
 
 
+async def update(
+    sensor_id: int,
+    schema: SensorUpdatePartialSchema = (SensorUpdatePartialSchema()),
+) -> Sensor:
+    """Update the sensor and the configuration in one transaction hop."""
+
+    sensor: Sensor = await _update(sensor_id, schema)
+    SensorsRegistry.set(sensor)
+
+    return sensor
+
+
 @transaction
 async def create(template_id: int, sensor_payload: SensorBase) -> Sensor:
     """This function takes care about the sensor creation.
@@ -170,13 +210,7 @@ async def create(template_id: int, sensor_payload: SensorBase) -> Sensor:
 
 
 @transaction
-async def delete(sensor_id: int) -> None:
-    """This function takes care about the sensor deletion.
-    The sensor deletion consist of:
-        1. deleting the sensor's configuration
-        2. deleting the sensor
-    """
-
+async def _delete(sensor_id: int) -> None:
     configuration_repository = SensorsConfigurationsRepository()
     sensors_repository = SensorsRepository()
     sensor: Sensor = await sensors_repository.get(id_=sensor_id)
@@ -187,17 +221,22 @@ async def delete(sensor_id: int) -> None:
     ]
 
     await asyncio.gather(*tasks)
+    BaselinesCache.discard(sensor.configuration.id)
 
 
-@transaction
-async def toggle_interactive_feedback_mode(sensor_id: int) -> Sensor:
-    """This function takes care about the sensor's
-    interactive feedback mode toggling.
-
-    Toggle feature is available only if the sensor has enough
-    time series data to calculate the baseline.
+async def delete(sensor_id: int) -> None:
+    """This function takes care about the sensor deletion.
+    The sensor deletion consist of:
+        1. deleting the sensor's configuration
+        2. deleting the sensor
     """
 
+    await _delete(sensor_id)
+    SensorsRegistry.invalidate(sensor_id)
+
+
+@transaction
+async def _toggle_interactive_feedback_mode(sensor_id: int) -> Sensor:
     sensor_repository = SensorsRepository()
     tsd_amount: int = await sensor_repository.tsd_count(sensor_id=sensor_id)
 
@@ -226,10 +265,22 @@ async def toggle_interactive_feedback_mode(sensor_id: int) -> Sensor:
     return await sensor_repository.get(id_=sensor_id)
 
 
-@transaction
-async def toggle_pin(sensor_id: int) -> Sensor:
-    """This function takes care about the sensor's pin state toggling."""
+async def toggle_interactive_feedback_mode(sensor_id: int) -> Sensor:
+    """This function takes care about the sensor's
+    interactive feedback mode toggling.
+
+    Toggle feature is available only if the sensor has enough
+    time series data to calculate the baseline.
+    """
+
+    sensor: Sensor = await _toggle_interactive_feedback_mode(sensor_id)
+    SensorsRegistry.set(sensor)
+
+    return sensor
+
 
+@transaction
+async def _toggle_pin(sensor_id: int) -> Sensor:
     sensor_repository = SensorsRepository()
     sensor: Sensor = await sensor_repository.get(id_=sensor_id)
 
@@ -247,11 +298,27 @@ async def toggle_pin(sensor_id: int) -> Sensor:
     return await sensor_repository.get(id_=sensor_id)
 
 
+async def toggle_pin(sensor_id: int) -> Sensor:
+    """This function takes care about the sensor's pin state toggling."""
+
+    sensor: Sensor = await _toggle_pin(sensor_id)
+    SensorsRegistry.set(sensor)
+
+    return sensor
+
+
+def discard(sensor_id: int) -> None:
+    """Forget the runtime state of the sensor that is removed."""
+
+    UPDATED_BASELINES_BY_SENSOR.pop(sensor_id, None)
+    SensorsRegistry.invalidate(sensor_id)
+
+
 async def create_system_event(schema: system.EventUncommited) -> system.Event:
     """This function takes care about the system event creation."""
 
     event: system.Event = await system.SystemEventsRepository().create(schema)
-    data_lake.events_system.storage.append(event)
+    data_lake.events_system.put_nowait(event)
 
     return event
 
@@ -281,14 +348,21 @@ def select_best_baseline():
         sleep(
             settings.sensors.anomaly_detection.baseline_best_selection_interval.total_seconds()  # noqa: E501
         )
-        asyncio.run(_select_best_baseline())
+        updated: list[int] = asyncio.run(_select_best_baseline()) or []
         # await _select_best_baseline()
 
+        for sensor_id in updated:
+            SensorsRegistry.invalidate(sensor_id)
+
 
 @transaction
-async def _select_best_baseline():
+async def _select_best_baseline() -> list[int]:
+    """Returns ids of sensors which baselines are changed."""
+
     # WARNING: Other pre-feature validations are not added
 
+    updated: list[int] = []
+
     seed_baselines: list[
         SeedBaseline
     ] = services.baselines.seed.for_select_best()
@@ -356,6 +430,7 @@ async def _select_best_baseline():
                     )
                 ),
             )
+            updated.append(sensor.id)
 
             await create_system_event(
                 system.EventUncommited(
@@ -378,6 +453,8 @@ async def _select_best_baseline():
                 )
             )
 
+    return updated
+
 
 def initial_baseline_augmentation():
     """This function runs the initial baseline augmentation/update process.
@@ -398,14 +475,23 @@ def initial_baseline_augmentation():
         sleep(
             settings.sensors.anomaly_detection.baseline_augmentation_interval.total_seconds()  # noqa: E501
         )
-        asyncio.run(_initial_baseline_augmentation())
+        updated: list[int] = (
+            asyncio.run(_initial_baseline_augmentation()) or []
+        )
         # await _initial_baseline_augmentation()
 
+        for sensor_id in updated:
+            SensorsRegistry.invalidate(sensor_id)
+
 
 @transaction
-async def _initial_baseline_augmentation():
+async def _initial_baseline_augmentation() -> list[int]:
+    """Returns ids of sensors which baselines are changed."""
+
     # TODO: Add other pre-feature validations
 
+    updated: list[int] = []
+
     baselines_services = services.baselines  # alias
 
     # Make the augmentation for each sensor and update it in the database
@@ -433,9 +519,9 @@ async def _initial_baseline_augmentation():
             )
 
             # Update the data lake
-            data_lake.events_system.storage.append(system_event)
+            data_lake.events_system.put_nowait(system_event)
 
-            return
+            return updated
 
         cleaned_concentrations: NDArray[
             np.float64
@@ -459,3 +545,6 @@ async def _initial_baseline_augmentation():
                 )
             ),
         )
+        updated.append(sensor.id)
+
+    return updated
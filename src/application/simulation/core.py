@@ -118,7 +118,9 @@ async def process():
     logger.success("Background simulation processing")
 
     data_lake_items = data_lake.anomaly_detections_for_simulation
-    async for anomaly_detection in data_lake_items.consume():
+    async for anomaly_detection in data_lake_items.consume(
+        consumer="simulation"
+    ):
         # TODO: The key has to be unique for each process in order
         #       to secure parallel processing for each CRITICAL anomaly
         #       deviation received from the data lake.
@@ -163,7 +165,7 @@ async def process():
                 estimation_summary
             )
 
-        data_lake.events_system.storage.append(event)
+        data_lake.events_system.put_nowait(event)
 
 
 async def _process(
@@ -222,15 +224,9 @@ async def _process(
     )
 
     # TODO: Discuss which TSD instances should be taken from the database
-    last_time_series_data: list[TsdFlat] = [
-        item
-        async for item in tsd_repository.filter(
-            sensor_id=time_series_data.sensor.id,
-            last_id=time_series_data.id,
-            limit=settings.anomaly_detection.window_size,
-            order_by_desc=True,
-        )
-    ]
+    anomaly_concentrations, anomaly_timestamps = await _get_last_readings(
+        sensor_id=time_series_data.sensor.id, last_id=time_series_data.id
+    )
 
     # Define the `field` for all detections
     template = await TemplatesRepository().get(
@@ -258,11 +254,6 @@ async def _process(
         time_series_data.sensor.name.replace(field.value.tag, "")
     )
 
-    anomaly_timestamps: list[str] = [
-        tsd.timestamp.strftime(DATETIME_FORMAT)
-        for tsd in last_time_series_data
-    ]
-
     # TODO: Investigate if we do need to wait
     #       for window size elements to be populated
 
@@ -271,9 +262,7 @@ async def _process(
     create_schema: EstimationSummaryUncommited = EstimationProcessor(
         detections=detections,
         anomaly_severity=first_detection.anomaly_detection.value,
-        anomaly_concentrations=np.array(
-            [tsd.ppmv for tsd in last_time_series_data]
-        ),
+        anomaly_concentrations=anomaly_concentrations,
         anomaly_timestamps=anomaly_timestamps,
         sensor_number=tag_info.sensor_number - 1,
         neighbor_sensors=[],
@@ -292,6 +281,47 @@ async def _process(
     return estimation_summary
 
 
+async def _get_last_readings(
+    sensor_id: int, last_id: int
+) -> tuple[np.ndarray, list[str]]:
+    """Return concentrations and formatted timestamps of the last readings
+    (up to the window size) in the descending order.
+
+    They are taken from columnar recent readings of the data lake
+    and fetched from the database only if there are not enough of them.
+    """
+
+    size: int = settings.anomaly_detection.window_size
+
+    if columns := data_lake.recent_readings.until(sensor_id, last_id, size):
+        # NOTE: Reversed views are not copied
+        timestamps: np.ndarray = np.datetime_as_string(
+            columns["timestamp"][::-1], unit="m"
+        )
+        return (
+            columns["ppmv"][::-1].copy(),
+            np.char.replace(timestamps, "T", " ").tolist(),
+        )
+
+    last_time_series_data: list[TsdFlat] = [
+        item
+        async for item in TsdRepository().filter(
+            sensor_id=sensor_id,
+            last_id=last_id,
+            limit=size,
+            order_by_desc=True,
+        )
+    ]
+
+    return (
+        np.array([tsd.ppmv for tsd in last_time_series_data]),
+        [
+            tsd.timestamp.strftime(DATETIME_FORMAT)
+            for tsd in last_time_series_data
+        ],
+    )
+
+
 async def _create_event(
     estimation_summary: EstimationSummary,
 ) -> events.system.Event:
@@ -1 +1,7 @@
+from .backfill import *  # noqa: F401, F403
+from .deduplication import *  # noqa: F401, F403
+from .ingestion import *  # noqa: F401, F403
 from .processing import *  # noqa: F401, F403
+from .resampling import *  # noqa: F401, F403
+from .scheduler import *  # noqa: F401, F403
+from .sources import *  # noqa: F401, F403
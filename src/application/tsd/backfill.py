@@ -0,0 +1,150 @@
+"""
+The historical time series data backfill.
+
+It loads the whole CSV file for the sensor at full speed:
+readings are saved by chunks with multi-row inserts and anomaly detections
+are computed for the whole chunk and saved at once as well. The source sleeps
+and the data lake are not involved since this data is historical.
+
+Chunks are scored against the separate matrix profile that is built
+from the sensor's initial baseline, so historical readings never get
+into the live matrix profile of the running sensor. Saved timestamps
+are remembered by the deduplicator, so the polling does not accept
+them again.
+
+⚠️ The deduplicator is kept by the web application process, so the backfill
+that runs in another process (e.g. the CLI) should be used only for sensors
+that are not running. Otherwise, use the admin REST endpoint.
+
+Readings are resampled by chunks if the resampling is turned on.
+"""
+
+import asyncio
+from pathlib import Path
+from time import perf_counter
+from typing import Iterator
+
+import numpy as np
+import pandas as pd
+from loguru import logger
+
+from src.config import settings
+from src.domain.anomaly_detection import (
+    AnomalyDetectionRepository,
+    AnomalyDetectionUncommited,
+    services,
+)
+from src.domain.anomaly_detection.models import MatrixProfile
+from src.domain.sensors import Sensor, SensorsRepository
+from src.domain.tsd import TsdFlat, TsdRawChunk, TsdUncommited
+from src.infrastructure.database import transaction
+
+from . import mock
+from .ingestion import bulk_create
+from .resampling import TsdResampler
+from .scheduler import polling
+
+__all__ = ("backfill",)
+
+
+@transaction
+async def _get_sensor(sensor_id: int) -> Sensor:
+    return await SensorsRepository().get(id_=sensor_id)
+
+
+@transaction
+async def _create_anomaly_detections(
+    schemas: list[AnomalyDetectionUncommited],
+) -> None:
+    await AnomalyDetectionRepository().bulk_create(schemas)
+
+
+def _next_chunk(chunks: Iterator[pd.DataFrame]) -> pd.DataFrame | None:
+    return next(chunks, None)
+
+
+async def _save_chunk(
+    chunk: TsdRawChunk, sensor: Sensor, matrix_profile: MatrixProfile
+) -> tuple[int, int]:
+    """Save readings and their anomaly detections.
+    Returns the number of saved readings and detections.
+    """
+
+    tsd_set: list[TsdFlat] = await bulk_create(
+        [
+            TsdUncommited(
+                ppmv=np.float64(tsd_raw.ppmv),
+                timestamp=tsd_raw.timestamp,
+                sensor_id=sensor.id,
+            )
+            for tsd_raw in chunk.to_raw()
+        ]
+    )
+    polling.deduplicator.remember(
+        sensor.id, [tsd.timestamp for tsd in tsd_set]
+    )
+
+    # NOTE: Readings are processed in order since the matrix profile
+    #       is stateful. Readings that can not be processed are skipped
+    create_schemas: list[AnomalyDetectionUncommited] = await asyncio.to_thread(
+        services.processing.dispatch_detached, tsd_set, sensor, matrix_profile
+    )
+    await _create_anomaly_detections(create_schemas)
+
+    return len(tsd_set), len(create_schemas)
+
+
+async def backfill(sensor_id: int, filename: Path) -> None:
+    """Load the historical time series data from the CSV file,
+    save it and compute anomaly detections.
+    """
+
+    sensor: Sensor = await _get_sensor(sensor_id)
+    parser: mock.FieldParserCallback = mock.get_parser(
+        sensor.template.field_id
+    )
+
+    logger.info(f"Backfill for {sensor.name} is started from {filename}")
+
+    resampler: TsdResampler | None = TsdResampler.for_sensor(sensor)
+    matrix_profile: MatrixProfile = await asyncio.to_thread(
+        services.processing.create_matrix_profile, sensor
+    )
+
+    started_at: float = perf_counter()
+    readings_total = detections_total = 0
+
+    chunks: Iterator[pd.DataFrame] = mock.read_chunks_from_csv_file(
+        filename, chunk_size=settings.tsd.backfill.chunk_size
+    )
+
+    # NOTE: CPU-bound operations are moved to threads
+    #       in order not to block the event loop
+    while (rows := await asyncio.to_thread(_next_chunk, chunks)) is not None:
+        chunk: TsdRawChunk = parser(rows)
+        chunk = chunk.filter(chunk.ppmv <= mock.PPMV_DEMO_LIMIT)
+
+        if resampler is not None:
+            chunk = resampler.push_chunk(chunk)
+
+        readings, detections = await _save_chunk(chunk, sensor, matrix_profile)
+        readings_total += readings
+        detections_total += detections
+
+        logger.debug(
+            f"Backfill for {sensor.name}: {readings_total} readings saved"
+        )
+
+    # NOTE: The last interval is not finished by the next reading
+    if resampler is not None:
+        readings, detections = await _save_chunk(
+            resampler.flush(), sensor, matrix_profile
+        )
+        readings_total += readings
+        detections_total += detections
+
+    logger.success(
+        f"Backfill for {sensor.name} is finished "
+        f"in {perf_counter() - started_at:.1f}s. "
+        f"Readings: {readings_total}, anomaly detections: {detections_total}"
+    )
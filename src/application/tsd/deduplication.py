@@ -0,0 +1,119 @@
+"""
+The in-memory guard against duplicated and late readings.
+
+The same reading could be fetched twice after the source retry or
+the application restart. Instead of checking the uniqueness in the
+database for each row, the last accepted timestamp and the set of recent
+timestamps are kept per sensor. The index is warmed up from the database
+with one query on the startup.
+"""
+
+from collections import deque
+from datetime import datetime, timedelta
+from typing import Deque
+
+from src.config import settings
+from src.domain.tsd import TsdRaw, TsdRepository, naive_utc
+from src.infrastructure.database import transaction
+
+__all__ = ("TsdDeduplicator", "get_recent_timestamps")
+
+
+@transaction
+async def get_recent_timestamps(limit: int) -> dict[int, list[datetime]]:
+    return await TsdRepository().recent_timestamps(limit=limit)
+
+
+class _SensorIndex:
+    def __init__(self, recent_size: int) -> None:
+        self.last: datetime | None = None
+        self.recent: Deque[datetime] = deque()
+        self.recent_set: set[datetime] = set()
+        self._recent_size: int = recent_size
+
+    def add(self, timestamp: datetime) -> None:
+        if len(self.recent) >= self._recent_size:
+            self.recent_set.discard(self.recent.popleft())
+
+        self.recent.append(timestamp)
+        self.recent_set.add(timestamp)
+
+        if self.last is None or timestamp > self.last:
+            self.last = timestamp
+
+
+class TsdDeduplicator:
+    """The per-sensor index of accepted timestamps.
+
+    Example:
+        >>> deduplicator = TsdDeduplicator()
+        >>> deduplicator.warm_up(await get_recent_timestamps(limit=1000))
+        >>> readings = deduplicator.filter(sensor.id, readings)
+    """
+
+    def __init__(
+        self,
+        lateness: timedelta = settings.tsd.deduplication.lateness,
+        recent_size: int = settings.tsd.deduplication.recent_size,
+    ) -> None:
+        self.lateness: timedelta = lateness
+        self.recent_size: int = recent_size
+        self._indexes: dict[int, _SensorIndex] = {}
+
+        self.duplicates: int = 0
+        self.late: int = 0
+
+    def _index(self, sensor_id: int) -> _SensorIndex:
+        if (index := self._indexes.get(sensor_id)) is None:
+            index = self._indexes[sensor_id] = _SensorIndex(self.recent_size)
+
+        return index
+
+    def warm_up(self, timestamps: dict[int, list[datetime]]) -> None:
+        """Fill indexes with timestamps that are already saved."""
+
+        for sensor_id, items in timestamps.items():
+            index: _SensorIndex = self._index(sensor_id)
+            for timestamp in sorted(items)[-self.recent_size :]:
+                index.add(naive_utc(timestamp))
+
+    def accept(self, sensor_id: int, timestamp: datetime) -> bool:
+        """Check the reading and remember it if it is accepted."""
+
+        index: _SensorIndex = self._index(sensor_id)
+        timestamp = naive_utc(timestamp)
+
+        if timestamp in index.recent_set:
+            self.duplicates += 1
+            return False
+
+        if index.last is not None and timestamp < index.last - self.lateness:
+            self.late += 1
+            return False
+
+        index.add(timestamp)
+
+        return True
+
+    def remember(self, sensor_id: int, timestamps: list[datetime]) -> None:
+        """Add timestamps that are saved bypassing the filter
+        (e.g. by the backfill), so they are not accepted again.
+        """
+
+        index: _SensorIndex = self._index(sensor_id)
+        for timestamp in sorted(timestamps)[-self.recent_size :]:
+            index.add(naive_utc(timestamp))
+
+    def filter(self, sensor_id: int, readings: list[TsdRaw]) -> list[TsdRaw]:
+        """Return only readings that are not seen before
+        and not later than the lateness window.
+        """
+
+        return [
+            tsd_raw
+            for tsd_raw in readings
+            if self.accept(sensor_id, tsd_raw.timestamp)
+        ]
+
+    def discard(self, sensor_id: int) -> None:
+        self._indexes.pop(sensor_id, None)
@@ -0,0 +1,182 @@
+"""
+The time series data ingestion buffer.
+
+Readings are collected per sensor and flushed to the database in batches
+instead of opening a transaction for each of them. The batch is flushed
+when the size threshold is reached or when the first buffered reading
+waits longer than the flush interval.
+
+After the flush saved TSD instances are produced to the data lake
+without fetching them back from the database. They carry only
+the sensor id which is resolved through the sensors registry.
+
+Readings of the failed insert are kept in the buffer for the next flush
+up to `settings.tsd.ingestion.max_pending`, so the database outage does not
+grow the memory without bound. Readings that are rejected by the database
+(e.g. the sensor is removed) are dropped, since they never could be saved.
+"""
+
+import asyncio
+
+import numpy as np
+from loguru import logger
+
+from src.application.data_lake import data_lake
+from src.config import settings
+from src.domain.sensors import Sensor
+from src.domain.tsd import TsdFlat, TsdRaw, TsdRepository, TsdUncommited
+from src.infrastructure.database import transaction
+
+__all__ = ("TsdIngestionBuffer", "bulk_create")
+
+
+@transaction
+async def bulk_create(schemas: list[TsdUncommited]) -> list[TsdFlat]:
+    """Save the batch of readings with one multi-row insert."""
+
+    return await TsdRepository().bulk_create(schemas)
+
+
+class TsdIngestionBuffer:
+    """The per-sensor buffer of readings that are waiting for the flush.
+
+    Example:
+        >>> buffer = TsdIngestionBuffer(sensor)
+        >>> await buffer.add(tsd_raw)  # flushes if the batch is full
+        >>> await buffer.flush()  # flushes everything that is left
+    """
+
+    def __init__(
+        self,
+        sensor: Sensor,
+        batch_size: int = settings.tsd.ingestion.batch_size,
+        flush_interval: float = settings.tsd.ingestion.flush_interval,
+        max_pending: int = settings.tsd.ingestion.max_pending,
+    ) -> None:
+        self.sensor: Sensor = sensor
+        self._batch_size: int = batch_size
+        self._flush_interval: float = flush_interval
+        self._max_pending: int = max_pending
+
+        self._items: list[TsdUncommited] = []
+        self._lock = asyncio.Lock()
+        # NOTE: Saved batches are produced in the order they are saved,
+        #       but the next batch is saved without waiting for the lake
+        self._publish_lock = asyncio.Lock()
+        self._timer: asyncio.TimerHandle | None = None
+        self._timer_task: asyncio.Task | None = None
+
+        # The number of readings that are dropped since the start
+        self.dropped: int = 0
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    async def add(self, tsd_raw: TsdRaw) -> list[TsdFlat]:
+        """Add the reading to the buffer.
+        Returns flushed instances if the size threshold is reached.
+        """
+
+        self._items.append(
+            TsdUncommited(
+                ppmv=np.float64(tsd_raw.ppmv),
+                timestamp=tsd_raw.timestamp,
+                sensor_id=self.sensor.id,
+            )
+        )
+
+        if len(self._items) >= self._batch_size:
+            return await self.flush()
+
+        # NOTE: The timer is started by the first reading in the batch
+        if self._timer is None:
+            self._timer = asyncio.get_running_loop().call_later(
+                self._flush_interval, self._on_timer
+            )
+
+        return []
+
+    def _on_timer(self) -> None:
+        """Flush the buffer in a background task if the time is up."""
+
+        self._timer = None
+        self._timer_task = asyncio.create_task(self.flush())
+        self._timer_task.add_done_callback(self._on_flushed)
+
+    def _on_flushed(self, task: asyncio.Task) -> None:
+        """Report the failure of the background flush,
+        since nothing awaits it.
+        """
+
+        if not task.cancelled() and (error := task.exception()) is not None:
+            logger.opt(exception=error).error(
+                f"The flush of readings of the sensor {self.sensor.id} failed"
+            )
+
+    async def flush(self) -> list[TsdFlat]:
+        """Save all buffered readings in one transaction
+        and produce them to the data lake.
+        """
+
+        async with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+
+            if not self._items:
+                return []
+
+            schemas, self._items = self._items, []
+            try:
+                instances: list[TsdFlat] | None = await bulk_create(schemas)
+            except Exception:
+                self._requeue(schemas)
+                raise
+
+            # NOTE: The transaction returns nothing if the integrity
+            #       error is rolled back
+            if instances is None:
+                self._drop(schemas, reason="they are rejected by the database")
+                return []
+
+            await self._publish_lock.acquire()
+
+        try:
+            await self._publish(instances)
+        finally:
+            self._publish_lock.release()
+
+        return instances
+
+    def _requeue(self, schemas: list[TsdUncommited]) -> None:
+        """Keep readings of the failed insert for the next flush.
+        The oldest ones are dropped if too many readings are pending.
+        """
+
+        self._items[:0] = schemas
+
+        if (overflow := len(self._items) - self._max_pending) > 0:
+            self._drop(
+                self._items[:overflow], reason="too many readings are pending"
+            )
+            del self._items[:overflow]
+
+    def _drop(self, schemas: list[TsdUncommited], reason: str) -> None:
+        self.dropped += len(schemas)
+        logger.error(
+            f"{len(schemas)} readings of the sensor {self.sensor.id} "
+            f"from {schemas[0].timestamp} to {schemas[-1].timestamp} "
+            f"are dropped, since {reason}. Total dropped: {self.dropped}"
+        )
+
+    async def _publish(self, instances: list[TsdFlat]) -> None:
+        for tsd in instances:
+            # Update the data lake for background processing.
+            # NOTE: The flush waits here if the processing is behind
+            await data_lake.time_series_data.put(tsd)
+            # Update the data lake for websocket connections
+            data_lake.time_series_data_by_sensor.put_nowait(
+                self.sensor.id, tsd
+            )
+            # Update the data lake for the vectorized access
+            data_lake.recent_readings.put(tsd)
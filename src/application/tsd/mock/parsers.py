@@ -1,19 +1,51 @@
 from typing import Callable
 
+import numpy as np
+import pandas as pd
 from dateutil.parser import parse as datetime_parser
+from numpy.typing import NDArray
 
 from src.domain.fields import Field
-from src.domain.tsd import TsdRaw
+from src.domain.tsd import TsdRawChunk
 from src.infrastructure.errors.base import NotFoundError
 
-__all__ = ("FieldParserCallback", "get_parser")
+__all__ = ("FieldParserCallback", "get_parser", "parse_timestamps")
 
 
-FieldParserCallback = Callable[[list[str]], TsdRaw]
+FieldParserCallback = Callable[[pd.DataFrame], TsdRawChunk]
 
 
-def trestakk_parser(raw_data: list[str]) -> TsdRaw:
+def _parse_timestamp(value: str) -> np.datetime64:
+    """Parse the single timestamp.
+    The dateutil parser is used only if the format is not ISO 8601.
+    """
+
+    try:
+        return np.datetime64(value, "us")
+    except ValueError:
+        return np.datetime64(datetime_parser(value), "us")
+
+
+def parse_timestamps(values: NDArray[np.str_]) -> NDArray[np.datetime64]:
+    """Parse the column of timestamps.
+
+    The fast path converts the whole column at once since the mocked data
+    is stored in the ISO 8601 format. If any value does not match it,
+    the column is parsed element by element.
+    """
+
+    try:
+        return values.astype("datetime64[us]")
+    except ValueError:
+        return np.array(
+            [_parse_timestamp(value) for value in values],
+            dtype="datetime64[us]",
+        )
+
+
+def trestakk_parser(raw_data: pd.DataFrame) -> TsdRawChunk:
     """The trestakk parser mock time series data parser.
+    It takes the chunk of CSV rows and returns typed columns.
 
     The example of mocked data (from the mock/19XT2116.csv file):
     -   -------------------         ------------------
@@ -23,13 +55,17 @@ def trestakk_parser(raw_data: list[str]) -> TsdRaw:
     1   2020-04-25 03:59:28.812     40.84138870239258
     """
 
-    return TsdRaw(
-        timestamp=datetime_parser(raw_data[1]), ppmv=float(raw_data[2])
+    return TsdRawChunk(
+        timestamps=parse_timestamps(
+            raw_data.iloc[:, 0].to_numpy(dtype=np.str_)
+        ),
+        ppmv=raw_data.iloc[:, 1].to_numpy(dtype=np.float64),
     )
 
 
-def snorre_parser(raw_data: list[str]) -> TsdRaw:
+def snorre_parser(raw_data: pd.DataFrame) -> TsdRawChunk:
     """The snorre parser mock time series data parser.
+    It takes the chunk of CSV rows and returns typed columns.
 
     The example of mocked data (from the mock/snorre.csv file):
     -----   -------------------  ----    ----------
@@ -39,8 +75,11 @@ def snorre_parser(raw_data: list[str]) -> TsdRaw:
     590706  2021-04-05 14:12:42  89.2    0 days 00:05:45
     """
 
-    return TsdRaw(
-        timestamp=datetime_parser(raw_data[1]), ppmv=float(raw_data[2])
+    return TsdRawChunk(
+        timestamps=parse_timestamps(
+            raw_data.iloc[:, 0].to_numpy(dtype=np.str_)
+        ),
+        ppmv=raw_data.iloc[:, 1].to_numpy(dtype=np.float64),
     )
 
 
@@ -1,40 +1,56 @@
 """
 The main purpose of this module is establishing the fake
 data source with mocked CSV files.
+It is used by the mock source: src/application/tsd/sources.py
+
+Files are read by chunks which are parsed into columns at once,
+since the row-by-row parsing is the bottleneck on replaying big files.
 """
-import asyncio
-import csv
 from pathlib import Path
-from typing import AsyncGenerator
+from typing import Iterator
+
+import pandas as pd
 
 from src.config import settings
 from src.domain.sensors import Sensor
+from src.domain.tsd import TsdRaw, TsdRawChunk
 
-__all__ = ("read_from_csv_file",)
+from .parsers import FieldParserCallback
 
+__all__ = (
+    "PPMV_DEMO_LIMIT",
+    "read_from_csv_file",
+    "read_chunks_from_csv_file",
+)
 
-async def read_from_csv_file(
-    sensor: Sensor,
-) -> AsyncGenerator[list[str] | None, None]:
-    """
-    This function fakes the API call.
-    If we do not have the response - the None is returned.
+
+# The number of CSV rows that are parsed at once
+CHUNK_SIZE = 10_000
+
+# NOTE: Some files have pick values that we'd like to avoide for the demo
+PPMV_DEMO_LIMIT = 10_000
+
+
+def read_chunks_from_csv_file(
+    filename: Path, chunk_size: int = CHUNK_SIZE
+) -> Iterator[pd.DataFrame]:
+    """Read the CSV file by chunks of rows.
+    The first column is an index, so it is skipped.
     """
 
-    # Build the file path base on the sensor.tag
-    filename: Path = settings.mock_dir / f"tsd/{sensor.name}.csv"
+    with pd.read_csv(filename, index_col=0, chunksize=chunk_size) as reader:
+        yield from reader
 
-    with open(filename) as file:
-        reader = csv.reader(file)
-        next(reader)  # Skip the header row
 
-        for row in reader:
-            # HACK: Simulate the long request from the external source
-            await asyncio.sleep(settings.tsd_fetch_periodicity)
-            yield row
+def read_from_csv_file(
+    sensor: Sensor, parser: FieldParserCallback
+) -> Iterator[TsdRaw]:
+    """Read raw readings of the sensor one by one.
+    The file is found by the sensor name (which is a tag).
+    """
+
+    filename: Path = settings.mock_dir / f"tsd/{sensor.name}.csv"
 
-        # Simulate the case when we do not have the response
-        # from the OMNIA API. Or the sensor is not available
-        while True:
-            await asyncio.sleep(settings.tsd_fetch_periodicity)
-            yield None
+    for rows in read_chunks_from_csv_file(filename):
+        chunk: TsdRawChunk = parser(rows)
+        yield from chunk.to_raw()
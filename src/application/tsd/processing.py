@@ -1,27 +1,23 @@
 """
-The general purpose: fetch the data from the external source and parse it
-using the specific field parser.
+The general purpose: fetch the data from the external source
+and pass it to ingestion buffers using the polling scheduler.
 
 Also, crud operations for the time series data are implemented here.
 """
 
-from functools import partial
-
 import numpy as np
 
-from src.application.data_lake import data_lake
-from src.config import settings
-from src.domain.sensors import Sensor, SensorsRepository
 from src.domain.tsd import Tsd, TsdFlat, TsdRaw, TsdRepository, TsdUncommited
-from src.infrastructure.application import tasks
 from src.infrastructure.database import transaction
+from src.infrastructure.errors import NotFoundError
 
-from ..tsd import mock
+from .deduplication import get_recent_timestamps
+from .scheduler import polling
 
 __all__ = (
     "process",
-    "create_tasks_for_existed_sensors_process",
     "get_historical_data",
+    "get_missed_data",
     "get_by_id",
     "create",
 )
@@ -55,60 +51,40 @@ async def get_historical_data(sensor_id: int) -> list[TsdFlat]:
     return [tsd async for tsd in TsdRepository().filter(sensor_id)]
 
 
-# ************************************************
-# ********** Processing **********
-# ************************************************
-async def _mock_process_time_series_data(sensor):
-    """The mock implementation of time series data
-    pre processing using CSV files.
-    """
-
-    parser: mock.FieldParserCallback = mock.get_parser(
-        sensor.template.field_id
-    )
-
-    # Get the raw string from the CSV file and parse is to the internal model
-    async for row in mock.read_from_csv_file(sensor):
-        if not row:
-            continue
-
-        tsd_raw: TsdRaw = parser(row)
-
-        # NOTE: Some files have pick values that we'd like
-        #       to avoide for the demo
-        if tsd_raw.ppmv > 10000:
-            continue
+@transaction
+async def get_missed_data(
+    sensor_id: int, after_id: int, limit: int
+) -> list[TsdFlat]:
+    """Get the latest data (up to the limit) after the id."""
 
-        tsd: Tsd = await create(tsd_raw, sensor.id)
+    try:
+        missed: list[TsdFlat] = [
+            tsd
+            async for tsd in TsdRepository().filter(
+                sensor_id, after_id=after_id, limit=limit, order_by_desc=True
+            )
+        ]
+    except NotFoundError:
+        return []
 
-        # Update the data lake for background processing
-        data_lake.time_series_data.storage.append(tsd)
-        # Update the data lake for websocket connections
-        data_lake.time_series_data_by_sensor[tsd.sensor.id].storage.append(tsd)
+    return missed[::-1]
 
 
-async def process(sensor: Sensor):
-    """The general interface for fetching and parsing the time series data
+# ************************************************
+# ********** Processing **********
+# ************************************************
+async def process():
+    """The general interface for fetching the time series data
     that is taken from the external source.
 
-    The production OMNIA API flow is refected by default
-    due to Equinore request waiting till September.
+    All running sensors are polled by the single scheduler.
+    They are added to the scheduler by the sensors lifecycle
+    (src/application/lifecycle.py).
     """
 
-    if settings.debug is True:
-        await _mock_process_time_series_data(sensor)
-
-    raise NotImplementedError(
-        "This feature is not available due to OMNIA API access issues"
+    # NOTE: Readings that are already saved are not ingested again
+    polling.deduplicator.warm_up(
+        await get_recent_timestamps(limit=polling.deduplicator.recent_size)
     )
 
-
-async def create_tasks_for_existed_sensors_process():
-    """Run a batch of background tasks."""
-
-    async for sensor in SensorsRepository().filter():
-        await tasks.run(
-            namespace="sensor_tsd_process",
-            key=sensor.id,
-            coro=partial(process, sensor),
-        )
+    await polling.run()
@@ -0,0 +1,238 @@
+"""
+The streaming resampling of the time series data.
+
+Raw readings could arrive much more often than the anomaly detection
+expects (the window size is defined for the 10-minute cadence).
+The resampler groups readings of the sensor into fixed intervals that are
+aligned to the epoch and aggregates each interval into one reading.
+The interval is emitted as soon as the reading from the next one arrives,
+the timestamp of the result is the interval start.
+
+Readings that belong to already emitted intervals are dropped.
+"""
+
+from datetime import datetime, timedelta
+from enum import StrEnum, auto
+
+import numpy as np
+from numpy.typing import NDArray
+
+from src.config import (
+    TsdResamplingSettings,
+    TsdSensorResamplingSettings,
+    settings,
+)
+from src.domain.sensors import Sensor
+from src.domain.tsd import TsdRaw, TsdRawChunk, naive_utc
+
+__all__ = ("Aggregation", "TsdResampler")
+
+
+class Aggregation(StrEnum):
+    MEAN = auto()
+    MAX = auto()
+    LAST = auto()
+
+
+class TsdResampler:
+    """The per-sensor streaming resampler.
+
+    Example:
+        >>> resampler = TsdResampler(timedelta(minutes=10), Aggregation.MEAN)
+        >>> readings: list[TsdRaw] = resampler.push(tsd_raw)
+        >>> chunk: TsdRawChunk = resampler.push_chunk(chunk)  # vectorized
+        >>> rest: TsdRawChunk = resampler.flush()  # the unfinished interval
+    """
+
+    def __init__(self, interval: timedelta, aggregation: Aggregation) -> None:
+        self.interval: timedelta = interval
+        self.aggregation: Aggregation = aggregation
+        self._interval_us: int = interval // timedelta(microseconds=1)
+
+        # The state of the interval that is not emitted yet
+        self._bucket: int | None = None
+        self._sum: float = 0.0
+        self._count: int = 0
+        self._max: float = -np.inf
+        self._last: float = 0.0
+
+        self.dropped: int = 0
+
+    @classmethod
+    def for_sensor(cls, sensor: Sensor) -> "TsdResampler | None":
+        """Create the resampler based on settings.
+        The sensor-specific settings override global ones.
+        """
+
+        config: TsdResamplingSettings = settings.tsd.resampling
+
+        # NOTE: Names are compared case-insensitively
+        #       since environment variables are not case-sensitive
+        override: TsdSensorResamplingSettings | None = next(
+            (
+                item
+                for name, item in config.sensors.items()
+                if name.lower() == sensor.name.lower()
+            ),
+            None,
+        )
+
+        if not (
+            override.enabled
+            if override and override.enabled is not None
+            else config.enabled
+        ):
+            return None
+
+        return cls(
+            interval=(override and override.interval) or config.interval,
+            aggregation=Aggregation(
+                (override and override.aggregation) or config.aggregation
+            ),
+        )
+
+    def _value(self) -> float:
+        match self.aggregation:
+            case Aggregation.MAX:
+                return self._max
+            case Aggregation.LAST:
+                return self._last
+            case _:
+                return self._sum / self._count
+
+    def _bucket_start(self) -> np.datetime64:
+        assert self._bucket is not None
+
+        return np.datetime64(self._bucket * self._interval_us, "us")
+
+    def _reset(self, bucket: int | None) -> None:
+        self._bucket = bucket
+        self._sum, self._count, self._max, self._last = 0.0, 0, -np.inf, 0.0
+
+    def _add(self, ppmv: float) -> None:
+        self._sum += ppmv
+        self._count += 1
+        self._max = max(self._max, ppmv)
+        self._last = ppmv
+
+    def push(self, tsd_raw: TsdRaw) -> list[TsdRaw]:
+        """Add the reading.
+        Returns the aggregated reading if the interval is finished.
+        """
+
+        # NOTE: Aware timestamps are converted to UTC like in `push_chunk`
+        timestamp: datetime = naive_utc(tsd_raw.timestamp)
+
+        bucket: int = (
+            np.datetime64(timestamp, "us").astype(np.int64).item()
+            // self._interval_us
+        )
+        results: list[TsdRaw] = []
+
+        if self._bucket is not None and bucket < self._bucket:
+            self.dropped += 1
+            return results
+
+        if self._bucket is not None and bucket > self._bucket:
+            results.append(
+                TsdRaw(
+                    ppmv=self._value(),
+                    timestamp=self._bucket_start().item(),
+                )
+            )
+
+        if bucket != self._bucket:
+            self._reset(bucket)
+
+        self._add(tsd_raw.ppmv)
+
+        return results
+
+    def push_chunk(self, chunk: TsdRawChunk) -> TsdRawChunk:
+        """The vectorized version of `push` for the sorted chunk.
+        Returns aggregated readings of all finished intervals.
+        """
+
+        buckets: NDArray[np.int64] = (
+            chunk.timestamps.astype("datetime64[us]").astype(np.int64)
+            // self._interval_us
+        )
+        ppmv: NDArray[np.float64] = chunk.ppmv
+
+        if self._bucket is not None:
+            mask = buckets >= self._bucket
+            self.dropped += int((~mask).sum())
+            buckets, ppmv = buckets[mask], ppmv[mask]
+
+        if not buckets.size:
+            return _empty_chunk()
+
+        # Boundaries of intervals within the chunk
+        starts: NDArray[np.intp] = np.flatnonzero(
+            np.diff(buckets, prepend=buckets[0] - 1)
+        )
+        ends: NDArray[np.intp] = np.append(starts[1:], buckets.size)
+        counts: NDArray[np.intp] = ends - starts
+
+        match self.aggregation:
+            case Aggregation.MAX:
+                values = np.maximum.reduceat(ppmv, starts)
+            case Aggregation.LAST:
+                values = ppmv[ends - 1]
+            case _:
+                values = np.add.reduceat(ppmv, starts)
+
+        # NOTE: The first interval might continue the pending one
+        if self._bucket is not None and buckets[0] == self._bucket:
+            match self.aggregation:
+                case Aggregation.MAX:
+                    values[0] = max(values[0], self._max)
+                case Aggregation.MEAN:
+                    values[0] += self._sum
+                    counts[0] += self._count
+
+        if self.aggregation == Aggregation.MEAN:
+            values = values / counts
+
+        # All intervals except of the last one are finished
+        timestamps: list[NDArray[np.datetime64]] = [
+            (buckets[starts[:-1]] * self._interval_us).astype("datetime64[us]")
+        ]
+        values_set: list[NDArray[np.float64]] = [values[:-1]]
+
+        # The pending interval is finished if the chunk starts the new one
+        if self._bucket is not None and buckets[0] != self._bucket:
+            timestamps.insert(0, np.array([self._bucket_start()]))
+            values_set.insert(0, np.array([self._value()]))
+
+        # The last interval is kept pending
+        if self._bucket != (last_bucket := int(buckets[-1])):
+            self._reset(last_bucket)
+        for value in ppmv[starts[-1] :].tolist():
+            self._add(value)
+
+        return TsdRawChunk(
+            timestamps=np.concatenate(timestamps),
+            ppmv=np.concatenate(values_set),
+        )
+
+    def flush(self) -> TsdRawChunk:
+        """Emit the unfinished interval."""
+
+        if self._bucket is None:
+            return _empty_chunk()
+
+        chunk = TsdRawChunk(
+            timestamps=np.array([self._bucket_start()]),
+            ppmv=np.array([self._value()]),
+        )
+        self._reset(None)
+
+        return chunk
+
+
+def _empty_chunk() -> TsdRawChunk:
+    return TsdRawChunk(
+        timestamps=np.array([], dtype="datetime64[us]"),
+        ppmv=np.array([], dtype=np.float64),
+    )
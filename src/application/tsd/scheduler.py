@@ -0,0 +1,286 @@
+"""
+The polling scheduler of the time series data.
+
+All sensors are polled by the single background task instead of running
+a long-lived task per sensor. The heap keeps the next due time of each
+sensor, so all sensors that are due are fetched within one cycle and
+the scheduler sleeps until the next due time otherwise.
+
+Readings are resampled (if it is turned on for the sensor) and then
+duplicated and late ones are filtered out by the deduplicator before
+they reach ingestion buffers. The deduplicator sees resampled readings,
+since their timestamps (interval starts) are the ones that are saved
+and it is warmed up with after the restart.
+
+Sensors without new readings are polled less often: the interval is
+multiplied by the backoff factor up to the max interval and it is reset
+to the base one as soon as readings appear again. Sensors which polling
+fails are backed off the same way, so the failure of one sensor
+does not stop polling of others.
+"""
+
+import asyncio
+import heapq
+
+from loguru import logger
+
+from src.config import settings
+from src.domain.sensors import Sensor
+from src.domain.tsd import TsdRaw
+from src.infrastructure.errors import ExternalSourceError
+
+from .deduplication import TsdDeduplicator
+from .ingestion import TsdIngestionBuffer
+from .resampling import TsdResampler
+from .sources import TsdSource, get_source
+
+__all__ = ("PollingScheduler", "polling")
+
+
+# NOTE: The backoff starts from this interval if the base one is zero,
+#       otherwise exhausted sensors would be polled continuously
+MIN_BACKOFF_INTERVAL = 0.1
+
+
+class PollingScheduler:
+    """The heap-based scheduler that polls the source for all sensors.
+
+    Example:
+        >>> polling.add(sensor)
+        >>> await polling.run()  # runs forever
+        >>> await polling.remove(sensor.id)  # might be done from other task
+    """
+
+    def __init__(
+        self,
+        interval: float = settings.tsd_fetch_periodicity,
+        max_interval: float = settings.tsd.polling.max_interval,
+        backoff_factor: float = settings.tsd.polling.backoff_factor,
+        deduplicator: TsdDeduplicator | None = None,
+    ) -> None:
+        self._interval: float = interval
+        self._max_interval: float = max_interval
+        self._backoff_factor: float = backoff_factor
+        self.deduplicator: TsdDeduplicator = deduplicator or TsdDeduplicator()
+
+        self._sensors: dict[int, Sensor] = {}
+        self._buffers: dict[int, TsdIngestionBuffer] = {}
+        self._resamplers: dict[int, TsdResampler | None] = {}
+        self._intervals: dict[int, float] = {}
+
+        # NOTE: The heap might include outdated entries of rescheduled or
+        #       removed sensors. The entry is valid only if its due time
+        #       matches the one from the `_due` mapping.
+        self._heap: list[tuple[float, int]] = []
+        self._due: dict[int, float] = {}
+
+        self._wakeup = asyncio.Event()
+
+    def __len__(self) -> int:
+        return len(self._sensors)
+
+    def __contains__(self, sensor_id: int) -> bool:
+        return sensor_id in self._sensors
+
+    def _schedule(self, sensor_id: int, due: float) -> None:
+        self._due[sensor_id] = due
+        heapq.heappush(self._heap, (due, sensor_id))
+
+    def add(self, sensor: Sensor) -> None:
+        """Start polling the sensor immediately."""
+
+        self._sensors[sensor.id] = sensor
+        self._buffers.setdefault(sensor.id, TsdIngestionBuffer(sensor))
+        self._resamplers.setdefault(sensor.id, TsdResampler.for_sensor(sensor))
+        self._intervals[sensor.id] = self._interval
+        self._schedule(sensor.id, asyncio.get_running_loop().time())
+
+        self._wakeup.set()
+
+    async def remove(self, sensor_id: int) -> None:
+        """Stop polling the sensor.
+        Readings that are left in the buffer are saved.
+        """
+
+        self._sensors.pop(sensor_id, None)
+        self._intervals.pop(sensor_id, None)
+        self._due.pop(sensor_id, None)
+        self._resamplers.pop(sensor_id, None)
+        self.deduplicator.discard(sensor_id)
+        get_source().discard(sensor_id)
+
+        if (buffer := self._buffers.pop(sensor_id, None)) is not None:
+            await buffer.flush()
+
+    def _pop_due(self, now: float) -> list[Sensor]:
+        """Pop all sensors which due time is reached."""
+
+        sensors: list[Sensor] = []
+
+        while self._heap and self._heap[0][0] <= now:
+            due, sensor_id = heapq.heappop(self._heap)
+            if self._due.get(sensor_id) != due:
+                continue
+
+            del self._due[sensor_id]
+            sensors.append(self._sensors[sensor_id])
+
+        return sensors
+
+    async def _wait(self, now: float) -> None:
+        """Sleep until the next due time or the new sensor is added."""
+
+        timeout: float | None = self._heap[0][0] - now if self._heap else None
+
+        self._wakeup.clear()
+        try:
+            await asyncio.wait_for(self._wakeup.wait(), timeout=timeout)
+        except asyncio.TimeoutError:
+            pass
+
+    def _backoff(self, sensor_id: int) -> None:
+        """Increase the polling interval of the sensor."""
+
+        self._intervals[sensor_id] = min(
+            max(self._intervals[sensor_id], MIN_BACKOFF_INTERVAL)
+            * self._backoff_factor,
+            self._max_interval,
+        )
+
+    async def _fetch(
+        self, source: TsdSource, sensors: list[Sensor]
+    ) -> tuple[dict[int, list[TsdRaw]], set[int]]:
+        """Fetch readings for all sensors at once. If the batch fails
+        unexpectedly, sensors are fetched one by one, so the failure
+        is isolated. Ids of sensors which fetch failed are returned.
+        """
+
+        try:
+            return await source.fetch(sensors), set()
+        except ExternalSourceError as error:
+            logger.error(f"Polling of {len(sensors)} sensors failed: {error}")
+            return {}, set()
+        except Exception:
+            if len(sensors) == 1:
+                logger.exception(
+                    f"Polling of the sensor {sensors[0].id} failed"
+                )
+                return {}, {sensors[0].id}
+
+        results: dict[int, list[TsdRaw]] = {}
+        failed: set[int] = set()
+
+        for sensor in sensors:
+            try:
+                results.update(await source.fetch([sensor]))
+            except ExternalSourceError as error:
+                logger.error(
+                    f"Polling of the sensor {sensor.id} failed: {error}"
+                )
+            except Exception:
+                logger.exception(f"Polling of the sensor {sensor.id} failed")
+                failed.add(sensor.id)
+
+        return results, failed
+
+    async def _poll(self, source: TsdSource, sensors: list[Sensor]) -> None:
+        """Fetch readings for all due sensors at once
+        and pass them to ingestion buffers.
+        """
+
+        results, failed = await self._fetch(source, sensors)
+
+        for sensor in sensors:
+            # NOTE: The sensor could be removed during the fetch
+            if sensor.id not in self._sensors:
+                continue
+
+            if sensor.id in failed:
+                self._backoff(sensor.id)
+                self._schedule(
+                    sensor.id,
+                    asyncio.get_running_loop().time()
+                    + self._intervals[sensor.id],
+                )
+                continue
+
+            interval: float = self._intervals[sensor.id]
+
+            try:
+                await self._ingest(sensor, results.get(sensor.id))
+            except Exception:
+                # NOTE: The failure of one sensor does not stop the polling
+                logger.exception(f"Ingestion of the sensor {sensor.id} failed")
+
+                # NOTE: The backoff continues from the interval
+                #       before the failed attempt
+                if sensor.id in self._sensors:
+                    self._intervals[sensor.id] = interval
+                    self._backoff(sensor.id)
+                    self._schedule(
+                        sensor.id,
+                        asyncio.get_running_loop().time()
+                        + self._intervals[sensor.id],
+                    )
+
+    async def _ingest(
+        self, sensor: Sensor, readings: list[TsdRaw] | None
+    ) -> None:
+        """Pass readings of the sensor to its ingestion buffer."""
+
+        buffer: TsdIngestionBuffer = self._buffers[sensor.id]
+
+        # NOTE: The sensor is considered alive even if all readings
+        #       are rejected by the deduplicator
+        if not readings:
+            self._backoff(sensor.id)
+        else:
+            self._intervals[sensor.id] = self._interval
+
+        # NOTE: The sensor is scheduled before the buffer is awaited
+        #       since it could be removed in the meantime
+        self._schedule(
+            sensor.id,
+            asyncio.get_running_loop().time() + self._intervals[sensor.id],
+        )
+
+        if (resampler := self._resamplers.get(sensor.id)) is not None:
+            readings = [
+                resampled
+                for tsd_raw in readings or []
+                for resampled in resampler.push(tsd_raw)
+            ]
+
+        accepted: list[TsdRaw] = self.deduplicator.filter(
+            sensor.id, readings or []
+        )
+
+        if accepted:
+            # NOTE: The buffer produces readings to the data lake
+            #       after the flush
+            for tsd_raw in accepted:
+                await buffer.add(tsd_raw)
+        else:
+            # NOTE: Nothing is left in the source, so the rest of
+            #       the buffer should not wait for the next reading
+            await buffer.flush()
+
+    async def run(self) -> None:
+        """Poll sensors forever."""
+
+        source: TsdSource = get_source()
+        loop = asyncio.get_running_loop()
+
+        while True:
+            if sensors := self._pop_due(now := loop.time()):
+                await self._poll(source, sensors)
+
+                # NOTE: The source might not await anything (e.g. the mock),
+                #       so other tasks should get the control explicitly
+                await asyncio.sleep(0)
+            else:
+                await self._wait(now)
+
+
+# NOTE: The scheduler is shared by the whole application
+polling = PollingScheduler()
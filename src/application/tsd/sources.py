@@ -0,0 +1,167 @@
+"""
+The pluggable external sources of the time series data.
+
+Each source fetches new readings for the batch of sensors at once,
+so the implementation could decide how to group them into requests.
+The source is selected by the TSD__SOURCE setting.
+"""
+
+from abc import ABC, abstractmethod
+from datetime import datetime
+from itertools import islice
+from typing import Iterator, Sequence
+
+from src.config import settings
+from src.domain.sensors import Sensor
+from src.domain.tsd import TsdRaw
+from src.infrastructure.omnia import (
+    OmniaClient,
+    OmniaDataQuery,
+    OmniaTimeseriesData,
+)
+
+from . import mock
+
+__all__ = (
+    "TsdSource",
+    "MockTsdSource",
+    "OmniaTsdSource",
+    "get_source",
+    "close_source",
+)
+
+
+class TsdSource(ABC):
+    """The interface of the external time series data source."""
+
+    @abstractmethod
+    async def fetch(
+        self, sensors: Sequence[Sensor]
+    ) -> dict[int, list[TsdRaw]]:
+        """Fetch new readings for sensors.
+        Returns readings grouped by the sensor id.
+        """
+
+    def discard(self, sensor_id: int) -> None:
+        """Forget the state of the sensor that is not processed anymore."""
+
+    async def close(self) -> None:
+        """Release resources that are used by the source."""
+
+
+class MockTsdSource(TsdSource):
+    """The source that replays mocked CSV files.
+    Only one reading per sensor is returned on each fetch
+    in order to imitate the real-time data flow.
+    """
+
+    def __init__(self) -> None:
+        self._readers: dict[int, Iterator[TsdRaw]] = {}
+
+    def _reader(self, sensor: Sensor) -> Iterator[TsdRaw]:
+        if (reader := self._readers.get(sensor.id)) is None:
+            reader = self._readers[sensor.id] = (
+                tsd_raw
+                for tsd_raw in mock.read_from_csv_file(
+                    sensor, mock.get_parser(sensor.template.field_id)
+                )
+                if tsd_raw.ppmv <= mock.PPMV_DEMO_LIMIT
+            )
+
+        return reader
+
+    async def fetch(
+        self, sensors: Sequence[Sensor]
+    ) -> dict[int, list[TsdRaw]]:
+        results: dict[int, list[TsdRaw]] = {}
+
+        for sensor in sensors:
+            try:
+                results[sensor.id] = list(islice(self._reader(sensor), 1))
+            except Exception:
+                # NOTE: The failed reader is exhausted,
+                #       so it is created again on the next fetch
+                self._readers.pop(sensor.id, None)
+                raise
+
+        return results
+
+    def discard(self, sensor_id: int) -> None:
+        self._readers.pop(sensor_id, None)
+
+
+class OmniaTsdSource(TsdSource):
+    """The source that fetches readings from the OMNIA API.
+    The sensor name is used as a tag. Only readings that come after
+    the last fetched one are requested for each sensor.
+    """
+
+    def __init__(self) -> None:
+        self._client = OmniaClient()
+        self._last_timestamps: dict[int, datetime] = {}
+
+    async def fetch(
+        self, sensors: Sequence[Sensor]
+    ) -> dict[int, list[TsdRaw]]:
+        items: list[OmniaTimeseriesData] = await self._client.query_data(
+            [
+                OmniaDataQuery(
+                    id=sensor.name,
+                    start_time=self._last_timestamps.get(sensor.id),
+                    limit=settings.omnia.limit,
+                )
+                for sensor in sensors
+            ]
+        )
+        items_by_tag: dict[str, OmniaTimeseriesData] = {
+            item.id: item for item in items
+        }
+
+        results: dict[int, list[TsdRaw]] = {}
+        for sensor in sensors:
+            if not (item := items_by_tag.get(sensor.name)):
+                results[sensor.id] = []
+                continue
+
+            results[sensor.id] = [
+                TsdRaw(ppmv=datapoint.value, timestamp=datapoint.time)
+                for datapoint in item.datapoints
+            ]
+            if item.datapoints:
+                self._last_timestamps[sensor.id] = item.datapoints[-1].time
+
+        return results
+
+    def discard(self, sensor_id: int) -> None:
+        self._last_timestamps.pop(sensor_id, None)
+
+    async def close(self) -> None:
+        await self._client.close()
+
+
+_SOURCE: TsdSource | None = None
+
+
+def get_source() -> TsdSource:
+    """Return the source that is selected by settings.
+    It is created once and shared by all sensors.
+    """
+
+    global _SOURCE
+
+    if _SOURCE is None:
+        match settings.tsd.source:
+            case "omnia":
+                _SOURCE = OmniaTsdSource()
+            case _:
+                _SOURCE = MockTsdSource()
+
+    return _SOURCE
+
+
+async def close_source() -> None:
+    global _SOURCE
+
+    if _SOURCE is not None:
+        await _SOURCE.close()
+        _SOURCE = None
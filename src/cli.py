@@ -0,0 +1,45 @@
+"""
+The command line interface for maintenance operations
+that are not supposed to be run by the web application.
+
+Usage:
+    python -m src.cli backfill --sensor-id 1 --file mock/tsd/sensor.csv
+
+⚠️ The backfill here runs in its own process, so the deduplicator
+of the web application does not know saved readings and the polling
+could save them again. Use it only for sensors that are not running,
+otherwise use the admin endpoint `POST /sensors/{sensor_id}/backfill`.
+"""
+
+import argparse
+import asyncio
+from pathlib import Path
+
+from src.application import tsd
+
+
+def _backfill(args: argparse.Namespace) -> None:
+    asyncio.run(tsd.backfill(sensor_id=args.sensor_id, filename=args.file))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog="python -m src.cli")
+    subparsers = parser.add_subparsers(required=True)
+
+    backfill_parser = subparsers.add_parser(
+        "backfill",
+        help=(
+            "Load the historical time series data "
+            "for the sensor that is not running"
+        ),
+    )
+    backfill_parser.add_argument("--sensor-id", type=int, required=True)
+    backfill_parser.add_argument("--file", type=Path, required=True)
+    backfill_parser.set_defaults(callback=_backfill)
+
+    args: argparse.Namespace = parser.parse_args()
+    args.callback(args)
+
+
+if __name__ == "__main__":
+    main()
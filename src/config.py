@@ -1,5 +1,7 @@
+import os
 from datetime import timedelta
 from pathlib import Path
+from typing import Literal
 
 import numpy as np
 from pydantic import BaseConfig, BaseModel, BaseSettings
@@ -21,6 +23,10 @@ class PublicApiSettings(BaseModel):
     name: str = "Franatech"
     urls: APIUrlsSettings = APIUrlsSettings()
 
+    # The max number of missed items that are taken from the database
+    # when the websocket client reconnects with the last seen id
+    websocket_resume_limit: int = 1_000
+
 
 # Database Settings
 class DatabaseSettings(BaseModel):
@@ -31,6 +37,38 @@ class DatabaseSettings(BaseModel):
         return f"sqlite+aiosqlite:///./{self.name}"
 
 
+# OMNIA API Settings
+class OmniaSettings(BaseModel):
+    """Configure the OMNIA time series API client.
+    The pooled client keeps connections alive between polls
+    and fetches readings for many tags within one request.
+    """
+
+    base_url: str = "http://localhost:8001"
+
+    # The timeout (in seconds) for the whole request
+    timeout: float = 10.0
+
+    # Connection pool limits
+    max_connections: int = 20
+    max_keepalive_connections: int = 10
+    keepalive_expiry: float = 30.0
+
+    # The max number of tags that are fetched within one request
+    tags_per_request: int = 100
+
+    # The max number of requests that are performed concurrently
+    concurrency: int = 4
+
+    # The max number of datapoints per tag in the response
+    limit: int = 1000
+
+    # Failed requests are retried with the exponential backoff (in seconds)
+    retries: int = 3
+    backoff_factor: float = 0.5
+    backoff_max: float = 10.0
+
+
 # Logging Settings
 class LoggingSettings(BaseModel):
     """Configure the logging engine."""
@@ -60,6 +98,10 @@ class AdminSettings(BaseModel):
     logo_url: str = "https://preview.tabler.io/static/logo-white.svg"
     debug: bool = False
 
+    # The key that is required by admin-only API endpoints.
+    # These endpoints are disabled if the key is not set.
+    api_key: str | None = None
+
 
 # Sensors Settings
 class SensorsAnomalyDetectionSettings(BaseModel):
@@ -82,8 +124,50 @@ class SensorsSettings(BaseModel):
         SensorsAnomalyDetectionSettings
     ) = SensorsAnomalyDetectionSettings()
 
+    # Sensors are kept in the process-wide registry during this time.
+    # Changes from other processes (baseline jobs) are visible after it.
+    registry_ttl: timedelta = timedelta(minutes=5)
+
+    # The max number of decoded initial baselines that are cached
+    baselines_cache_size: int = 1_000
+
 
 # Anomaly Detection Settings
+class AnomalyDetectionScoringSettings(BaseModel):
+    """Configure the micro-batched scoring. Matrix profiles
+    are updated in the thread pool (or worker processes)
+    outside of the event loop.
+    ref: src/application/anomaly_detection.py
+    """
+
+    # The number of threads. Readings of the same sensor
+    # are scored one by one anyway
+    workers: int = min(os.cpu_count() or 1, 8)
+    # The max number of readings that are scored together
+    # and saved in one transaction
+    batch_size: int = 500
+    # The number of worker processes. Sensors are pinned to workers
+    # by the hash of the id, each worker owns matrix profiles
+    # of its sensors. Zero means scoring in threads of the main process
+    processes: int = 0
+
+
+class AnomalyDetectionSnapshotsSettings(BaseModel):
+    """Configure snapshots of matrix profiles that are restored
+    on the startup, so the anomaly detection resumes immediately.
+    ref: src/domain/anomaly_detection/services/processing/snapshots.py
+    """
+
+    enabled: bool = False
+    path: Path = Path("matrix_profiles.pickle")
+    # The periodicity (in seconds) of saving the snapshot.
+    # It is saved on the shutdown as well
+    interval: float = 600.0
+    # Matrix profiles that are missed or outdated in the snapshot
+    # are rebuilt from last processed readings in the database
+    rebuild: bool = True
+
+
 class AnomalyDetectionSettings(BaseModel):
     # Defines the extension of the file with the matrix profile data.
     mpstream_file_extension: str = ".mpstream"
@@ -107,6 +191,204 @@ class AnomalyDetectionSettings(BaseModel):
     #       _save_interactive_feedback_resutls()
     interactive_feedback_save_max_limit: int = 1000
 
+    scoring: AnomalyDetectionScoringSettings = (
+        AnomalyDetectionScoringSettings()
+    )
+    snapshots: AnomalyDetectionSnapshotsSettings = (
+        AnomalyDetectionSnapshotsSettings()
+    )
+
+
+# Data Lake Settings
+class DataLakeItemSettings(BaseModel):
+    """Configure the bounded data lake item.
+    ref: src/application/data_lake.py: OverflowPolicy
+    """
+
+    # The max number of items in the memory. Unbounded if not set
+    capacity: int | None = None
+    overflow_policy: Literal[
+        "block", "drop_oldest", "drop_newest", "spill"
+    ] = "drop_oldest"
+    # Items are written to the append log if it is turned on
+    persistent: bool = False
+
+
+class DataLakeLogSettings(BaseModel):
+    """Configure append logs that keep items of persistent
+    data lake items between restarts.
+    ref: src/infrastructure/append_log.py
+    """
+
+    enabled: bool = False
+    directory: Path = Path("data_lake")
+    # The size of the segment file in bytes
+    segment_size: int = 16 * 1024 * 1024
+    # The number of segments that are kept for each data lake item
+    retention_segments: int = 4
+    # The periodicity (in seconds) of flushing the log to the disk
+    fsync_interval: float = 1.0
+
+
+class DataLakeSharedMemorySettings(BaseModel):
+    """Configure the shared memory ring of readings
+    that are scored by anomaly detection worker processes.
+    It is used only in the worker-pool mode of the anomaly detection.
+    ref: src/infrastructure/shared_memory.py
+    """
+
+    enabled: bool = False
+    name: str = "leak_detection_time_series_data"
+    # The number of records. Older ones are overwritten.
+    # Batches that do not fit are passed to workers by pickling
+    capacity: int = 100_000
+
+
+class DataLakeSettings(BaseModel):
+    # The anomaly detection processing should not lose readings,
+    # so the ingestion waits if it is behind
+    time_series_data: DataLakeItemSettings = DataLakeItemSettings(
+        capacity=10_000, overflow_policy="block", persistent=True
+    )
+    # Websocket connections are interested only in recent readings
+    time_series_data_by_sensor: DataLakeItemSettings = DataLakeItemSettings(
+        capacity=1_000, overflow_policy="drop_oldest", persistent=True
+    )
+
+    # Critical anomaly detections should not be lost by the simulation,
+    # so the rest of them is kept on the disk
+    anomaly_detections_for_simulation: DataLakeItemSettings = (
+        DataLakeItemSettings(
+            capacity=100, overflow_policy="spill", persistent=True
+        )
+    )
+    anomaly_detections_by_sensor: DataLakeItemSettings = DataLakeItemSettings(
+        capacity=1_000, overflow_policy="drop_oldest", persistent=True
+    )
+
+    events_by_sensor: DataLakeItemSettings = DataLakeItemSettings(
+        capacity=1, overflow_policy="drop_oldest"
+    )
+    events_system: DataLakeItemSettings = DataLakeItemSettings(
+        capacity=20, overflow_policy="drop_oldest"
+    )
+
+    # The number of last readings of each sensor that are kept by columns.
+    # Twice the anomaly detection window size by default
+    recent_readings_capacity: int | None = None
+
+    # The directory for spilled items. The system temp directory by default
+    spill_dir: Path | None = None
+
+    shared_memory: DataLakeSharedMemorySettings = (
+        DataLakeSharedMemorySettings()
+    )
+    log: DataLakeLogSettings = DataLakeLogSettings()
+
+
+# Memory Settings
+class MemorySettings(BaseModel):
+    """Configure the memory accounting of in-process state stores.
+    ref: src/infrastructure/memory.py
+    """
+
+    # The periodicity (in seconds) of logging memory stats
+    log_interval: float = 600.0
+    # The store is reported as the one that only grows if the number
+    # of entries did not decrease during this number of snapshots
+    growth_samples: int = 6
+
+
+# Time Series Data Settings
+class TsdIngestionSettings(BaseModel):
+    """Configure the time series data ingestion buffer.
+    Readings are collected per sensor and flushed to the database
+    with one multi-row insert when any of the thresholds is reached.
+    """
+
+    # The max number of buffered readings per sensor
+    batch_size: int = 100
+
+    # The max time (in seconds) the first buffered reading waits for a flush
+    flush_interval: float = 1.0
+
+    # The max number of readings per sensor that are kept in the buffer
+    # after failed flushes. The oldest ones are dropped above it
+    max_pending: int = 1000
+
+
+class TsdDeduplicationSettings(BaseModel):
+    """Configure the in-memory guard against duplicated
+    and late readings that is applied before the ingestion buffer.
+    """
+
+    # Readings that are older than the last accepted one
+    # by more than this window are rejected
+    lateness: timedelta = timedelta(hours=1)
+
+    # The number of latest timestamps per sensor that are remembered
+    # for finding duplicates within the lateness window
+    recent_size: int = 1000
+
+
+class TsdSensorResamplingSettings(BaseModel):
+    """The sensor-specific resampling settings.
+    Global settings are used for fields that are not set.
+    """
+
+    enabled: bool | None = None
+    interval: timedelta | None = None
+    aggregation: Literal["mean", "max", "last"] | None = None
+
+
+class TsdResamplingSettings(BaseModel):
+    """Configure the streaming resampling of raw readings
+    before they reach the ingestion buffer.
+    """
+
+    enabled: bool = False
+
+    # The anomaly detection window size implies the 10-minute cadence
+    interval: timedelta = timedelta(minutes=10)
+    aggregation: Literal["mean", "max", "last"] = "mean"
+
+    # Overrides by the sensor name.
+    # Example: TSD__RESAMPLING__SENSORS__18AIJ012A__ENABLED=false
+    sensors: dict[str, TsdSensorResamplingSettings] = {}
+
+
+class TsdPollingSettings(BaseModel):
+    """Configure the polling scheduler.
+    The base polling interval is the TSD fetch periodicity.
+    """
+
+    # The interval of sensors without new readings
+    # is multiplied by this factor on each poll
+    backoff_factor: float = 2.0
+
+    # The max interval (in seconds) of sensors without new readings
+    max_interval: float = 60.0
+
+
+class TsdBackfillSettings(BaseModel):
+    """Configure the historical time series data backfill."""
+
+    # The number of readings that are saved and processed at once
+    chunk_size: int = 10_000
+
+
+class TsdSettings(BaseModel):
+    # The external source of readings.
+    # mock: CSV files from the mock directory
+    # omnia: OMNIA API (or the local stub server)
+    source: Literal["mock", "omnia"] = "mock"
+
+    ingestion: TsdIngestionSettings = TsdIngestionSettings()
+    polling: TsdPollingSettings = TsdPollingSettings()
+    deduplication: TsdDeduplicationSettings = TsdDeduplicationSettings()
+    resampling: TsdResamplingSettings = TsdResamplingSettings()
+    backfill: TsdBackfillSettings = TsdBackfillSettings()
+
 
 # Simulation Settings
 class SimulationParameters(InternalModel):
@@ -155,6 +437,7 @@ class Settings(BaseSettings):
 
     # Infrastructure settings
     database: DatabaseSettings = DatabaseSettings()
+    omnia: OmniaSettings = OmniaSettings()
 
     # Application configuration
     public_api: PublicApiSettings = PublicApiSettings()
@@ -163,10 +446,12 @@ class Settings(BaseSettings):
 
     sensors: SensorsSettings = SensorsSettings()
     anomaly_detection: AnomalyDetectionSettings = AnomalyDetectionSettings()
+    tsd: TsdSettings = TsdSettings()
+    data_lake: DataLakeSettings = DataLakeSettings()
     simulation: SimulationSettings = SimulationSettings()
+    memory: MemorySettings = MemorySettings()
 
     tsd_fetch_periodicity: float = 0.05
-    data_lake_consuming_periodicity: float = 0.05
 
     class Config(BaseConfig):
         env_nested_delimiter: str = "__"
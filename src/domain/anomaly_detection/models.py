@@ -1,15 +1,19 @@
+from dataclasses import dataclass, field
 from enum import Enum, StrEnum, auto
 from pathlib import Path
 
 import numpy as np
 from numpy.typing import NDArray
-from pydantic import BaseModel, Field
+from pydantic import BaseModel
 from stumpy.aampi import aampi
 
 from src.config import settings
 from src.domain.tsd import TsdFlat
+from src.infrastructure.columnar_ring import ColumnarRing
 from src.infrastructure.models import InternalModel
 
+from .streaming import SlidingMatrixProfile
+
 __all__ = (
     "AnomalyDetectionBase",
     "AnomalyDeviation",
@@ -65,25 +69,41 @@ class AnomalyDetection(AnomalyDetectionBase, InternalModel):
     time_series_data: TsdFlat
 
 
-class MatrixProfile(InternalModel):
+def _last_values() -> ColumnarRing:
+    # NOTE: Only last `window size` values are used on resets,
+    #       so the ring keeps values between them
+    return ColumnarRing(
+        capacity=settings.anomaly_detection.window_size * 2,
+        columns={"ppmv": np.float64},
+    )
+
+
+@dataclass(slots=True, kw_only=True)
+class MatrixProfile:
     """The Matrix profile intermediate data structure.
 
+    It is changed by each reading, so it is the plain dataclass
+    without the validation on each assignment.
+
     ⚠️ This data model should be simplified!
     """
 
     max_dis: np.float64
     counter: int = 0
-    last_values: list[np.float64] = Field(default_factory=list)
+    last_values: ColumnarRing = field(default_factory=_last_values)
     warning: int = settings.anomaly_detection.warning
     alert: int = settings.anomaly_detection.alert
     window: int = settings.anomaly_detection.window_size
     mp_level: MatrixProfileLevel = MatrixProfileLevel.HIGH
     baseline: aampi
+    # NOTE: The normal mode updates only the sliding matrix profile,
+    #       the baseline is kept for resets
+    sliding: SlidingMatrixProfile
     fb_max_dis: np.float64
-    fb_historical: list[np.float64] = Field(
+    fb_historical: list[np.float64] = field(
         default_factory=list
     )  # all historical data about feedback
-    fb_temp: list[np.float64] = Field(
+    fb_temp: list[np.float64] = field(
         default_factory=list
     )  # items received during the process
     fb_baseline_start: aampi  #  initial baseline
@@ -92,6 +112,10 @@ class MatrixProfile(InternalModel):
     # Defines if first `window size` number of values were consumed
     initial_values_full_capacity: bool = False
 
+    # The last processed reading. It is used for checking
+    # if the snapshot of the matrix profile is outdated
+    last_time_series_data_id: int | None = None
+
 
 class SeedBaseline(InternalModel):
     """The seed baseline which is used for the baseline selection feature."""
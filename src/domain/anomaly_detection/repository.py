@@ -1,13 +1,14 @@
 from typing import AsyncGenerator
 
-from sqlalchemy import Result, Select, select
-from sqlalchemy.orm import joinedload
+from sqlalchemy import Result, Select, desc, func, insert, select
+from sqlalchemy.orm import aliased, joinedload
 
 from src.domain.anomaly_detection.models import (
     AnomalyDetection,
     AnomalyDetectionFlat,
     AnomalyDetectionUncommited,
 )
+from src.domain.tsd import TsdFlat
 from src.infrastructure.database import (
     AnomalyDetectionsTable,
     BaseRepository,
@@ -47,10 +48,37 @@ class AnomalyDetectionRepository(BaseRepository[AnomalyDetectionsTable]):
 
         return AnomalyDetectionFlat.from_orm(_schema)
 
+    async def bulk_create(
+        self, schemas: list[AnomalyDetectionUncommited]
+    ) -> list[AnomalyDetectionFlat]:
+        """Create new records in database with one multi-row insert.
+        The order of results matches the order of schemas.
+        """
+
+        if not schemas:
+            return []
+
+        result: Result = await self.execute(
+            insert(self.schema_class).returning(
+                self.schema_class, sort_by_parameter_order=True
+            ),
+            [schema.dict() for schema in schemas],
+        )
+
+        return [
+            AnomalyDetectionFlat.from_orm(schema)
+            for schema in result.scalars()
+        ]
+
     async def by_sensor(
-        self, sensor_id: int
+        self,
+        sensor_id: int,
+        after_id: int | None = None,
+        limit: int | None = None,
     ) -> AsyncGenerator[AnomalyDetection, None]:
-        """Fetch all anomaly detections for the sensor."""
+        """Fetch all anomaly detections for the sensor.
+        If the limit is passed, only the latest ones are taken.
+        """
 
         query: Select = (
             select(self.schema_class)
@@ -61,10 +89,61 @@ class AnomalyDetectionRepository(BaseRepository[AnomalyDetectionsTable]):
             .where(getattr(TimeSeriesDataTable, "sensor_id") == sensor_id)
         )
 
+        if after_id is not None:
+            query = query.where(getattr(self.schema_class, "id") > after_id)
+
+        if limit is not None:
+            query = query.order_by(desc(self.schema_class.id)).limit(limit)
+
         result: Result = await self._session.execute(query)
 
         if not (schemas := result.scalars().all()):
             raise NotFoundError
 
+        # NOTE: The latest ones are selected in the descending order
+        if limit is not None:
+            schemas = schemas[::-1]
+
         for schema in schemas:
             yield AnomalyDetection.from_orm(schema)
+
+    async def last_readings(
+        self, sensor_ids: list[int], limit: int
+    ) -> dict[int, tuple[int, list[TsdFlat]]]:
+        """Fetch last readings (up to the limit) of each sensor
+        that have anomaly detections by one query.
+        The total number of such readings is returned as well.
+        """
+
+        sensor_id = getattr(TimeSeriesDataTable, "sensor_id")
+        rank = (
+            func.row_number()
+            .over(
+                partition_by=sensor_id,
+                order_by=desc(getattr(TimeSeriesDataTable, "id")),
+            )
+            .label("rank")
+        )
+        total = func.count().over(partition_by=sensor_id).label("total")
+
+        ranked = (
+            select(TimeSeriesDataTable, rank, total)
+            .join(TimeSeriesDataTable.anomaly_detection)
+            .where(sensor_id.in_(sensor_ids))
+            .subquery()
+        )
+        tsd = aliased(TimeSeriesDataTable, ranked)
+
+        result: Result = await self._session.execute(
+            select(tsd, ranked.c.total)
+            .where(ranked.c.rank <= limit)
+            .order_by(tsd.id)
+        )
+
+        readings: dict[int, tuple[int, list[TsdFlat]]] = {}
+        for schema, count in result.all():
+            readings.setdefault(schema.sensor_id, (count, []))[1].append(
+                TsdFlat.from_orm(schema)
+            )
+
+        return readings
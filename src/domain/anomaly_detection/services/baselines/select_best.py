@@ -1,5 +1,4 @@
 import math
-from copy import deepcopy
 from pathlib import Path
 
 import numpy as np
@@ -10,6 +9,7 @@ from stumpy import aampi
 from src.config import settings
 
 from ...models import AnomalyDeviation, MatrixProfile, SeedBaseline
+from ...streaming import SlidingMatrixProfile
 
 __all__ = ("select_best_baseline",)
 
@@ -79,6 +79,7 @@ def process(
     matrix_profile = MatrixProfile(
         max_dis=np.float64(max(seed_baseline.baseline.P_)),
         baseline=seed_baseline.baseline,
+        sliding=SlidingMatrixProfile(seed_baseline.baseline),
         fb_max_dis=np.float64(max(seed_baseline.baseline.P_)),
         fb_baseline=seed_baseline.baseline,
         fb_baseline_start=seed_baseline.baseline,
@@ -111,7 +112,7 @@ def _process(
         concentration=concentration,
     )
 
-    dis = matrix_profile.baseline.P_[-1:]
+    dis = matrix_profile.sliding.distance()
     dis_lvl = dis / matrix_profile.max_dis * 100
 
     if dis_lvl < matrix_profile.warning:
@@ -134,17 +135,14 @@ def _update_matrix_profile(
         matrix_profile.counter = matrix_profile.window
 
         # NOTE: The different line from the normal mode processing function
-        matrix_profile.baseline = deepcopy(initial_baseline)
-
-        matrix_profile.last_values = matrix_profile.last_values[
-            -matrix_profile.window :
-        ]
-        for value in matrix_profile.last_values:
-            matrix_profile.baseline.update(value)
+        matrix_profile.sliding = SlidingMatrixProfile(
+            initial_baseline,
+            matrix_profile.last_values.last(matrix_profile.window)["ppmv"],
+        )
 
-    matrix_profile.baseline.update(concentration)
+    matrix_profile.sliding.update(concentration)
     matrix_profile.counter += 1
-    matrix_profile.last_values.append(concentration)
+    matrix_profile.last_values.append(ppmv=concentration)
 
 
 def _get_baseline_errors_statistic(
@@ -4,4 +4,5 @@ for getting the deviation when the anomaly detection is happening
 """
 
 
+from . import snapshots, workers  # noqa: F401
 from .dispatcher import *  # noqa: F401, F403
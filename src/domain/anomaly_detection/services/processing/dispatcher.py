@@ -1,3 +1,4 @@
+from contextlib import suppress
 from typing import Callable
 
 import numpy as np
@@ -5,49 +6,51 @@ from loguru import logger
 from stumpy import aampi
 
 from src.config import settings
-from src.domain.tsd import Tsd
+from src.domain.sensors import Sensor
+from src.domain.tsd import TsdFlat
 from src.infrastructure.cache import Cache
+from src.infrastructure.errors import UnprocessableError
 
 from ...constants import CacheNamespace
 from ...models import AnomalyDetectionUncommited, MatrixProfile
+from ...streaming import SlidingMatrixProfile
 from .modes import interactive_feedback as interactive_feedback_mode
 from .modes import normal as normal_mode
 
-__all__ = ("dispatch",)
+__all__ = (
+    "create_matrix_profile",
+    "dispatch",
+    "dispatch_many",
+    "dispatch_detached",
+    "discard",
+)
 
 
 # TODO: Should be moved to the infrastructure later.
 MATRIX_PROFILES: dict[int, MatrixProfile] = {}
 
 _ProcessingCallback = Callable[
-    [MatrixProfile, Tsd], AnomalyDetectionUncommited
+    [MatrixProfile, TsdFlat, Sensor], AnomalyDetectionUncommited
 ]
 
 
-def dispatch(tsd: Tsd) -> AnomalyDetectionUncommited:
-    """The main anomaly detection processing entrypoint."""
+def create_matrix_profile(sensor: Sensor) -> MatrixProfile:
+    """Create the matrix profile from the initial baseline of the sensor."""
 
-    # Create default matrix profile if not exist
-    if not (matrix_profile := MATRIX_PROFILES.get(tsd.sensor.id)):
-        baseline: aampi = (
-            tsd.sensor.configuration.anomaly_detection_initial_baseline
-        )
+    baseline: aampi = sensor.configuration.anomaly_detection_initial_baseline
+    max_dis: np.float64 = np.float64(max(baseline.P_))
 
-        max_dis: np.float64 = np.float64(max(baseline.P_))
+    return MatrixProfile(
+        max_dis=max_dis,
+        baseline=baseline,
+        sliding=SlidingMatrixProfile(baseline),
+        fb_max_dis=max_dis,
+        fb_baseline=baseline,
+        fb_baseline_start=baseline,
+    )
 
-        matrix_profile = MatrixProfile(
-            max_dis=max_dis,
-            baseline=baseline,
-            fb_max_dis=max_dis,
-            fb_baseline=baseline,
-            fb_baseline_start=baseline,
-        )
-        MATRIX_PROFILES[tsd.sensor.id] = matrix_profile
-
-        logger.success(
-            f"A new matrix profile is created for the sensor {tsd.sensor.id}"
-        )
 
+def _check_initial_values(matrix_profile: MatrixProfile) -> None:
     # For the first `window size` number of items we receive it is needed
     # skip processing for populating the first matrix profile
     if (
@@ -56,26 +59,94 @@ def dispatch(tsd: Tsd) -> AnomalyDetectionUncommited:
     ):
         matrix_profile.initial_values_full_capacity = True
 
+
+def dispatch(tsd: TsdFlat, sensor: Sensor) -> AnomalyDetectionUncommited:
+    """The main anomaly detection processing entrypoint.
+    The sensor is passed separately since readings carry only its id.
+    """
+
+    # Create default matrix profile if not exist
+    if not (matrix_profile := MATRIX_PROFILES.get(sensor.id)):
+        matrix_profile = create_matrix_profile(sensor)
+        MATRIX_PROFILES[sensor.id] = matrix_profile
+
+        logger.success(
+            f"A new matrix profile is created for the sensor {sensor.id}"
+        )
+
+    _check_initial_values(matrix_profile)
+
     last_interactive_feedback_mode_turned_on: bool = (
-        interactive_feedback_mode.get_or_create_from_cache(tsd.sensor.id)
+        interactive_feedback_mode.get_or_create_from_cache(sensor.id)
     )
     current_interactive_feedback_mode_turned_on: bool = (
-        tsd.sensor.configuration.interactive_feedback_mode
+        sensor.configuration.interactive_feedback_mode
     )
 
     callback: _ProcessingCallback = _process_mode_dispatcher(
         matrix_profile,
-        tsd,
+        sensor,
         last_interactive_feedback_mode_turned_on,
         current_interactive_feedback_mode_turned_on,
     )
 
-    return callback(matrix_profile, tsd)
+    result: AnomalyDetectionUncommited = callback(matrix_profile, tsd, sensor)
+    matrix_profile.last_time_series_data_id = tsd.id
+
+    return result
+
+
+def dispatch_many(
+    readings: list[TsdFlat], sensor: Sensor
+) -> list[AnomalyDetectionUncommited]:
+    """Advance the matrix profile of the sensor over its readings
+    in the given order. Results are the same as after dispatching
+    them one by one. Readings that can not be processed are skipped.
+    """
+
+    results: list[AnomalyDetectionUncommited] = []
+
+    for tsd in readings:
+        with suppress(UnprocessableError):
+            results.append(dispatch(tsd, sensor))
+
+    return results
+
+
+def dispatch_detached(
+    readings: list[TsdFlat], sensor: Sensor, matrix_profile: MatrixProfile
+) -> list[AnomalyDetectionUncommited]:
+    """Advance the given matrix profile over readings in the normal mode
+    (e.g. historical readings of the backfill). Live matrix profiles and
+    the interactive feedback mode state of the sensor are not touched.
+    """
+
+    results: list[AnomalyDetectionUncommited] = []
+
+    for tsd in readings:
+        _check_initial_values(matrix_profile)
+
+        with suppress(UnprocessableError):
+            results.append(normal_mode.process(matrix_profile, tsd, sensor))
+            matrix_profile.last_time_series_data_id = tsd.id
+
+    return results
+
+
+def discard(sensor_id: int) -> None:
+    """Forget the matrix profile and the interactive feedback mode state
+    of the sensor that is removed.
+    """
+
+    MATRIX_PROFILES.pop(sensor_id, None)
+    Cache.delete(
+        namespace=CacheNamespace.interactive_mode_turned_on, key=sensor_id
+    )
 
 
 def _process_mode_dispatcher(
     matrix_profile: MatrixProfile,
-    tsd: Tsd,
+    sensor: Sensor,
     last_interactive_feedback_mode_turned_on: bool,
     current_interactive_feedback_mode_turned_on: bool,
 ) -> _ProcessingCallback:
@@ -100,10 +171,10 @@ def _process_mode_dispatcher(
     ):
         Cache.set(
             namespace=CacheNamespace.interactive_mode_turned_on,
-            key=tsd.sensor.id,
+            key=sensor.id,
             item=False,
         )
-        interactive_feedback_mode.save_results(matrix_profile, tsd.sensor)
+        interactive_feedback_mode.save_results(matrix_profile, sensor)
 
         return normal_mode.process
 
@@ -115,16 +186,15 @@ def _process_mode_dispatcher(
         # Reset the matrix profile if a new interactive
         # feedback processing was started
         matrix_profile.fb_baseline = matrix_profile.fb_baseline_start
-        matrix_profile.last_values = matrix_profile.last_values[
-            -matrix_profile.window :
-        ]
-        for value in matrix_profile.last_values:
+        for value in matrix_profile.last_values.last(matrix_profile.window)[
+            "ppmv"
+        ]:
             matrix_profile.fb_baseline.update(value)
 
         # Update the cache entry
         Cache.set(
             namespace=CacheNamespace.interactive_mode_turned_on,
-            key=tsd.sensor.id,
+            key=sensor.id,
             item=True,
         )
 
@@ -1,6 +1,6 @@
 from src.config import settings
 from src.domain.sensors.models import Sensor
-from src.domain.tsd import Tsd
+from src.domain.tsd import TsdFlat
 from src.infrastructure.cache import Cache
 from src.infrastructure.errors import NotFoundError
 
@@ -10,10 +10,11 @@ from ....models import (
     AnomalyDeviation,
     MatrixProfile,
 )
+from ....streaming import SlidingMatrixProfile
 
 
 def process(
-    matrix_profile: MatrixProfile, tsd: Tsd
+    matrix_profile: MatrixProfile, tsd: TsdFlat, sensor: Sensor
 ) -> AnomalyDetectionUncommited:
     """The interactive feedback mode processing implementation.
     It is used in case the sensor.configuration.interactive_feedback_mode
@@ -25,17 +26,16 @@ def process(
         # Reset the matrix profile baseline and last values
         matrix_profile.counter = matrix_profile.window
         matrix_profile.fb_baseline = (
-            tsd.sensor.configuration.anomaly_detection_initial_baseline
+            sensor.configuration.anomaly_detection_initial_baseline
         )
-        matrix_profile.last_values = matrix_profile.last_values[
-            -matrix_profile.window :
-        ]
-        for value in matrix_profile.last_values:
+        for value in matrix_profile.last_values.last(matrix_profile.window)[
+            "ppmv"
+        ]:
             matrix_profile.fb_baseline.update(value)
 
     matrix_profile.fb_baseline.update(tsd.ppmv)
     matrix_profile.counter += 1
-    matrix_profile.last_values.append(tsd.ppmv)
+    matrix_profile.last_values.append(ppmv=tsd.ppmv)
 
     # The processing is skipped if not enough items in the matrix profile
     if matrix_profile.initial_values_full_capacity is False:
@@ -75,7 +75,7 @@ def get_or_create_from_cache(sensor_id: int) -> bool:
         )
     except NotFoundError:
         Cache.set(
-            namespace="anomaly_detection_last_ifb_mode_turned_on",
+            namespace=CacheNamespace.interactive_mode_turned_on,
             key=sensor_id,
             item=False,
         )
@@ -90,6 +90,7 @@ def save_results(matrix_profile: MatrixProfile, sensor: Sensor):
     matrix_profile.baseline = (
         sensor.configuration.anomaly_detection_initial_baseline
     )
+    matrix_profile.sliding = SlidingMatrixProfile(matrix_profile.baseline)
 
     if matrix_profile.fb_temp and (
         max(matrix_profile.fb_temp)
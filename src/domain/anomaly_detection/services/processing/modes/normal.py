@@ -1,13 +1,17 @@
-from src.domain.tsd import Tsd
+from src.domain.sensors import Sensor
+from src.domain.tsd import TsdFlat
 
 from ....models import (
     AnomalyDetectionUncommited,
     AnomalyDeviation,
     MatrixProfile,
 )
+from ....streaming import SlidingMatrixProfile
 
 
-def _update_matrix_profile(matrix_profile: MatrixProfile, tsd: Tsd) -> None:
+def _update_matrix_profile(
+    matrix_profile: MatrixProfile, tsd: TsdFlat, sensor: Sensor
+) -> None:
     """Update the matrix profile with the new data."""
 
     # WARNING: Works only for the normal mode
@@ -17,25 +21,27 @@ def _update_matrix_profile(matrix_profile: MatrixProfile, tsd: Tsd) -> None:
         matrix_profile.counter = matrix_profile.window
 
         matrix_profile.baseline = (
-            tsd.sensor.configuration.anomaly_detection_initial_baseline
+            sensor.configuration.anomaly_detection_initial_baseline
         )
-        matrix_profile.last_values = matrix_profile.last_values[
-            -matrix_profile.window :
-        ]
-        for value in matrix_profile.last_values:
-            matrix_profile.baseline.update(value)
 
-    matrix_profile.baseline.update(tsd.ppmv)
+        # NOTE: The baseline is not updated with last values one by one,
+        #       the sliding matrix profile is built from them at once
+        matrix_profile.sliding = SlidingMatrixProfile(
+            matrix_profile.baseline,
+            matrix_profile.last_values.last(matrix_profile.window)["ppmv"],
+        )
+
+    matrix_profile.sliding.update(tsd.ppmv)
     matrix_profile.counter += 1
-    matrix_profile.last_values.append(tsd.ppmv)
+    matrix_profile.last_values.append(ppmv=tsd.ppmv)
 
 
 def process(
-    matrix_profile: MatrixProfile, tsd: Tsd
+    matrix_profile: MatrixProfile, tsd: TsdFlat, sensor: Sensor
 ) -> AnomalyDetectionUncommited:
     """The regular/normal mode for the anomaly detection process."""
 
-    _update_matrix_profile(matrix_profile, tsd)
+    _update_matrix_profile(matrix_profile, tsd, sensor)
 
     # The processinr is skipped if not enough items in the matrix profile
     if matrix_profile.initial_values_full_capacity is False:
@@ -45,7 +51,7 @@ def process(
             interactive_feedback_mode=False,
         )
 
-    dis = matrix_profile.baseline.P_[-1:]
+    dis = matrix_profile.sliding.distance()
     dis_lvl = dis / matrix_profile.max_dis * 100
 
     if dis_lvl < matrix_profile.warning:
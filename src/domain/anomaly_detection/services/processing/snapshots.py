@@ -0,0 +1,171 @@
+"""
+Snapshots of matrix profiles that survive restarts.
+
+Matrix profiles live only in the memory, so after the restart each
+sensor would return UNDEFINED deviations until `window size` new
+readings are consumed. The snapshot keeps matrix profiles (last values,
+counters, baselines and interactive feedback baselines) with the
+interactive feedback mode state of each sensor.
+
+If the snapshot of the sensor is missed or outdated (readings are
+processed after it is saved), the matrix profile is rebuilt at once
+from last processed readings instead.
+
+⚠️ Matrix profiles should not be changed while the snapshot is taken.
+"""
+
+import os
+import pickle
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+from loguru import logger
+
+from src.config import settings
+from src.domain.sensors import Sensor
+from src.domain.tsd import TsdFlat
+from src.infrastructure.cache import Cache
+from src.infrastructure.errors import NotFoundError
+
+from ...constants import CacheNamespace
+from ...models import MatrixProfile
+from ...streaming import SlidingMatrixProfile
+from .dispatcher import MATRIX_PROFILES
+
+__all__ = (
+    "MatrixProfileSnapshot",
+    "collect",
+    "save",
+    "load",
+    "restore",
+    "rebuild",
+)
+
+
+# NOTE: Snapshots of other versions are skipped
+_VERSION = 2
+
+
+@dataclass(slots=True)
+class MatrixProfileSnapshot:
+    """The state of the anomaly detection of the sensor."""
+
+    matrix_profile: MatrixProfile
+    interactive_feedback_mode: bool
+
+
+def collect() -> dict[int, MatrixProfileSnapshot]:
+    """Take matrix profiles of all sensors.
+    Matrix profiles are not copied, so it is cheap.
+    """
+
+    snapshots: dict[int, MatrixProfileSnapshot] = {}
+
+    for sensor_id, matrix_profile in list(MATRIX_PROFILES.items()):
+        try:
+            interactive_feedback_mode: bool = Cache.get(
+                namespace=CacheNamespace.interactive_mode_turned_on,
+                key=sensor_id,
+            )
+        except NotFoundError:
+            interactive_feedback_mode = False
+
+        snapshots[sensor_id] = MatrixProfileSnapshot(
+            matrix_profile=matrix_profile,
+            interactive_feedback_mode=interactive_feedback_mode,
+        )
+
+    return snapshots
+
+
+def save(path: Path, snapshots: dict[int, MatrixProfileSnapshot]) -> None:
+    """Write snapshots to the file.
+    The previous file is replaced only when the new one is written.
+    """
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temporary: Path = path.with_name(f"{path.name}.tmp")
+
+    with open(temporary, "wb") as file:
+        pickle.dump(
+            {"version": _VERSION, "snapshots": snapshots},
+            file,
+            protocol=pickle.HIGHEST_PROTOCOL,
+        )
+        file.flush()
+        os.fsync(file.fileno())
+
+    os.replace(temporary, path)
+
+
+def load(path: Path) -> dict[int, MatrixProfileSnapshot]:
+    """Read snapshots from the file.
+    Nothing is returned if the file is missed or it can not be read.
+    """
+
+    try:
+        with open(path, "rb") as file:
+            payload = pickle.load(file)
+    except FileNotFoundError:
+        return {}
+    except Exception:
+        logger.exception(f"The matrix profiles snapshot {path} is broken")
+        return {}
+
+    if payload.get("version") != _VERSION:
+        logger.warning(
+            f"The matrix profiles snapshot {path} of the version "
+            f"{payload.get('version')} is skipped"
+        )
+        return {}
+
+    return payload["snapshots"]
+
+
+def restore(sensor_id: int, snapshot: MatrixProfileSnapshot) -> None:
+    """Put the matrix profile of the snapshot back."""
+
+    MATRIX_PROFILES[sensor_id] = snapshot.matrix_profile
+    Cache.set(
+        namespace=CacheNamespace.interactive_mode_turned_on,
+        key=sensor_id,
+        item=snapshot.interactive_feedback_mode,
+    )
+
+
+def rebuild(sensor: Sensor, readings: list[TsdFlat], total: int) -> None:
+    """Build the matrix profile of the sensor from last processed
+    readings (at least `window size * 2`) in one pass. The result is
+    the same as if the total number of readings is processed
+    in the normal mode one by one.
+    """
+
+    if not readings:
+        return
+
+    # NOTE: The counter is reset to the window size
+    #       each time it reaches the doubled window size
+    window: int = settings.anomaly_detection.window_size
+    counter: int = total
+    if total > window * 2:
+        counter = window + (total - window * 2 - 1) % window + 1
+
+    baseline = sensor.configuration.anomaly_detection_initial_baseline
+    max_dis: np.float64 = np.float64(max(baseline.P_))
+    matrix_profile = MatrixProfile(
+        max_dis=max_dis,
+        counter=counter,
+        baseline=baseline,
+        sliding=SlidingMatrixProfile(
+            baseline, [tsd.ppmv for tsd in readings[-counter:]]
+        ),
+        fb_max_dis=max_dis,
+        fb_baseline=baseline,
+        fb_baseline_start=baseline,
+        last_time_series_data_id=readings[-1].id,
+    )
+    for tsd in readings[-counter:]:
+        matrix_profile.last_values.append(ppmv=tsd.ppmv)
+
+    MATRIX_PROFILES[sensor.id] = matrix_profile
@@ -0,0 +1,106 @@
+"""
+Entrypoints of anomaly detection worker processes.
+
+In the worker-pool mode each sensor is pinned to one worker process
+that owns its matrix profile and the interactive feedback mode cache
+entry (MATRIX_PROFILES and the Cache of the worker process).
+The main process only routes readings and collects results.
+
+The sensor is sent to the worker only if it is changed
+(the registry entry is replaced), otherwise the copy that is kept
+by the worker is used, since the sensor carries the baseline blob.
+
+Readings are passed either by pickling or via the shared memory ring
+of the data lake, where the main process writes the whole batch once
+and each worker reads it and takes readings of its own sensors.
+
+ref: src/infrastructure/application/shards.py
+ref: src/application/data_lake.py: SharedLakeItem
+"""
+
+import numpy as np
+from loguru import logger
+
+from src.domain.sensors import Sensor
+from src.domain.tsd import TSD_RECORD, TsdFlat, from_records
+from src.infrastructure.errors import ProcessErorr
+from src.infrastructure.shared_memory import SharedRing
+
+from ...models import AnomalyDetectionUncommited
+from . import dispatcher, snapshots
+
+__all__ = ("score", "score_shared", "discard", "collect", "restore")
+
+
+_SENSORS: dict[int, Sensor] = {}
+_RINGS: dict[str, SharedRing] = {}
+
+
+def score(
+    readings: list[TsdFlat], sensor: Sensor | None
+) -> list[AnomalyDetectionUncommited]:
+    """Dispatch readings of one sensor.
+    The sensor is omitted if it is already sent.
+    """
+
+    if sensor is None:
+        sensor = _SENSORS[readings[0].sensor_id]
+    else:
+        _SENSORS[sensor.id] = sensor
+
+    return dispatcher.dispatch_many(readings, sensor)
+
+
+def score_shared(
+    name: str, start: int, stop: int, sensors: dict[int, Sensor | None]
+) -> dict[int, list[AnomalyDetectionUncommited]]:
+    """Dispatch readings of given sensors that are written to the shared
+    memory ring between positions. Sensors are omitted if already sent.
+    Results are returned by the sensor id, sensors which processing
+    failed are missed.
+    """
+
+    if (ring := _RINGS.get(name)) is None:
+        ring = _RINGS[name] = SharedRing.attach(name, dtype=TSD_RECORD)
+
+    records, _, lost = ring.read(start, limit=stop - start)
+    if lost:
+        raise ProcessErorr(
+            message=f"{lost} readings are overwritten in the shared memory"
+        )
+
+    records = records[np.isin(records["sensor_id"], list(sensors))]
+    readings_by_sensor: dict[int, list[TsdFlat]] = {}
+    for tsd in from_records(records):
+        readings_by_sensor.setdefault(tsd.sensor_id, []).append(tsd)
+
+    results: dict[int, list[AnomalyDetectionUncommited]] = {}
+    for sensor_id, readings in readings_by_sensor.items():
+        # NOTE: The failure of one sensor does not affect others
+        try:
+            results[sensor_id] = score(readings, sensors[sensor_id])
+        except Exception:
+            logger.exception(
+                f"The anomaly detection of sensor {sensor_id} failed"
+            )
+
+    return results
+
+
+def discard(sensor_id: int) -> None:
+    """Forget the state of the sensor that is removed."""
+
+    _SENSORS.pop(sensor_id, None)
+    dispatcher.discard(sensor_id)
+
+
+def collect() -> dict[int, snapshots.MatrixProfileSnapshot]:
+    """Take matrix profiles of sensors of the worker."""
+
+    return snapshots.collect()
+
+
+def restore(sensor_id: int, snapshot: snapshots.MatrixProfileSnapshot) -> None:
+    """Put the matrix profile that is built by the main process."""
+
+    snapshots.restore(sensor_id, snapshot)
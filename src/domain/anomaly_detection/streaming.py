@@ -0,0 +1,147 @@
+"""
+The streaming matrix profile of the newest reading.
+
+The normal mode keeps the time series of the constant length:
+the initial baseline without its first `k` values followed by
+`k` last readings, where `k` is in [window, window * 2]. Previously
+the aampi object was advanced by each reading and was rebuilt from
+the initial baseline with the replay of the last `window` readings
+every `window * 2` readings, so that reading costed ~145 updates.
+
+Only the distance of the newest subsequence (aampi.P_[-1]) is used
+for the anomaly deviation, so only the distance profile of the newest
+subsequence is kept:
+    - sums of squares of all subsequences
+    - dot products of all subsequences and the newest one
+Both are slid by each reading in O(len(baseline)) like aampi does.
+The time series of the reset is built directly from the initial baseline
+and last readings, so both are computed by one vectorized pass
+instead of the replay.
+
+⚠️ Only the newest distance is computed, the rest of the matrix profile
+(P_, I_, left_P_) is not maintained.
+"""
+
+import numpy as np
+from numpy.typing import ArrayLike
+from stumpy import aampi
+
+__all__ = ("SlidingMatrixProfile",)
+
+
+class SlidingMatrixProfile:
+    """The distance profile of the newest subsequence of the time series
+    that consists of the initial baseline and last readings.
+
+    Example:
+        >>> sliding = SlidingMatrixProfile(baseline, last_values)
+        >>> sliding.update(value)
+        >>> sliding.distance()  # ~ aampi.P_[-1]
+    """
+
+    def __init__(self, baseline: aampi, last_values: ArrayLike = ()) -> None:
+        """Build the time series of the baseline that is updated
+        with last values. The baseline is not changed.
+        """
+
+        # NOTE: Values are centered, distances do not depend on the shift,
+        #       but the precision of sums of squares is much better
+        self._offset: np.float64 = np.float64(np.mean(baseline._T))
+        self._m: int = baseline._m
+        self._p: float = baseline._p
+        self._excl_zone: int = baseline._excl_zone
+
+        values: np.ndarray = np.asarray(last_values, dtype=np.float64)
+        k: int = values.shape[0]
+        isfinite: np.ndarray = np.isfinite(values)
+
+        # NOTE: Non-finite values are replaced by zeros like aampi does
+        self._T: np.ndarray = np.concatenate(
+            (
+                baseline._T[k:] - self._offset,
+                np.where(isfinite, values - self._offset, 0.0),
+            )
+        )
+
+        squares: np.ndarray = np.concatenate(([0.0], np.cumsum(self._T**2)))
+        self._squares: np.ndarray = squares[self._m :] - squares[: -self._m]
+
+        # Subsequences with non-finite values are never the nearest
+        nonfinite: np.ndarray = np.concatenate(
+            (
+                [0],
+                np.cumsum(
+                    ~np.concatenate((baseline._T_isfinite[k:], isfinite))
+                ),
+            )
+        )
+        self._squares[nonfinite[self._m :] > nonfinite[: -self._m]] = np.inf
+
+        self._products: np.ndarray = np.correlate(self._T, self._T[-self._m :])
+
+        # The number of next subsequences with the non-finite value
+        self._nonfinite: int = 0
+        if not isfinite.all():
+            self._nonfinite = max(
+                int(np.flatnonzero(~isfinite)[-1]) - k + self._m + 1, 0
+            )
+
+    def update(self, value: np.float64) -> None:
+        """Egress the oldest value and ingress the new one.
+
+        The dot product of the i-th subsequence and the newest one
+        is the previous product without first values of both
+        plus the product of last values.
+        """
+
+        m: int = self._m
+        dropped: np.float64 = self._T[-m]
+
+        if np.isfinite(value):
+            value -= self._offset
+            self._nonfinite = max(self._nonfinite - 1, 0)
+        else:
+            value = np.float64(0)
+            self._nonfinite = m
+
+        self._products[:-1] -= self._T[:-m] * dropped
+        self._products[:-1] += self._T[m:] * value
+
+        self._T[:-1] = self._T[1:]
+        self._T[-1] = value
+        query: np.ndarray = self._T[-m:]
+
+        self._products[-1] = np.dot(query, query)
+        self._squares[:-1] = self._squares[1:]
+        self._squares[-1] = np.inf if self._nonfinite else self._products[-1]
+
+    def distance(self) -> np.float64:
+        """The min distance of the newest subsequence to others
+        outside of the exclusion zone.
+        """
+
+        if self._nonfinite:
+            return np.float64(np.inf)
+
+        keep: int = self._squares.shape[0] - self._excl_zone - 1
+
+        if self._p == 2.0:
+            # NOTE: |a - b|^2 = |a|^2 - 2ab + |b|^2
+            norms: np.ndarray = (
+                self._squares[:keep]
+                - 2 * self._products[:keep]
+                + self._products[-1]
+            )
+
+            # NOTE: Round-off errors could make zero distances negative
+            return np.float64(np.sqrt(max(np.min(norms, initial=np.inf), 0)))
+
+        subsequences: np.ndarray = np.lib.stride_tricks.sliding_window_view(
+            self._T, self._m
+        )[:keep]
+        norms = np.sum(
+            np.abs(subsequences - self._T[-self._m :]) ** self._p, axis=1
+        )
+        norms[np.isinf(self._squares[:keep])] = np.inf
+
+        return np.float64(np.min(norms, initial=np.inf) ** (1.0 / self._p))
@@ -7,7 +7,7 @@ from loguru import logger
 
 from .models import EventType, EventUncommited
 
-__all__ = ("process",)
+__all__ = ("process", "discard")
 
 # TODO: Change the var-storage to the cache
 LAST_SENSORS_EVENTS_TYPES: dict[int, Deque[EventType]] = defaultdict(
@@ -37,3 +37,9 @@ async def process(
     logger.info(f"Sensor[{sensor_id}] event is handled: {current_event_type}")
 
     return create_schema
+
+
+def discard(sensor_id: int) -> None:
+    """Forget last events types of the sensor that is removed."""
+
+    LAST_SENSORS_EVENTS_TYPES.pop(sensor_id, None)
@@ -1,2 +1,4 @@
+from .baselines import *  # noqa: F401, F403
 from .models import *  # noqa: F401, F403
+from .registry import *  # noqa: F401, F403
 from .repository import *  # noqa: F401, F403
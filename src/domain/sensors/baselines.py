@@ -0,0 +1,99 @@
+"""
+The process-wide cache of decoded initial baselines.
+
+Unpickling of aampi objects is expensive, so the baseline is decoded
+once for the configuration and its blob. The entry is replaced
+if the blob of the configuration is changed (the blob hash differs).
+
+⚠️ aampi.update() changes arrays of the object in place,
+so each user gets its own clone with copied arrays.
+"""
+
+import copy
+import pickle
+from collections import OrderedDict
+from dataclasses import dataclass
+from hashlib import blake2b
+from threading import Lock
+
+import numpy as np
+from stumpy import aampi
+
+from src.config import settings
+
+__all__ = ("BaselinesCache", "clone_baseline")
+
+
+def clone_baseline(baseline: aampi) -> aampi:
+    """Copy the baseline. Arrays are copied and the rest is shared."""
+
+    clone: aampi = copy.copy(baseline)
+
+    for name, value in vars(baseline).items():
+        if isinstance(value, np.ndarray):
+            setattr(clone, name, value.copy())
+
+    return clone
+
+
+@dataclass
+class _Entry:
+    # NOTE: The blob is kept in order to skip hashing
+    #       if the same bytes object is passed again
+    raw: bytes
+    digest: bytes
+    baseline: aampi
+
+
+class BaselinesCache:
+    """Decoded baselines by the configuration id.
+    The number of entries is limited, least recently used ones are removed.
+
+    Example:
+        >>> baseline: aampi = BaselinesCache.get(configuration.id, raw)
+        >>> baseline.update(value)  # the cached one is not changed
+    """
+
+    _ENTRIES: OrderedDict[int, _Entry] = OrderedDict()
+    # NOTE: Baselines are used by scoring threads
+    _LOCK = Lock()
+
+    @classmethod
+    def get(cls, configuration_id: int, raw: bytes) -> aampi:
+        """Return the clone of the decoded baseline."""
+
+        with cls._LOCK:
+            entry: _Entry | None = cls._ENTRIES.get(configuration_id)
+
+            if entry is None or (
+                entry.raw is not raw
+                and entry.digest != blake2b(raw, digest_size=16).digest()
+            ):
+                entry = _Entry(
+                    raw=raw,
+                    digest=blake2b(raw, digest_size=16).digest(),
+                    baseline=pickle.loads(raw),
+                )
+            entry.raw = raw
+
+            cls._ENTRIES[configuration_id] = entry
+            cls._ENTRIES.move_to_end(configuration_id)
+            while len(cls._ENTRIES) > settings.sensors.baselines_cache_size:
+                cls._ENTRIES.popitem(last=False)
+
+            return clone_baseline(entry.baseline)
+
+    @classmethod
+    def discard(cls, configuration_id: int) -> None:
+        with cls._LOCK:
+            cls._ENTRIES.pop(configuration_id, None)
+
+    @classmethod
+    def entries(cls) -> dict[int, aampi]:
+        """Return decoded baselines by configuration ids."""
+
+        with cls._LOCK:
+            return {
+                configuration_id: entry.baseline
+                for configuration_id, entry in cls._ENTRIES.items()
+            }
@@ -8,6 +8,8 @@ from stumpy import aampi
 from src.domain.templates.models import Template
 from src.infrastructure.models import InternalModel
 
+from .baselines import BaselinesCache
+
 __all__ = (
     "SensorBase",
     "SensorUncommited",
@@ -39,9 +41,17 @@ class SensorConfigurationUncommited(InternalModel):
     def anomaly_detection_initial_baseline(self) -> aampi:
         """Converts the database representation of the initial baseline
         which is in bytes into the specific stumpy object.
+
+        The baseline is decoded once for the saved configuration
+        and each call returns its own copy.
         """
 
-        return pickle.loads(self.anomaly_detection_initial_baseline_raw)
+        if (configuration_id := getattr(self, "id", None)) is None:
+            return pickle.loads(self.anomaly_detection_initial_baseline_raw)
+
+        return BaselinesCache.get(
+            configuration_id, self.anomaly_detection_initial_baseline_raw
+        )
 
 
 class SensorConfigurationUpdatePartialSchema(InternalModel):
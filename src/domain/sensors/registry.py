@@ -0,0 +1,57 @@
+"""
+The process-wide registry of sensors.
+
+Readings carry only the sensor id, so the rich sensor (with the template
+and the configuration) is resolved through this registry instead of
+joining it for each reading in the database.
+
+⚠️ Baseline jobs update sensors in separate processes, so entries expire
+after `settings.sensors.registry_ttl` and they are loaded again.
+"""
+
+from src.config import settings
+from src.infrastructure.cache import Cache
+
+from .models import Sensor
+
+__all__ = ("SensorsRegistry",)
+
+
+class SensorsRegistry:
+    """The registry is backed by the application cache.
+
+    Example:
+        >>> SensorsRegistry.set(sensor)
+        >>> sensor: Sensor = SensorsRegistry.get(sensor_id)  # or NotFoundError
+        >>> SensorsRegistry.invalidate(sensor_id)
+    """
+
+    _NAMESPACE = "sensors_registry"
+
+    @classmethod
+    def get(cls, sensor_id: int) -> Sensor:
+        """Return the sensor.
+        Raises NotFoundError if the sensor is missing or expired.
+        """
+
+        return Cache.get(namespace=cls._NAMESPACE, key=sensor_id)
+
+    @classmethod
+    def set(cls, sensor: Sensor) -> None:
+        Cache.set(
+            namespace=cls._NAMESPACE,
+            key=sensor.id,
+            item=sensor,
+            ttl=settings.sensors.registry_ttl,
+        )
+
+    @classmethod
+    def invalidate(cls, sensor_id: int | None = None) -> None:
+        """Remove the sensor from the registry.
+        All sensors are removed if the id is not specified.
+        """
+
+        if sensor_id is None:
+            Cache.clear(namespace=cls._NAMESPACE)
+        else:
+            Cache.delete(namespace=cls._NAMESPACE, key=sensor_id)
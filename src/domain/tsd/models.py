@@ -1,12 +1,24 @@
-from datetime import datetime
+from datetime import datetime, timezone
+from typing import Iterator
 
 import numpy as np
+from numpy.typing import NDArray
 from pydantic import validator
 
 from src.domain.sensors import Sensor
 from src.infrastructure.models import InternalModel
 
-__all__ = ("TsdRaw", "TsdUncommited", "TsdFlat", "Tsd")
+__all__ = (
+    "TsdRaw",
+    "TsdRawChunk",
+    "TsdUncommited",
+    "TsdFlat",
+    "Tsd",
+    "TSD_RECORD",
+    "naive_utc",
+    "to_records",
+    "from_records",
+)
 
 
 def _convert_ppmv_to_internal_callback(
@@ -28,6 +40,34 @@ class TsdRaw(InternalModel):
     timestamp: datetime
 
 
+class TsdRawChunk(InternalModel):
+    """The columnar representation of raw time series data.
+    This data model is used as a intermediate model by chunk parsers.
+    """
+
+    timestamps: NDArray[np.datetime64]
+    ppmv: NDArray[np.float64]
+
+    def __len__(self) -> int:
+        return self.ppmv.shape[0]
+
+    def filter(self, mask: NDArray[np.bool_]) -> "TsdRawChunk":
+        """Return a new chunk with items selected by the boolean mask."""
+
+        return TsdRawChunk(
+            timestamps=self.timestamps[mask], ppmv=self.ppmv[mask]
+        )
+
+    def to_raw(self) -> Iterator[TsdRaw]:
+        """Convert columns into the sequence of row-based models."""
+
+        for timestamp, ppmv in zip(
+            self.timestamps.astype("datetime64[us]").tolist(),
+            self.ppmv.tolist(),
+        ):
+            yield TsdRaw(timestamp=timestamp, ppmv=ppmv)
+
+
 class TsdUncommited(InternalModel):
     """This schema should be used for passing it
     to the repository operation.
@@ -59,3 +99,64 @@ class Tsd(TsdFlat):
     validator("ppmv", pre=True, allow_reuse=True)(
         _convert_ppmv_to_internal_callback
     )
+
+
+# ************************************************
+# ********** Fixed-size records **********
+# ************************************************
+# NOTE: Timestamps are stored without the timezone (in UTC)
+TSD_RECORD = np.dtype(
+    [
+        ("id", np.int64),
+        ("sensor_id", np.int64),
+        ("timestamp", "datetime64[ns]"),
+        ("ppmv", np.float64),
+    ]
+)
+
+
+def naive_utc(value: datetime) -> datetime:
+    """Convert the aware timestamp to UTC without the timezone,
+    since timestamps are stored that way. Naive ones are kept.
+    """
+
+    if value.tzinfo is None:
+        return value
+
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def to_records(readings: list[TsdFlat]) -> NDArray:
+    """Convert readings into TSD_RECORD records."""
+
+    return np.array(
+        [
+            (
+                tsd.id,
+                tsd.sensor_id,
+                np.datetime64(naive_utc(tsd.timestamp), "ns"),
+                tsd.ppmv,
+            )
+            for tsd in readings
+        ],
+        dtype=TSD_RECORD,
+    )
+
+
+def from_records(records: NDArray) -> list[TsdFlat]:
+    """Convert TSD_RECORD records back into readings."""
+
+    return [
+        TsdFlat(
+            id=id_,
+            sensor_id=sensor_id,
+            timestamp=timestamp,
+            ppmv=ppmv,
+        )
+        for id_, sensor_id, timestamp, ppmv in zip(
+            records["id"].tolist(),
+            records["sensor_id"].tolist(),
+            records["timestamp"].astype("datetime64[us]").tolist(),
+            records["ppmv"].tolist(),
+        )
+    ]
@@ -1,7 +1,7 @@
 from datetime import datetime
 from typing import AsyncGenerator
 
-from sqlalchemy import Result, Select, asc, desc, select
+from sqlalchemy import Result, Select, asc, desc, func, insert, select
 from sqlalchemy.orm import joinedload
 
 from src.infrastructure.database import (
@@ -48,10 +48,60 @@ class TsdRepository(BaseRepository[TimeSeriesDataTable]):
 
         return TsdFlat.from_orm(_schema)
 
+    async def bulk_create(self, schemas: list[TsdUncommited]) -> list[TsdFlat]:
+        """Create new records in database with one multi-row insert.
+        The order of results matches the order of schemas.
+        """
+
+        if not schemas:
+            return []
+
+        result: Result = await self.execute(
+            insert(self.schema_class).returning(
+                self.schema_class, sort_by_parameter_order=True
+            ),
+            [schema.dict() for schema in schemas],
+        )
+
+        return [TsdFlat.from_orm(schema) for schema in result.scalars()]
+
+    async def recent_timestamps(self, limit: int) -> dict[int, list[datetime]]:
+        """Fetch the latest timestamps of each sensor with one query.
+        The window function ranks readings within the sensor,
+        so no more than `limit` timestamps are returned per sensor.
+        """
+
+        sensor_id_column = getattr(self.schema_class, "sensor_id")
+        timestamp_column = getattr(self.schema_class, "timestamp")
+
+        row_number = (
+            func.row_number()
+            .over(
+                partition_by=sensor_id_column,
+                order_by=desc(timestamp_column),
+            )
+            .label("row_number")
+        )
+        subquery = select(
+            sensor_id_column, timestamp_column, row_number
+        ).subquery()
+        query: Select = select(
+            subquery.c.sensor_id, subquery.c.timestamp
+        ).where(subquery.c.row_number <= limit)
+
+        result: Result = await self.execute(query)
+
+        timestamps: dict[int, list[datetime]] = {}
+        for sensor_id, timestamp in result.all():
+            timestamps.setdefault(sensor_id, []).append(timestamp)
+
+        return timestamps
+
     async def filter(
         self,
         sensor_id: int | None = None,
         last_id: int | None = None,
+        after_id: int | None = None,
         limit: int | None = None,
         timestamp_from: datetime | None = None,
         order_by_desc: bool = False,
@@ -66,6 +116,9 @@ class TsdRepository(BaseRepository[TimeSeriesDataTable]):
         last_id: int | None -- determines the last TSD id that could
                  be in the results
 
+        after_id: int | None -- determines the TSD id that results
+                 should be after (it is not included)
+
         timestamp_from: datetime | None -- determines the timestamp which
                  used as a start time point
 
@@ -90,6 +143,11 @@ class TsdRepository(BaseRepository[TimeSeriesDataTable]):
                 getattr(self.schema_class, "id") <= last_id,
             )
 
+        if after_id is not None:
+            query = query.where(
+                getattr(self.schema_class, "id") > after_id,
+            )
+
         if limit:
             query = query.limit(limit)
 
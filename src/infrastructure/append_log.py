@@ -0,0 +1,237 @@
+"""
+The durable append-only log that is split into memory-mapped segments.
+
+Each record gets the offset which is the sequence number in the log.
+Segment files are named by the offset of the first record and they are
+preallocated, so records are written to the memory without syscalls.
+The memory is flushed to the disk periodically and on close.
+
+The record layout:
+    [length: uint32] [payload: bytes]
+
+The payload is written before the length, so the record that is
+interrupted by the crash is ignored on the next start.
+
+Consumers could commit offsets by name and resume from them later.
+Committed offsets are saved with the periodic flush.
+"""
+
+import json
+import mmap
+import os
+import struct
+from bisect import bisect_right
+from pathlib import Path
+from time import monotonic
+
+from loguru import logger
+
+__all__ = ("AppendLog",)
+
+
+_LENGTH = struct.Struct("<I")
+_OFFSETS_FILENAME = "offsets.json"
+
+
+class _Segment:
+    """The memory-mapped segment file."""
+
+    def __init__(self, path: Path, base_offset: int, size: int) -> None:
+        self.path: Path = path
+        self.base_offset: int = base_offset
+
+        with open(path, "a+b") as file:
+            if os.fstat(file.fileno()).st_size < size:
+                file.truncate(size)
+            self._mmap = mmap.mmap(file.fileno(), 0)
+
+        # Positions of records in the file
+        self._positions: list[int] = []
+        self._end: int = 0
+        self._recover()
+
+    def _recover(self) -> None:
+        """Find records that are already written."""
+
+        while self._end + _LENGTH.size <= len(self._mmap):
+            (length,) = _LENGTH.unpack_from(self._mmap, self._end)
+            stop: int = self._end + _LENGTH.size + length
+            if length == 0 or stop > len(self._mmap):
+                break
+
+            self._positions.append(self._end)
+            self._end = stop
+
+    def __len__(self) -> int:
+        return len(self._positions)
+
+    @property
+    def next_offset(self) -> int:
+        return self.base_offset + len(self._positions)
+
+    def fits(self, payload: bytes) -> bool:
+        return self._end + _LENGTH.size + len(payload) <= len(self._mmap)
+
+    def append(self, payload: bytes) -> None:
+        start: int = self._end + _LENGTH.size
+        self._mmap[start : start + len(payload)] = payload
+        _LENGTH.pack_into(self._mmap, self._end, len(payload))
+
+        self._positions.append(self._end)
+        self._end = start + len(payload)
+
+    def read(self, offset: int) -> bytes:
+        position: int = self._positions[offset - self.base_offset]
+        (length,) = _LENGTH.unpack_from(self._mmap, position)
+        start: int = position + _LENGTH.size
+
+        return self._mmap[start : start + length]
+
+    def flush(self) -> None:
+        self._mmap.flush()
+
+    def close(self) -> None:
+        self._mmap.flush()
+        self._mmap.close()
+
+
+class AppendLog:
+    """The append-only log of bytes records.
+
+    Example:
+        >>> log = AppendLog(Path("data_lake/time_series_data"))
+        >>> offset: int = log.append(b"...")
+        >>> records: list[bytes] = log.read(offset, limit=100)
+        >>> log.commit("anomaly_detection", offset + 1)
+        >>> log.committed("anomaly_detection")  # after the restart
+    """
+
+    def __init__(
+        self,
+        directory: Path,
+        segment_size: int,
+        retention_segments: int,
+        fsync_interval: float,
+    ) -> None:
+        self.directory: Path = directory
+        self._segment_size: int = segment_size
+        self._retention_segments: int = retention_segments
+        self._fsync_interval: float = fsync_interval
+        self._flushed_at: float = monotonic()
+
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+        self._segments: list[_Segment] = [
+            _Segment(path, int(path.stem), segment_size)
+            for path in sorted(self.directory.glob("*.log"))
+        ]
+        if not self._segments:
+            self._segments.append(self._create_segment(0))
+
+        self._offsets_path: Path = self.directory / _OFFSETS_FILENAME
+        self._committed: dict[str, int] = (
+            json.loads(self._offsets_path.read_text())
+            if self._offsets_path.exists()
+            else {}
+        )
+
+    @property
+    def first_offset(self) -> int:
+        return self._segments[0].base_offset
+
+    @property
+    def next_offset(self) -> int:
+        return self._segments[-1].next_offset
+
+    def _create_segment(self, base_offset: int, size: int = 0) -> _Segment:
+        return _Segment(
+            self.directory / f"{base_offset:020}.log",
+            base_offset,
+            max(size, self._segment_size),
+        )
+
+    def _rotate(self, size: int) -> None:
+        """Start the new segment and remove old ones
+        which are out of the retention.
+        """
+
+        self._segments[-1].flush()
+        self._segments.append(self._create_segment(self.next_offset, size))
+
+        while len(self._segments) > self._retention_segments:
+            segment: _Segment = self._segments.pop(0)
+            segment.close()
+            segment.path.unlink()
+            logger.debug(f"The log segment {segment.path} is removed")
+
+    def append(self, payload: bytes) -> int:
+        """Append the record. Returns its offset."""
+
+        if not self._segments[-1].fits(payload):
+            self._rotate(size=_LENGTH.size + len(payload))
+
+        offset: int = self.next_offset
+        self._segments[-1].append(payload)
+        self._flush_periodically()
+
+        return offset
+
+    def read(self, offset: int, limit: int | None = None) -> list[bytes]:
+        """Read records starting from the offset.
+        Records that are removed by the retention are skipped.
+        """
+
+        offset = max(offset, self.first_offset)
+        stop: int = (
+            self.next_offset
+            if limit is None
+            else min(self.next_offset, offset + limit)
+        )
+
+        records: list[bytes] = []
+        index: int = (
+            bisect_right(
+                [segment.base_offset for segment in self._segments], offset
+            )
+            - 1
+        )
+        while offset < stop:
+            segment: _Segment = self._segments[index]
+            segment_stop: int = min(stop, segment.next_offset)
+            records.extend(
+                segment.read(item) for item in range(offset, segment_stop)
+            )
+            offset, index = segment_stop, index + 1
+
+        return records
+
+    def commit(self, consumer: str, offset: int) -> None:
+        """Remember the offset of the next record for the consumer.
+        It is saved to the disk with the next flush.
+        """
+
+        self._committed[consumer] = offset
+        self._flush_periodically()
+
+    def committed(self, consumer: str) -> int | None:
+        return self._committed.get(consumer)
+
+    def _flush_periodically(self) -> None:
+        if monotonic() - self._flushed_at >= self._fsync_interval:
+            self.flush()
+
+    def flush(self) -> None:
+        """Flush segments and committed offsets to the disk."""
+
+        self._segments[-1].flush()
+
+        temporary: Path = self._offsets_path.with_suffix(".tmp")
+        temporary.write_text(json.dumps(self._committed))
+        temporary.replace(self._offsets_path)
+
+        self._flushed_at = monotonic()
+
+    def close(self) -> None:
+        self.flush()
+        for segment in self._segments:
+            segment.close()
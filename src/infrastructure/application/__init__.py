@@ -1 +1 @@
-from . import factory, middlewares, processes, tasks  # noqa: F401
+from . import factory, middlewares, processes, shards, tasks  # noqa: F401
@@ -22,12 +22,14 @@ def create(
     middlewares: Iterable[middlewares.Middleware],
     startup_tasks: Iterable[Callable[[], Coroutine]],
     startup_processes: Iterable[Callable],
+    shutdown_tasks: Iterable[Callable[[], Coroutine]] = (),
     **kwargs,
 ) -> FastAPI:
     """The application factory.
     1. It runs the FastAPI application
     2. It runs startup async IO-bound separate tasks
     3. It runs startup CPU-bound separate processes
+    4. It runs shutdown tasks that release resources
     """
 
     # Initialize the base FastAPI application
@@ -59,6 +61,11 @@ def create(
     for process in startup_processes:
         app.on_event("startup")(process)
 
+    # Define shutdown tasks
+    # -----------------------------------------------
+    for task in shutdown_tasks:
+        app.on_event("shutdown")(task)
+
     # Define middlewares
     # -----------------------------------------------
     for middleware in middlewares:
@@ -18,6 +18,9 @@ _PROCESSES: dict[str, Process] = {}
 
 # TODO: Get back to the processes after data lake is an external service
 
+# NOTE: Live readings are available for anomaly detection worker processes
+#       via the shared memory: src/application/data_lake.py: SharedLakeItem
+
 
 def _build_key(namespace: str, key: Any) -> str:
     """Builds the unique key base on the namespace."""
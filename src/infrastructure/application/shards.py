@@ -0,0 +1,136 @@
+"""
+The main purpose of this module is implementing the pool of processes
+with the key affinity.
+
+Each key is pinned to one process by the stable hash of the key,
+so the state that the process keeps for the key (module-level
+registries, caches) is reused by next calls of the same key.
+Calls of the same key are executed one by one in the submitted order.
+
+The number of shards is fixed, so adding or removing keys
+never moves other keys between processes.
+
+⚠️ Arguments and results are pickled, so only module-level
+functions and picklable objects could be passed.
+"""
+
+import signal
+import zlib
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import partial
+from multiprocessing import get_context
+from typing import Any, Callable
+
+from loguru import logger
+
+from src.infrastructure.errors import ProcessErorr
+
+__all__ = ("ShardedPool",)
+
+
+def _ignore_interruption() -> None:
+    """The shutdown is controlled by the main process,
+    so worker processes skip Ctrl+C.
+    """
+
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+
+class ShardedPool:
+    """Single-process executors, one per shard.
+
+    Example:
+        >>> pool = ShardedPool(shards=4, name="scoring")
+        >>> future: Future = pool.submit(sensor_id, callback, *args)
+        >>> future = pool.submit_to(pool.shard(sensor_id), callback, *args)
+        >>> futures: list[Future] = pool.broadcast(callback, *args)
+        >>> pool.restart_broken()  # shards with crashed processes
+        >>> pool.shutdown()
+    """
+
+    def __init__(self, shards: int, name: str) -> None:
+        if shards < 1:
+            raise ProcessErorr(message="At least one shard is required")
+
+        self.name: str = name
+        # NOTE: Processes are spawned instead of forked, since the main
+        #       process runs the event loop and threads with locks
+        self._context = get_context("spawn")
+        self._executors: list[ProcessPoolExecutor] = [
+            self._create() for _ in range(shards)
+        ]
+        self._broken: set[int] = set()
+
+    def __len__(self) -> int:
+        return len(self._executors)
+
+    def _create(self) -> ProcessPoolExecutor:
+        return ProcessPoolExecutor(
+            max_workers=1,
+            mp_context=self._context,
+            initializer=_ignore_interruption,
+        )
+
+    def shard(self, key: Any) -> int:
+        """Return the shard of the key.
+        The hash is stable across restarts unlike the builtin one.
+        """
+
+        return zlib.crc32(str(key).encode()) % len(self._executors)
+
+    def _check(self, shard: int, future: Future) -> None:
+        if not future.cancelled() and isinstance(
+            future.exception(), BrokenProcessPool
+        ):
+            self._broken.add(shard)
+
+    def submit_to(self, shard: int, callback: Callable, *args: Any) -> Future:
+        """Call the callback in the process of the shard."""
+
+        try:
+            future: Future = self._executors[shard].submit(callback, *args)
+        except BrokenProcessPool:
+            self._broken.add(shard)
+            raise
+
+        future.add_done_callback(partial(self._check, shard))
+
+        return future
+
+    def submit(self, key: Any, callback: Callable, *args: Any) -> Future:
+        """Call the callback in the process of the key."""
+
+        return self.submit_to(self.shard(key), callback, *args)
+
+    def broadcast(self, callback: Callable, *args: Any) -> list[Future]:
+        """Call the callback in each process.
+        Results are in the order of shards.
+        """
+
+        return [
+            self.submit_to(shard, callback, *args)
+            for shard in range(len(self._executors))
+        ]
+
+    def restart_broken(self) -> list[int]:
+        """Replace processes that are terminated unexpectedly.
+        The state of their keys is lost, so shards are returned.
+        """
+
+        shards: list[int] = sorted(self._broken)
+
+        for shard in shards:
+            self._executors[shard].shutdown(wait=False, cancel_futures=True)
+            self._executors[shard] = self._create()
+            logger.warning(f"The {self.name} process {shard} is restarted")
+
+        self._broken.clear()
+
+        return shards
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Stop all processes. Pending calls are cancelled."""
+
+        for executor in self._executors:
+            executor.shutdown(wait=wait, cancel_futures=True)
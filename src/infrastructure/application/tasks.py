@@ -4,6 +4,7 @@ implementing tasks interaction interface.
 """
 
 from asyncio import Task, create_task
+from functools import partial
 from typing import Any, Callable, Coroutine
 
 from loguru import logger
@@ -39,6 +40,13 @@ def cancel(namespace: str, key: Any) -> None:
     logger.success(f"The task {task.get_name()} is cancelled")
 
 
+def _unregister(key: str, task: Task) -> None:
+    """Remove the finished task from the register if it is still there."""
+
+    if _TASKS.get(key) is task:
+        del _TASKS[key]
+
+
 # NOTE: It could be refactored to use separate threads instead of coroutines.
 #       Create a thread and store the thread by the id/name in the storage.
 #       On delete we can stop the thread on demand.
@@ -51,6 +59,10 @@ async def run(namespace: str, key: Any, coro: Callable[[], Coroutine]):
     task: Task = create_task(coro(), name=_key)
     _TASKS[_key] = task
 
+    # NOTE: Finished tasks are removed from the register
+    #       in order to allow running them again with the same key
+    task.add_done_callback(partial(_unregister, _key))
+
     logger.debug(
         f"A new background task is added to the queue: {task.get_name()}"
     )
@@ -60,6 +60,26 @@ class Cache:
 
         return entry.instance
 
+    @classmethod
+    def delete(cls, namespace: str, key: Any) -> None:
+        cls._DATA.pop(cls._build_key(namespace, key), None)
+
+    @classmethod
+    def clear(cls, namespace: str) -> None:
+        """Remove all entries of the namespace."""
+
+        prefix: str = cls._build_key(namespace, "")
+        for _key in [key for key in cls._DATA if key.startswith(prefix)]:
+            del cls._DATA[_key]
+
+    @classmethod
+    def entries(cls) -> dict[str, Any]:
+        """Return all cached instances by full keys.
+        Expired entries are included since they are still in the memory.
+        """
+
+        return {key: entry.instance for key, entry in cls._DATA.items()}
+
 
 def cached(namespace: str, key: str):
     """This decorator could be used for simple functions that return vlaues.
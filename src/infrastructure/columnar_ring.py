@@ -0,0 +1,93 @@
+"""
+The fixed-size ring buffer of numeric rows that are stored by columns.
+
+Each column is the NumPy array of the doubled capacity. Every row
+is written twice (to the position and to the position + capacity),
+so the retained rows are always the contiguous slice of each column.
+It allows returning views of the last rows without copying
+and without rebuilding objects.
+
+⚠️ Views share the memory with the ring, so they are changed
+by next writes. Copy them if they are kept for long.
+"""
+
+from typing import Any, Mapping
+
+import numpy as np
+from numpy.typing import DTypeLike
+
+__all__ = ("ColumnarRing",)
+
+
+class ColumnarRing:
+    """The ring buffer of rows with named columns.
+
+    Example:
+        >>> ring = ColumnarRing(
+        >>>     capacity=288, columns={"id": np.int64, "ppmv": np.float64}
+        >>> )
+        >>> ring.append(id=1, ppmv=0.5)
+        >>> ring.last(144)["ppmv"].mean()
+    """
+
+    def __init__(
+        self, capacity: int, columns: Mapping[str, DTypeLike]
+    ) -> None:
+        self.capacity: int = capacity
+        self._columns: dict[str, np.ndarray] = {
+            name: np.zeros(capacity * 2, dtype=dtype)
+            for name, dtype in columns.items()
+        }
+
+        # The number of rows that are ever appended
+        self.total: int = 0
+
+    def __len__(self) -> int:
+        return min(self.total, self.capacity)
+
+    @property
+    def _start(self) -> int:
+        """The position of the oldest retained row."""
+
+        return (self.total - len(self)) % self.capacity
+
+    def append(self, **values: Any) -> None:
+        """Append the row. The oldest one is overwritten if it is full."""
+
+        position: int = self.total % self.capacity
+
+        for name, column in self._columns.items():
+            column[position] = column[position + self.capacity] = values[name]
+
+        self.total += 1
+
+    def slice(
+        self, start: int = 0, stop: int | None = None
+    ) -> dict[str, np.ndarray]:
+        """Return views of retained rows by columns.
+        Indexes are relative to the oldest retained row.
+        """
+
+        start, stop, _ = slice(start, stop).indices(len(self))
+        offset: int = self._start
+
+        return {
+            name: column[offset + start : offset + max(start, stop)]
+            for name, column in self._columns.items()
+        }
+
+    def last(self, size: int) -> dict[str, np.ndarray]:
+        """Return views of the last rows (up to the size) by columns."""
+
+        return self.slice(max(len(self) - size, 0))
+
+    def search(self, column: str, value: Any, side: str = "left") -> int:
+        """Find the index of the value in the sorted column
+        (e.g. increasing ids) like `numpy.searchsorted`.
+        """
+
+        return int(
+            np.searchsorted(
+                self.slice()[column], value, side=side  # type: ignore
+            )
+        )
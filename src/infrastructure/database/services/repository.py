@@ -22,9 +22,9 @@ class Session:
     def __init__(self) -> None:
         self._session: AsyncSession = CTX_SESSION.get()
 
-    async def execute(self, query) -> Result:
+    async def execute(self, query, params: list[dict] | None = None) -> Result:
         try:
-            result = await self._session.execute(query)
+            result = await self._session.execute(query, params)
             return result
         except self._ERRORS:
             raise DatabaseError
@@ -11,9 +11,11 @@ from starlette import status
 __all__ = (
     "BaseError",
     "BadRequestError",
+    "ForbiddenError",
     "UnprocessableError",
     "NotFoundError",
     "DatabaseError",
+    "ExternalSourceError",
     "TaskErorr",
     "ProcessErorr",
 )
@@ -40,6 +42,14 @@ class BadRequestError(BaseError):
         )
 
 
+class ForbiddenError(BaseError):
+    def __init__(self, *_: tuple[Any], message: str = "Forbidden") -> None:
+        super().__init__(
+            message=message,
+            status_code=status.HTTP_403_FORBIDDEN,
+        )
+
+
 class UnprocessableError(BaseError):
     def __init__(
         self, *_: tuple[Any], message: str = "Validation error"
@@ -66,6 +76,15 @@ class DatabaseError(BaseError):
         )
 
 
+class ExternalSourceError(BaseError):
+    def __init__(
+        self, *_: tuple[Any], message: str = "External source error"
+    ) -> None:
+        super().__init__(
+            message=message, status_code=status.HTTP_502_BAD_GATEWAY
+        )
+
+
 class TaskErorr(BaseError):
     def __init__(self, *_: tuple[Any], message: str) -> None:
         super().__init__(
@@ -0,0 +1,183 @@
+"""
+The memory accounting of in-process state stores.
+
+Each store is registered with the collector that returns its entries
+by key (usually by the sensor id). The size of entries is estimated
+by walking containers, numpy arrays and project objects. Big containers
+are sampled, so the size is the estimation and not the exact value.
+
+High-water marks and the history of snapshots are kept for each store,
+so stores that only grow are flagged as possible leaks.
+"""
+
+import sys
+from collections import deque
+from dataclasses import dataclass, field
+from itertools import islice, pairwise
+from typing import Any, Callable, Deque
+
+import numpy as np
+
+from src.config import settings
+from src.infrastructure.models import InternalModel
+
+__all__ = (
+    "MemoryEntryStats",
+    "MemoryStoreStats",
+    "MemoryStores",
+    "estimate_size",
+)
+
+
+# The number of items that are measured in big containers
+SAMPLE_SIZE = 100
+
+# Only attributes of objects from these packages are walked through.
+# Other objects (e.g. asyncio primitives) would lead to the whole heap.
+_WALKED_PACKAGES = ("src.", "stumpy.")
+
+_SCALARS = (str, bytes, bytearray, int, float, bool, type(None))
+
+
+def estimate_size(instance: Any) -> int:
+    """Estimate the deep size of the object in bytes."""
+
+    seen: set[int] = set()
+
+    def sample(items: list[Any]) -> int:
+        if len(items) <= SAMPLE_SIZE:
+            return sum(size(item) for item in items)
+
+        step: int = len(items) // SAMPLE_SIZE
+        measured: int = sum(size(item) for item in items[::step][:SAMPLE_SIZE])
+        return measured * len(items) // SAMPLE_SIZE
+
+    def size(obj: Any) -> int:
+        if id(obj) in seen:
+            return 0
+        seen.add(id(obj))
+
+        total: int = sys.getsizeof(obj)
+
+        if isinstance(obj, _SCALARS):
+            return total
+        if isinstance(obj, np.ndarray):
+            return max(total, obj.nbytes)
+        if isinstance(obj, dict):
+            return (
+                total + sample(list(obj.keys())) + sample(list(obj.values()))
+            )
+        if isinstance(obj, (list, tuple, set, frozenset, deque)):
+            return total + sample(list(obj))
+
+        if type(obj).__module__.startswith(_WALKED_PACKAGES):
+            if hasattr(obj, "__dict__"):
+                total += size(vars(obj))
+            for slot in getattr(type(obj), "__slots__", ()):
+                total += size(getattr(obj, slot, None))
+
+        return total
+
+    return size(instance)
+
+
+class MemoryEntryStats(InternalModel):
+    key: str
+    entries: int
+    bytes: int
+
+
+class MemoryStoreStats(InternalModel):
+    name: str
+    entries: int
+    bytes: int
+    high_water_entries: int
+    high_water_bytes: int
+    # The number of entries did not decrease during the last snapshots
+    only_grows: bool
+    keys: list[MemoryEntryStats]
+
+
+# The collector returns the number of entries
+# and the object which size is estimated by the key
+StoreCollector = Callable[[], dict[str, tuple[int, Any]]]
+
+
+@dataclass
+class _Store:
+    collector: StoreCollector
+    high_water_entries: int = 0
+    high_water_bytes: int = 0
+    history: Deque[int] = field(
+        default_factory=lambda: deque(maxlen=settings.memory.growth_samples)
+    )
+
+    def only_grows(self) -> bool:
+        if len(self.history) < (self.history.maxlen or 0):
+            return False
+
+        return self.history[-1] > self.history[0] and all(
+            previous <= current for previous, current in pairwise(self.history)
+        )
+
+
+class MemoryStores:
+    """The registry of in-process state stores.
+
+    Example:
+        >>> MemoryStores.register(
+        >>>     "matrix_profiles",
+        >>>     lambda: {str(k): (1, v) for k, v in MATRIX_PROFILES.items()},
+        >>> )
+        >>> stats: list[MemoryStoreStats] = MemoryStores.snapshot(record=True)
+    """
+
+    _STORES: dict[str, _Store] = {}
+
+    @classmethod
+    def register(cls, name: str, collector: StoreCollector) -> None:
+        cls._STORES[name] = _Store(collector=collector)
+
+    @classmethod
+    def snapshot(
+        cls, top: int = 10, record: bool = False
+    ) -> list[MemoryStoreStats]:
+        """Collect stats of all stores.
+        Only the biggest keys (up to the top) are included.
+
+        ⚠️ Only recorded snapshots are added to the history of stores,
+        so they should be taken with the same periodicity.
+        """
+
+        results: list[MemoryStoreStats] = []
+
+        for name, store in cls._STORES.items():
+            keys: list[MemoryEntryStats] = [
+                MemoryEntryStats(
+                    key=key, entries=entries, bytes=estimate_size(instance)
+                )
+                for key, (entries, instance) in store.collector().items()
+            ]
+            entries: int = sum(key.entries for key in keys)
+            bytes_: int = sum(key.bytes for key in keys)
+
+            store.high_water_entries = max(store.high_water_entries, entries)
+            store.high_water_bytes = max(store.high_water_bytes, bytes_)
+            if record is True:
+                store.history.append(entries)
+
+            results.append(
+                MemoryStoreStats(
+                    name=name,
+                    entries=entries,
+                    bytes=bytes_,
+                    high_water_entries=store.high_water_entries,
+                    high_water_bytes=store.high_water_bytes,
+                    only_grows=store.only_grows(),
+                    keys=list(
+                        islice(sorted(keys, key=lambda key: -key.bytes), top)
+                    ),
+                )
+            )
+
+        return results
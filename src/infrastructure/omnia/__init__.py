@@ -0,0 +1,9 @@
+"""
+This package includes the OMNIA time series API integration.
+
+The local stub server (stub.py) is provided in order
+to test the throughput and latency of the client offline.
+"""
+
+from src.infrastructure.omnia.client import *  # noqa: F401, F403
+from src.infrastructure.omnia.contracts import *  # noqa: F401, F403
@@ -0,0 +1,128 @@
+"""
+The pooled OMNIA time series API client.
+
+All requests share one connection pool with keep-alive connections.
+Tags are split into batches that are fetched with one request each,
+the number of concurrent requests is limited by the semaphore.
+Failed requests are retried with the exponential backoff.
+"""
+
+import asyncio
+import random
+from itertools import chain
+
+import httpx
+from loguru import logger
+
+from src.config import settings
+from src.infrastructure.errors import ExternalSourceError
+
+from .contracts import OmniaDataQuery, OmniaDataResponse, OmniaTimeseriesData
+
+__all__ = ("OmniaClient",)
+
+
+# NOTE: Client errors (except of the rate limit) are not retried
+_RETRY_STATUS_CODES = frozenset((429, 500, 502, 503, 504))
+
+
+class OmniaClient:
+    """The OMNIA time series API client.
+
+    Example:
+        >>> client = OmniaClient()
+        >>> queries = [OmniaDataQuery(id="18AIJ012A")]
+        >>> items = await client.query_data(queries)
+        >>> await client.close()
+    """
+
+    def __init__(
+        self,
+        base_url: str = settings.omnia.base_url,
+        tags_per_request: int = settings.omnia.tags_per_request,
+        concurrency: int = settings.omnia.concurrency,
+        retries: int = settings.omnia.retries,
+    ) -> None:
+        self._tags_per_request: int = tags_per_request
+        self._retries: int = retries
+        self._semaphore = asyncio.Semaphore(concurrency)
+
+        self._client = httpx.AsyncClient(
+            base_url=base_url,
+            timeout=settings.omnia.timeout,
+            limits=httpx.Limits(
+                max_connections=settings.omnia.max_connections,
+                max_keepalive_connections=(
+                    settings.omnia.max_keepalive_connections
+                ),
+                keepalive_expiry=settings.omnia.keepalive_expiry,
+            ),
+        )
+
+    async def close(self) -> None:
+        await self._client.aclose()
+
+    async def query_data(
+        self, queries: list[OmniaDataQuery]
+    ) -> list[OmniaTimeseriesData]:
+        """Fetch datapoints for all queries.
+        Queries are split into batches which are fetched concurrently.
+        """
+
+        batches: list[list[OmniaDataQuery]] = [
+            queries[index : index + self._tags_per_request]
+            for index in range(0, len(queries), self._tags_per_request)
+        ]
+        results: list[list[OmniaTimeseriesData]] = await asyncio.gather(
+            *(self._query_batch(batch) for batch in batches)
+        )
+
+        return list(chain.from_iterable(results))
+
+    async def _query_batch(
+        self, queries: list[OmniaDataQuery]
+    ) -> list[OmniaTimeseriesData]:
+        response: httpx.Response = await self._post(
+            "/query/data",
+            payload=[query.encoded_dict() for query in queries],
+        )
+
+        return OmniaDataResponse(**response.json()).data.items
+
+    async def _post(self, url: str, payload: list[dict]) -> httpx.Response:
+        """Perform the request with retries.
+        The concurrency slot is not held while waiting for the next attempt.
+        """
+
+        for attempt in range(self._retries + 1):
+            try:
+                async with self._semaphore:
+                    response = await self._client.post(url, json=payload)
+                if response.status_code not in _RETRY_STATUS_CODES:
+                    response.raise_for_status()
+                    return response
+                error_message = f"Status code {response.status_code}"
+            except httpx.TransportError as error:
+                error_message = repr(error)
+            except httpx.HTTPStatusError as error:
+                raise ExternalSourceError(message=str(error)) from error
+
+            if attempt == self._retries:
+                break
+
+            # NOTE: The jitter prevents retries of concurrent
+            #       requests from hitting the server at the same time
+            delay: float = min(
+                settings.omnia.backoff_max,
+                settings.omnia.backoff_factor * 2**attempt,
+            ) * random.uniform(0.5, 1.0)
+
+            logger.warning(
+                f"OMNIA request {url} failed: {error_message}. "
+                f"Retry in {delay:.2f}s"
+            )
+            await asyncio.sleep(delay)
+
+        raise ExternalSourceError(
+            message=f"OMNIA request {url} failed: {error_message}"
+        )
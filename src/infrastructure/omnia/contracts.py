@@ -0,0 +1,44 @@
+"""
+OMNIA time series API data models.
+Only fields that are used by the application are described here.
+"""
+
+from datetime import datetime
+
+from src.infrastructure.models import PublicModel
+
+__all__ = (
+    "OmniaDataQuery",
+    "OmniaDatapoint",
+    "OmniaTimeseriesData",
+    "OmniaDataItems",
+    "OmniaDataResponse",
+)
+
+
+class OmniaDataQuery(PublicModel):
+    """The query for datapoints of the specific tag.
+    Only datapoints after the start time are returned.
+    """
+
+    id: str
+    start_time: datetime | None = None
+    limit: int | None = None
+
+
+class OmniaDatapoint(PublicModel):
+    time: datetime
+    value: float
+
+
+class OmniaTimeseriesData(PublicModel):
+    id: str
+    datapoints: list[OmniaDatapoint]
+
+
+class OmniaDataItems(PublicModel):
+    items: list[OmniaTimeseriesData]
+
+
+class OmniaDataResponse(PublicModel):
+    data: OmniaDataItems
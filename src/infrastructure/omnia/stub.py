@@ -0,0 +1,132 @@
+"""
+The local stand-in server that imitates the OMNIA time series API.
+It serves mocked CSV files (the tag is the file name) so the client
+throughput and latency could be tested offline.
+
+Readings are released gradually like they are coming from the real plant:
+the next row of each file becomes available every release interval.
+The response latency and the failure rate could be configured as well.
+
+Usage:
+    uvicorn src.infrastructure.omnia.stub:app --port 8001
+"""
+
+import asyncio
+import random
+from functools import lru_cache
+from time import monotonic
+
+import numpy as np
+import pandas as pd
+from fastapi import FastAPI, HTTPException
+from numpy.typing import NDArray
+from pydantic import BaseSettings
+
+from src.config import settings
+
+from .contracts import (
+    OmniaDataItems,
+    OmniaDatapoint,
+    OmniaDataQuery,
+    OmniaDataResponse,
+    OmniaTimeseriesData,
+)
+
+__all__ = ("app",)
+
+
+class StubSettings(BaseSettings):
+    # The interval (in seconds) between releases of the next row of each tag.
+    # All rows are available at once if it is 0
+    release_interval: float = 1.0
+
+    # The artificial response latency (in seconds)
+    latency: float = 0.0
+
+    # The share of requests that fail with the 503 status code
+    failure_rate: float = 0.0
+
+    class Config:
+        env_prefix = "OMNIA_STUB_"
+
+
+stub_settings = StubSettings()
+app = FastAPI(title="OMNIA stub")
+
+_STARTED_AT: float = monotonic()
+
+
+@lru_cache(maxsize=None)
+def _load(tag: str) -> tuple[NDArray[np.datetime64], NDArray[np.float64]]:
+    """Load the whole mocked file of the tag.
+    Empty columns are returned if the file does not exist.
+    """
+
+    filename = settings.mock_dir / "tsd" / f"{tag}.csv"
+    if filename.parent != settings.mock_dir / "tsd" or not filename.is_file():
+        return np.array([], dtype="datetime64[us]"), np.array([])
+
+    data: pd.DataFrame = pd.read_csv(filename, index_col=0)
+    timestamps = pd.to_datetime(data.iloc[:, 0]).to_numpy(
+        dtype="datetime64[us]"
+    )
+    values = data.iloc[:, 1].to_numpy(dtype=np.float64)
+
+    # NOTE: Missing and infinite values are not allowed by the JSON format
+    mask = np.isfinite(values)
+
+    return timestamps[mask], values[mask]
+
+
+def _released() -> int:
+    """The number of rows of each tag that are available for now."""
+
+    if not stub_settings.release_interval:
+        return np.iinfo(np.int64).max
+
+    return (
+        int((monotonic() - _STARTED_AT) / stub_settings.release_interval) + 1
+    )
+
+
+def _datapoints(query: OmniaDataQuery) -> list[OmniaDatapoint]:
+    timestamps, values = _load(query.id)
+    stop: int = min(_released(), timestamps.shape[0])
+
+    start: int = 0
+    if query.start_time is not None:
+        start = int(
+            np.searchsorted(
+                timestamps[:stop],
+                np.datetime64(query.start_time.replace(tzinfo=None), "us"),
+                side="right",
+            )
+        )
+
+    if query.limit is not None:
+        stop = min(stop, start + query.limit)
+
+    return [
+        OmniaDatapoint(time=time, value=value)
+        for time, value in zip(
+            timestamps[start:stop].tolist(), values[start:stop].tolist()
+        )
+    ]
+
+
+@app.post("/query/data")
+async def query_data(queries: list[OmniaDataQuery]) -> OmniaDataResponse:
+    if stub_settings.latency:
+        await asyncio.sleep(stub_settings.latency)
+
+    if random.random() < stub_settings.failure_rate:
+        raise HTTPException(status_code=503)
+
+    return OmniaDataResponse(
+        data=OmniaDataItems(
+            items=[
+                OmniaTimeseriesData(id=query.id, datapoints=_datapoints(query))
+                for query in queries
+            ]
+        )
+    )
@@ -0,0 +1,30 @@
+"""
+This module includes the security dependencies for the API endpoints.
+"""
+
+from secrets import compare_digest
+
+from fastapi import Security
+from fastapi.security import APIKeyHeader
+
+from src.config import settings
+from src.infrastructure.errors import ForbiddenError
+
+__all__ = ("admin_only",)
+
+
+_ADMIN_API_KEY_HEADER = APIKeyHeader(name="X-Admin-Key", auto_error=False)
+
+
+async def admin_only(
+    api_key: str | None = Security(_ADMIN_API_KEY_HEADER),
+) -> None:
+    """The dependency that allows the request only if the admin key
+    from the header matches the one from settings.
+    """
+
+    if not settings.admin.api_key:
+        raise ForbiddenError(message="Admin endpoints are turned off")
+
+    if not (api_key and compare_digest(api_key, settings.admin.api_key)):
+        raise ForbiddenError(message="Invalid admin key")
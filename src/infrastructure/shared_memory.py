@@ -0,0 +1,167 @@
+"""
+The ring buffer of fixed-size numeric records in the shared memory.
+
+It is used for passing the live data from the main process to worker
+processes without pickling and database round trips. The producer is
+the single process that creates the ring. Consumers attach to it by name
+and keep their own read positions, so they do not affect each other.
+
+The memory layout:
+    [tail: int64] [reserved: int64] [capacity: int64] [records]
+
+The tail is the sequence number of the next record. It is increased
+only after records are written, so consumers never see partial records.
+The reserved one is increased before records are written, so records
+that are overwritten while the consumer copies them are reported
+as lost instead of being returned.
+"""
+
+from multiprocessing import shared_memory
+
+import numpy as np
+from loguru import logger
+
+from src.infrastructure.errors import ProcessErorr
+
+__all__ = ("SharedRing",)
+
+
+_HEADER_SIZE = 3
+_TAIL, _RESERVED, _CAPACITY = range(_HEADER_SIZE)
+
+
+class SharedRing:
+    """The single-producer ring buffer in the shared memory.
+
+    Example:
+        >>> ring = SharedRing.create("readings", capacity=1000, dtype=dtype)
+        >>> ring.push(records)
+        >>> # in the worker process
+        >>> ring = SharedRing.attach("readings", dtype=dtype)
+        >>> records, position, lost = ring.read(position)
+    """
+
+    def __init__(
+        self,
+        memory: shared_memory.SharedMemory,
+        dtype: np.dtype,
+        owner: bool,
+    ) -> None:
+        self._memory: shared_memory.SharedMemory = memory
+        self._owner: bool = owner
+        self.dtype: np.dtype = dtype
+
+        self._header: np.ndarray = np.ndarray(
+            (_HEADER_SIZE,), dtype=np.int64, buffer=memory.buf
+        )
+        self.capacity: int = int(self._header[_CAPACITY])
+        self._records: np.ndarray = np.ndarray(
+            (self.capacity,),
+            dtype=dtype,
+            buffer=memory.buf,
+            offset=self._header.nbytes,
+        )
+
+    @property
+    def name(self) -> str:
+        return self._memory.name
+
+    @property
+    def tail(self) -> int:
+        return int(self._header[_TAIL])
+
+    @classmethod
+    def create(cls, name: str, capacity: int, dtype: np.dtype) -> "SharedRing":
+        """Create the ring. It is owned by the current process."""
+
+        size: int = (
+            _HEADER_SIZE * np.dtype(np.int64).itemsize
+            + capacity * dtype.itemsize
+        )
+        try:
+            memory = shared_memory.SharedMemory(
+                name=name, create=True, size=size
+            )
+        except FileExistsError:
+            # NOTE: The memory is left by the process that was not
+            #       stopped gracefully, since there is the only producer
+            logger.warning(f"Shared memory {name} is recreated")
+            shared_memory.SharedMemory(name=name).unlink()
+            memory = shared_memory.SharedMemory(
+                name=name, create=True, size=size
+            )
+
+        header: np.ndarray = np.ndarray(
+            (_HEADER_SIZE,), dtype=np.int64, buffer=memory.buf
+        )
+        header[:] = 0, 0, capacity
+        del header
+
+        return cls(memory, dtype, owner=True)
+
+    @classmethod
+    def attach(cls, name: str, dtype: np.dtype) -> "SharedRing":
+        """Attach to the ring that is created by another process."""
+
+        try:
+            memory = shared_memory.SharedMemory(name=name)
+        except FileNotFoundError:
+            raise ProcessErorr(message=f"Shared memory {name} does not exist")
+
+        # WARNING: The worker process should be started by multiprocessing
+        #          (src/infrastructure/application/processes.py) in order to
+        #          share the resource tracker with the producer. Otherwise,
+        #          the memory is unlinked when the worker is finished.
+
+        return cls(memory, dtype, owner=False)
+
+    def push(self, records: np.ndarray) -> None:
+        """Write records and publish them to consumers.
+        Only the last `capacity` records are kept if there are more.
+        """
+
+        tail: int = self.tail
+        total: int = tail + len(records)
+        records = records[-self.capacity :]
+
+        self._header[_RESERVED] = total
+        self._records[
+            np.arange(total - len(records), total) % self.capacity
+        ] = records
+        self._header[_TAIL] = total
+
+    def read(
+        self, position: int, limit: int | None = None
+    ) -> tuple[np.ndarray, int, int]:
+        """Copy records starting from the position.
+        Returns records, the next position and the number of lost records
+        that were overwritten before they are read.
+        """
+
+        tail: int = self.tail
+        start: int = max(position, tail - self.capacity)
+        stop: int = tail if limit is None else min(tail, start + limit)
+
+        records: np.ndarray = self._records[
+            np.arange(start, stop) % self.capacity
+        ]
+
+        # NOTE: The producer might overwrite the oldest records
+        #       during the copy, so they are dropped
+        valid_from: int = int(self._header[_RESERVED]) - self.capacity
+        if (overwritten := min(valid_from - start, stop - start)) > 0:
+            records = records[overwritten:]
+            start += overwritten
+
+        return records, stop, start - position
+
+    def close(self) -> None:
+        """Detach from the ring.
+        The shared memory is released if the ring is owned.
+        """
+
+        del self._header, self._records
+        self._memory.close()
+
+        if self._owner:
+            self._memory.unlink()
@@ -39,8 +39,7 @@ logger.debug(
     "\n*******************************************************************"
     "\nThe TSD fetching from the external source periodicity: "
     f"{settings.tsd_fetch_periodicity}"
-    "\nThe data lake consuming periodicity: "
-    f"{settings.data_lake_consuming_periodicity}"
+    f"\nThe TSD source: {settings.tsd.source}"
     "\nThe sensor's anomaly detection baseline best selection interval: "
     f"{settings.sensors.anomaly_detection.baseline_best_selection_interval}"
     "\nThe sensor's anomaly detection baseline augmentation interval: "
@@ -60,13 +59,31 @@ if settings.debug is True:
 
 startup_tasks.extend(
     [
-        application.tsd.create_tasks_for_existed_sensors_process,
+        # NOTE: The shared memory should exist before processes are started
+        application.data_lake.open_shared_memory,
+        application.data_lake.open_logs,
+        # NOTE: Sensors are started before the TSD processing
+        application.lifecycle.start_all,
+        # NOTE: Matrix profiles are restored before readings are consumed
+        application.anomaly_detection.restore_matrix_profiles,
+        partial(
+            tasks.run,
+            namespace="tsd",
+            key="processing",
+            coro=application.tsd.process,
+        ),
         partial(
             tasks.run,
             namespace="anomaly_detection",
             key="processing",
             coro=application.anomaly_detection.process,
         ),
+        partial(
+            tasks.run,
+            namespace="anomaly_detection",
+            key="snapshots",
+            coro=application.anomaly_detection.save_matrix_profiles,
+        ),
         # TODO: Move to the separate process
         partial(
             tasks.run,
@@ -74,6 +91,12 @@ startup_tasks.extend(
             key="processing",
             coro=application.simulation.process,
         ),
+        partial(
+            tasks.run,
+            namespace="memory",
+            key="logging",
+            coro=application.memory.process,
+        ),
     ]
 )
 
@@ -89,6 +112,9 @@ app: FastAPI = factory.create(
         presentation.sensors.router,
         presentation.tsd.router,
         presentation.anomaly_detection.router,
+        presentation.anomaly_detection.stats_router,
+        presentation.data_lake.router,
+        presentation.memory.router,
         presentation.events.sensors.router,
         presentation.events.system.router,
     ),
@@ -107,6 +133,13 @@ app: FastAPI = factory.create(
             callback=application.sensors.initial_baseline_augmentation,
         ),
     ),
+    shutdown_tasks=(
+        # NOTE: The snapshot is saved before data lake logs are closed
+        application.anomaly_detection.stop,
+        application.tsd.close_source,
+        application.data_lake.close_shared_memory,
+        application.data_lake.close_logs,
+    ),
 )
 
 
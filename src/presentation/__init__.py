@@ -1,8 +1,10 @@
 from src.presentation import (  # noqa: F401
     anomaly_detection,
+    data_lake,
     estimation,
     events,
     fields,
+    memory,
     sensors,
     simulation,
     templates,
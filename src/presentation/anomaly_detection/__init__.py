@@ -1,2 +1,3 @@
+from src.presentation.anomaly_detection.rest import *  # noqa: F401, F403
 from src.presentation.anomaly_detection.views import *  # noqa: F401, F403
 from src.presentation.anomaly_detection.websockets import *  # noqa: F401, F403
@@ -22,3 +22,10 @@ class AnomalyDetectionPublic(PublicModel):
             "for this time series data processing"
         )
     )
+
+
+class AnomalyDetectionStatsPublic(PublicModel):
+    scored: int = Field(description="The number of scored readings")
+    failed: int = Field(
+        description="The number of readings which scoring failed"
+    )
@@ -0,0 +1,29 @@
+from fastapi import APIRouter, Depends, Request
+
+from src.application import anomaly_detection
+from src.infrastructure.contracts import Response
+from src.infrastructure.security import admin_only
+
+from .contracts import AnomalyDetectionStatsPublic
+
+__all__ = ("stats_router",)
+
+# NOTE: The `router` name is taken by websockets of anomaly detections
+stats_router = APIRouter(
+    prefix="/anomaly-detection",
+    tags=["Anomaly detections"],
+    dependencies=[Depends(admin_only)],
+)
+
+
+@stats_router.get("/stats")
+async def anomaly_detection_stats(
+    _: Request,
+) -> Response[AnomalyDetectionStatsPublic]:
+    """Return counters of the live anomaly detection processing.
+    Readings which scoring failed are logged by ids.
+    """
+
+    return Response[AnomalyDetectionStatsPublic](
+        result=AnomalyDetectionStatsPublic(**anomaly_detection.stats().dict())
+    )
@@ -1,11 +1,13 @@
 from contextlib import suppress
+from functools import partial
 
-from fastapi import APIRouter, WebSocket
+from fastapi import APIRouter, WebSocket, status
 from loguru import logger
 from websockets.exceptions import ConnectionClosed
 
 from src.application import anomaly_detection
 from src.application.data_lake import data_lake
+from src.config import settings
 from src.infrastructure.contracts import Response, ResponseMulti
 from src.infrastructure.errors import NotFoundError
 from src.presentation.anomaly_detection.contracts import AnomalyDetectionPublic
@@ -16,32 +18,63 @@ router = APIRouter(prefix="/sensors", tags=["Anomaly detections"])
 
 
 @router.websocket("/{sensor_id}/anomaly-detections")
-async def anomaly_detections_for_simulation(ws: WebSocket, sensor_id: int):
+async def anomaly_detections_for_simulation(
+    ws: WebSocket, sensor_id: int, last_id: int | None = None
+):
+    """Establish the websocket connection and send the next data:
+    1. historical anomaly detections
+    2. the new anomaly detections on each event that produced by daemon
+
+    If the client reconnects with the last seen id
+    (/sensors/1/anomaly-detections?last_id=100), the historical data
+    is not sent. Only missed items are sent before the new ones.
+    """
+
+    # NOTE: Lake items exist only for running sensors
+    if (
+        leak_storage := data_lake.anomaly_detections_by_sensor.get(sensor_id)
+    ) is None:
+        await ws.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+
     await ws.accept()
     logger.success(
         "Opening WS connection for anomaly detections fetching "
         f"from sensor: {sensor_id}"
     )
 
-    # Just skip if there is no historical data in the database
-    with suppress(NotFoundError):
-        historical_data: list[AnomalyDetectionPublic] = [
-            AnomalyDetectionPublic.from_orm(instance)
-            for instance in (
-                await anomaly_detection.get_historical_data(sensor_id)
+    if last_id is None:
+        last_id = 0
+
+        # Just skip if there is no historical data in the database
+        with suppress(NotFoundError):
+            historical_data: list[AnomalyDetectionPublic] = [
+                AnomalyDetectionPublic.from_orm(instance)
+                for instance in (
+                    await anomaly_detection.get_historical_data(sensor_id)
+                )
+            ]
+
+            # WARNING: The historical data should be sent by chanks since
+            #           there is a HTTP protocol limitation on the data size
+            historical_response = ResponseMulti[AnomalyDetectionPublic](
+                result=historical_data
             )
-        ]
+            await ws.send_json(historical_response.encoded_dict())
 
-        # WARNING: The historical data should be sent by chanks since
-        #           there is a HTTP protocol limitation on the data size
-        historical_response = ResponseMulti[AnomalyDetectionPublic](
-            result=historical_data
-        )
-        await ws.send_json(historical_response.encoded_dict())
+            # NOTE: Items that are saved after the historical data
+            #       is fetched are sent as missed ones
+            last_id = historical_data[-1].id
 
     # Run the infinite consuming of new anomaly detection data
-    leak_storage = data_lake.anomaly_detections_by_sensor[sensor_id]
-    async for instance in leak_storage.consume():
+    async for instance in leak_storage.consume_after(
+        last_id,
+        fetch_missed=partial(
+            anomaly_detection.get_missed_data,
+            sensor_id,
+            limit=settings.public_api.websocket_resume_limit,
+        ),
+    ):
         response = Response[AnomalyDetectionPublic](
             result=AnomalyDetectionPublic.from_orm(instance)
         )
@@ -0,0 +1,31 @@
+from pydantic import Field
+
+from src.application.data_lake import OverflowPolicy
+from src.infrastructure.models import PublicModel
+
+__all__ = ("LakeItemStatsPublic",)
+
+
+class LakeItemStatsPublic(PublicModel):
+    name: str = Field(description="The data lake item name")
+    capacity: int | None = Field(
+        description="The max number of items in the memory"
+    )
+    overflow_policy: OverflowPolicy = Field(
+        description="What happens with the new item if the item is full"
+    )
+    subscribers: int = Field(description="The number of read cursors")
+    lag: int = Field(
+        description="The number of items that are not read "
+        "by the slowest subscriber"
+    )
+    high_water: int = Field(description="The max lag since the start")
+    produced: int
+    consumed: int = Field(description="The number of reads by all subscribers")
+    dropped: int
+    spilled: int = Field(
+        description="The number of items that are waiting on the disk"
+    )
+    blocked_seconds: float = Field(
+        description="The total time that producers were blocked"
+    )
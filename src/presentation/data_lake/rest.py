@@ -0,0 +1,27 @@
+from fastapi import APIRouter, Depends, Request
+
+from src.application.data_lake import data_lake
+from src.infrastructure.contracts import ResponseMulti
+from src.infrastructure.security import admin_only
+
+from .contracts import LakeItemStatsPublic
+
+__all__ = ("router",)
+
+router = APIRouter(
+    prefix="/data-lake", tags=["Data lake"], dependencies=[Depends(admin_only)]
+)
+
+
+@router.get("/stats")
+async def data_lake_stats(_: Request) -> ResponseMulti[LakeItemStatsPublic]:
+    """Return counters of all data lake items.
+    They are used for sizing capacities of the pipeline.
+    """
+
+    return ResponseMulti[LakeItemStatsPublic](
+        result=[
+            LakeItemStatsPublic(name=name, **stats.dict())
+            for name, stats in data_lake.stats().items()
+        ]
+    )
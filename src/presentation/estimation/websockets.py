@@ -1,6 +1,6 @@
 from contextlib import suppress
 
-from fastapi import APIRouter, WebSocket
+from fastapi import APIRouter, WebSocket, status
 from loguru import logger
 from websockets.exceptions import ConnectionClosed
 
@@ -38,6 +38,13 @@ async def estimation_summary(ws: WebSocket, sensor_id: int):
             )
         )
 
+    # NOTE: Lake items exist only for running sensors
+    if (
+        leak_storage := data_lake.anomaly_detections_by_sensor.get(sensor_id)
+    ) is None:
+        await ws.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+
     await ws.accept()
     logger.success(
         "Opening WS connection for Estimation results fetching "
@@ -63,7 +70,6 @@ async def estimation_summary(ws: WebSocket, sensor_id: int):
         await ws.send_json(historical_response.encoded_dict())
 
     # Run the infinite consuming of new anomaly detection data
-    leak_storage = data_lake.anomaly_detections_by_sensor[sensor_id]
     async for instance in leak_storage.consume():
         response = Response[EstimationSummaryPublic](
             result=EstimationSummaryPublic.from_orm(instance)
@@ -1,6 +1,6 @@
 from contextlib import suppress
 
-from fastapi import APIRouter, WebSocket
+from fastapi import APIRouter, WebSocket, status
 from loguru import logger
 from websockets.exceptions import ConnectionClosed
 
@@ -19,6 +19,11 @@ router = APIRouter(prefix="/events/sensors")
 
 @router.websocket("/{sensor_id}")
 async def sensor_events(ws: WebSocket, sensor_id: int):
+    # NOTE: Lake items exist only for running sensors
+    if (lake_item := data_lake.events_by_sensor.get(sensor_id)) is None:
+        await ws.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+
     await ws.accept()
     logger.success(
         "Opening WS connection for events fetching "
@@ -37,7 +42,7 @@ async def sensor_events(ws: WebSocket, sensor_id: int):
         await ws.send_json(response.encoded_dict())
 
     # Run the infinite consuming of new sensor events
-    async for instance in data_lake.events_by_sensor[sensor_id].consume():
+    async for instance in lake_item.consume():
         response = Response[EventPublic](
             result=EventPublic(
                 id=instance.id,
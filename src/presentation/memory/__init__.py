@@ -0,0 +1 @@
+from .rest import *  # noqa: F401, F403
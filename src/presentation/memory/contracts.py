@@ -0,0 +1,30 @@
+from pydantic import Field
+
+from src.infrastructure.models import PublicModel
+
+__all__ = ("MemoryEntryStatsPublic", "MemoryStoreStatsPublic")
+
+
+class MemoryEntryStatsPublic(PublicModel):
+    key: str = Field(description="The key in the store (e.g. the sensor id)")
+    entries: int
+    bytes: int = Field(description="The estimated size")
+
+
+class MemoryStoreStatsPublic(PublicModel):
+    name: str = Field(description="The in-process state store name")
+    entries: int
+    bytes: int = Field(description="The estimated size")
+    high_water_entries: int = Field(
+        description="The max number of entries since the start"
+    )
+    high_water_bytes: int = Field(
+        description="The max estimated size since the start"
+    )
+    only_grows: bool = Field(
+        description="The number of entries did not decrease "
+        "during the last snapshots. It could be the leak"
+    )
+    keys: list[MemoryEntryStatsPublic] = Field(
+        description="The biggest keys of the store"
+    )
@@ -0,0 +1,34 @@
+from fastapi import APIRouter, Depends, Query, Request
+
+from src.application import memory
+from src.infrastructure.contracts import ResponseMulti
+from src.infrastructure.security import admin_only
+
+from .contracts import MemoryEntryStatsPublic, MemoryStoreStatsPublic
+
+__all__ = ("router",)
+
+router = APIRouter(
+    prefix="/memory", tags=["Memory"], dependencies=[Depends(admin_only)]
+)
+
+
+@router.get("/stats")
+async def memory_stats(
+    _: Request, top: int = Query(default=10, ge=1)
+) -> ResponseMulti[MemoryStoreStatsPublic]:
+    """Return the memory usage of in-process state stores
+    with the biggest keys of each of them.
+    """
+
+    return ResponseMulti[MemoryStoreStatsPublic](
+        result=[
+            MemoryStoreStatsPublic(
+                **store.dict(exclude={"keys"}),
+                keys=[
+                    MemoryEntryStatsPublic(**key.dict()) for key in store.keys
+                ],
+            )
+            for store in memory.stats(top=top)
+        ]
+    )
@@ -91,3 +91,17 @@ class SensorPublic(SensorCreateRequestBody):
     configuration: SensorConfigurationPublic = Field(
         description=SENSOR_CONFIGURATION_DESCRIPTION
     )
+
+
+class SensorBackfillRequestBody(PublicModel):
+    """This data model corresponds to the http request body
+    for the historical time series data backfill.
+    """
+
+    filename: str | None = Field(
+        description=(
+            "The CSV file name from the mock TSD directory. "
+            "The sensor name is used by default"
+        ),
+        default=None,
+    )
@@ -1,13 +1,18 @@
 from functools import partial
+from pathlib import Path
 
-from fastapi import APIRouter, Request
+from fastapi import APIRouter, Depends, Request
 
-from src.application import sensors, tsd
+from src.application import lifecycle, sensors, tsd
+from src.config import settings
 from src.domain.sensors import Sensor, SensorBase, SensorUpdatePartialSchema
 from src.infrastructure.application import tasks
 from src.infrastructure.contracts import Response, ResponseMulti
+from src.infrastructure.errors import BadRequestError, NotFoundError
+from src.infrastructure.security import admin_only
 
 from .contracts import (
+    SensorBackfillRequestBody,
     SensorCreateRequestBody,
     SensorPublic,
     SensorUpdateRequestBody,
@@ -31,12 +36,8 @@ async def sensor_create(
         template_id=template_id, sensor_payload=SensorBase.from_orm(schema)
     )
 
-    # Run the processing task in a background on sensor creation
-    await tasks.run(
-        namespace="sensor_tsd_process",
-        key=sensor.id,
-        coro=partial(tsd.process, sensor),
-    )
+    # Start polling the time series data on sensor creation
+    lifecycle.start(sensor)
 
     return Response[SensorPublic](result=SensorPublic.from_orm(sensor))
 
@@ -101,16 +102,17 @@ async def sensor_update(
 @router.delete("/sensors/{sensor_id}", status_code=204)
 async def sensor_delete(_: Request, sensor_id: int) -> None:
     """Delete the sensor and its configuration.
-    Stop the background tasks which process
-    the time series data for that specific sensor.
+    Stop polling the time series data for that specific sensor.
     """
 
+    # Stop polling and remove the runtime state if a user removes the sensor
+    # NOTE: The sensor is stopped first, since readings that are left
+    #       in the ingestion buffer are saved for the existing sensor
+    await lifecycle.stop(sensor_id)
+
     # Remove the sensor and the configuration
     await sensors.delete(sensor_id)
 
-    # Cancel the task if a user removes the sensor
-    tasks.cancel(namespace="sensor_tsd_process", key=sensor_id)
-
 
 @router.patch("/sensors/{sensor_id}/interactive-feedback-mode/toggle")
 async def sensor_interactive_feedback_mode_toggle(
@@ -142,3 +144,33 @@ async def sensor_pin_toggle(
     sensor: Sensor = await sensors.toggle_pin(sensor_id=sensor_id)
 
     return Response[SensorPublic](result=SensorPublic.from_orm(sensor))
+
+
+@router.post(
+    "/sensors/{sensor_id}/backfill",
+    status_code=202,
+    dependencies=[Depends(admin_only)],
+)
+async def sensor_backfill(
+    _: Request, sensor_id: int, schema: SensorBackfillRequestBody
+) -> None:
+    """Run the historical time series data backfill for the sensor
+    in a background. Only files from the mock TSD directory are allowed.
+    """
+
+    sensor: Sensor = await sensors.retrieve(sensor_id=sensor_id)
+    filename: str = schema.filename or f"{sensor.name}.csv"
+
+    # NOTE: Only plain file names are accepted to avoid path traversal
+    if Path(filename).name != filename:
+        raise BadRequestError(message="Only file names are allowed")
+
+    path: Path = settings.mock_dir / "tsd" / filename
+    if not path.is_file():
+        raise NotFoundError(message=f"File {filename} is not found")
+
+    await tasks.run(
+        namespace="sensor_tsd_backfill",
+        key=sensor.id,
+        coro=partial(tsd.backfill, sensor.id, path),
+    )
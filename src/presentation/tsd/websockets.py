@@ -1,9 +1,12 @@
-from fastapi import APIRouter, WebSocket
+from functools import partial
+
+from fastapi import APIRouter, WebSocket, status
 from loguru import logger
 from websockets.exceptions import ConnectionClosed
 
 from src.application import tsd
 from src.application.data_lake import data_lake
+from src.config import settings
 from src.infrastructure.contracts import Response, ResponseMulti
 
 from .contracts import TsdPublic
@@ -14,33 +17,58 @@ router = APIRouter(prefix="/sensors", tags=["Time series data"])
 
 
 @router.websocket("/{sensor_id}/time-series-data")
-async def time_series_data(ws: WebSocket, sensor_id: int):
+async def time_series_data(
+    ws: WebSocket, sensor_id: int, last_id: int | None = None
+):
     """Establish the websocket connection and send the next data:
     1. historical time series data
     2. the new time series data on each event that produced by daemon
 
     This information is taken per sensor.
+
+    If the client reconnects with the last seen id
+    (/sensors/1/time-series-data?last_id=100), the historical data
+    is not sent. Only missed items are sent before the new ones.
     """
 
+    # NOTE: Lake items exist only for running sensors
+    if (
+        lake_item := data_lake.time_series_data_by_sensor.get(sensor_id)
+    ) is None:
+        await ws.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+
     await ws.accept()
     logger.success(
         "Opening WS connection for Estimation results fetching "
         f"from sensor: {sensor_id}"
     )
 
-    historical_tsd_set: list[TsdPublic] = [
-        TsdPublic.from_orm(instance)
-        for instance in (await tsd.get_historical_data(sensor_id))
-    ]
+    if last_id is None:
+        historical_tsd_set: list[TsdPublic] = [
+            TsdPublic.from_orm(instance)
+            for instance in (await tsd.get_historical_data(sensor_id))
+        ]
+
+        # WARNING: The historical data should be sent by chanks since
+        #           there is a HTTP protocol limitation on the data size
+        historical_response = ResponseMulti[TsdPublic](
+            result=historical_tsd_set
+        )
+        await ws.send_json(historical_response.encoded_dict())
 
-    # WARNING: The historical data should be sent by chanks since
-    #           there is a HTTP protocol limitation on the data size
-    historical_response = ResponseMulti[TsdPublic](result=historical_tsd_set)
-    await ws.send_json(historical_response.encoded_dict())
+        # NOTE: Items that are saved after the historical data is fetched
+        #       are sent as missed ones
+        last_id = historical_tsd_set[-1].id if historical_tsd_set else 0
 
-    async for instance in data_lake.time_series_data_by_sensor[
-        sensor_id
-    ].consume():
+    async for instance in lake_item.consume_after(
+        last_id,
+        fetch_missed=partial(
+            tsd.get_missed_data,
+            sensor_id,
+            limit=settings.public_api.websocket_resume_limit,
+        ),
+    ):
         response = Response[TsdPublic](result=TsdPublic.from_orm(instance))
 
         try: